@@ -0,0 +1,206 @@
+"""
+Admission control for ECS Playground.
+
+AdmissionMiddleware decides, before Flask runs, whether this worker takes a
+request on. Excess work is turned away in microseconds instead of queueing
+until the ALB times out:
+
+- In-flight cap: at most ``max_in_flight`` requests run at once in this
+  worker. Heavy routes (large bodies, CPU-bound) may use all but one slot
+  while the accept queue is empty; under pressure (a queue, or the worker
+  about to fill up) they are held to ``heavy_share`` of it, so light routes
+  keep capacity under overload. Excess gets 503.
+- Queue shedding: while more than ``max_queue`` connections wait in the
+  task's accept queue, heavy routes get 503 so the queue drains quickly.
+  Requests that already waited longer than ``max_wait`` seconds for a
+  thread (known when the ASGI bridge stamps ``playground.queued_at``) get
+  503 too: their client is close to giving up.
+- Rate limits: optional per-client token buckets (``rate`` requests per
+  second, ``burst`` deep) answer 429. Clients are told apart by the
+  address the outermost of ``trusted_hops`` proxies put in
+  X-Forwarded-For (see client_address()).
+
+Rejections carry ``Retry-After``. Liveness and readiness probes are answered
+by ProbeMiddleware in front of this, so they are never shed. ``exempt_paths``
+(long-lived streams with their own subscriber caps) bypass admission and
+take no slot.
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from werkzeug.wsgi import ClosingIterator
+
+from metrics import RouteResolver
+from probes import accept_queue_depth
+
+
+def client_address(environ, trusted_hops=1):
+    """The address the outermost trusted proxy received the request from.
+
+    Each proxy appends its peer's address to X-Forwarded-For, so only the
+    last ``trusted_hops`` entries were written by proxies we run (1: the
+    ALB; 2: CloudFront, then the ALB). Anything left of them came from the
+    client and is never used. 0 trusts no header and uses REMOTE_ADDR.
+    """
+    forwarded = environ.get('HTTP_X_FORWARDED_FOR')
+    if trusted_hops <= 0 or not forwarded:
+        return environ.get('REMOTE_ADDR')
+    hops = forwarded.split(',')
+    # Fewer entries than trusted proxies: the request skipped the outer ones.
+    return hops[-min(trusted_hops, len(hops))].strip()
+
+
+def _rejection(status, message, retry_after):
+    body = json.dumps({'error': message, 'retry_after': retry_after},
+                      separators=(',', ':')).encode('utf-8')
+    headers = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body))),
+        ('Retry-After', str(retry_after)),
+        ('Cache-Control', 'no-store'),
+    ]
+    return status, headers, body
+
+
+class TokenBuckets:
+    """Per-client token buckets, keeping the ``max_clients`` most recent."""
+
+    def __init__(self, rate, burst, max_clients=10000):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> [tokens, updated]
+        self._lock = threading.Lock()
+
+    def take(self, client):
+        """Spend one token; return 0 if allowed, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = [self.burst, now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate
+
+
+class AdmissionMiddleware:
+    """Caps in-flight work per worker and sheds or rate-limits the excess."""
+
+    def __init__(self, app, url_map, max_in_flight, heavy_paths=(), heavy_share=0.5,
+                 port=None, max_queue=None, queue_interval=0.1, max_wait=None, rate=0,
+                 burst=0, retry_after=1, trusted_hops=1, exempt_paths=()):
+        self.app = app
+        self.exempt_paths = frozenset(exempt_paths)
+        self.max_in_flight = max(max_in_flight, 1)
+        self.heavy_paths = frozenset(heavy_paths)
+        self.heavy_limit = max(1, int(self.max_in_flight * heavy_share))
+        self.port = port
+        self.max_queue = max_queue
+        self.queue_interval = queue_interval
+        self.max_wait = max_wait
+        self.buckets = TokenBuckets(rate, burst or rate) if rate > 0 else None
+        self.trusted_hops = trusted_hops
+        self.retry_after = retry_after
+        self.route = RouteResolver(url_map)
+        self.in_flight = 0
+        self.heavy_in_flight = 0
+        self.shed = {}          # route -> requests answered 503 (this process)
+        self.rate_limited = {}  # route -> requests answered 429
+        self._lock = threading.Lock()
+        self._queue_lock = threading.Lock()
+        self._queue_depth = None
+        self._queue_checked = 0.0
+        self._overloaded = _rejection('503 Service Unavailable', 'Server overloaded, retry later',
+                                      retry_after)
+
+    def queue_depth(self):
+        """Accept queue depth, re-read at most every ``queue_interval`` seconds."""
+        now = time.monotonic()
+        if now - self._queue_checked >= self.queue_interval and self._queue_lock.acquire(False):
+            try:
+                self._queue_depth = accept_queue_depth(self.port)
+                self._queue_checked = now
+            finally:
+                self._queue_lock.release()
+        return self._queue_depth
+
+    def _queued(self):
+        # Unknown depth (no port, no /proc) counts as an empty queue.
+        depth = self.queue_depth() if self.port else None
+        return bool(depth)
+
+    def _reject(self, counter, environ, response, start_response):
+        label = self.route(environ)
+        with self._lock:
+            counter[label] = counter.get(label, 0) + 1
+        status, headers, body = response
+        start_response(status, headers)
+        return [body]
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path in self.exempt_paths:
+            return self.app(environ, start_response)
+        heavy = path in self.heavy_paths
+
+        if self.buckets is not None:
+            wait = self.buckets.take(client_address(environ, self.trusted_hops))
+            if wait:
+                response = _rejection('429 Too Many Requests', 'Rate limit exceeded',
+                                      math.ceil(wait))
+                return self._reject(self.rate_limited, environ, response, start_response)
+
+        if self.max_wait is not None:
+            queued_at = environ.get('playground.queued_at')
+            if queued_at is not None and time.monotonic() - queued_at > self.max_wait:
+                return self._reject(self.shed, environ, self._overloaded, start_response)
+
+        if heavy and self.max_queue is not None and self.port:
+            depth = self.queue_depth()
+            if depth is not None and depth > self.max_queue:
+                return self._reject(self.shed, environ, self._overloaded, start_response)
+
+        # Past its share, a heavy request still gets an idle worker's spare slots;
+        # the queue is read outside the lock, only when it can matter.
+        queued = heavy and self.heavy_in_flight >= self.heavy_limit and self._queued()
+        with self._lock:
+            admitted = self.in_flight < self.max_in_flight
+            if admitted and heavy and self.heavy_in_flight >= self.heavy_limit:
+                admitted = self.in_flight + 1 < self.max_in_flight and not queued
+            if admitted:
+                self.in_flight += 1
+                self.heavy_in_flight += heavy
+        if not admitted:
+            return self._reject(self.shed, environ, self._overloaded, start_response)
+
+        finished = self._finished_heavy if heavy else self._finished
+        try:
+            return ClosingIterator(self.app(environ, start_response), finished)
+        except BaseException:
+            finished()
+            raise
+
+    def _finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def _finished_heavy(self):
+        with self._lock:
+            self.in_flight -= 1
+            self.heavy_in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {'shed': dict(self.shed), 'rate_limited': dict(self.rate_limited)}
@@ -4,487 +4,268 @@ ECS Playground - Simple Flask application for deployment demonstration.
 """
 
 import os
+import sys
+import hmac
 import json
+import logging
 import random
-import base64
+import itertools
 import math
 from datetime import datetime
-from flask import Flask, jsonify, request, render_template_string
+from flask import Flask, abort, has_request_context, jsonify, request, render_template, send_from_directory
+from flask.logging import default_handler
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 
-app = Flask(__name__)
+import admission
+import compression
+import encoders
+import jsonlog
+import lifecycle
+import metrics
+import offload
+import profiler
+import quotes
+import rates
+import responsecache
+import resultcache
+import textstream
+import wireformats
+from build_assets import MANIFEST, STATIC_DIR, load_manifest
+from probes import ProbeMiddleware
+from precompressed import PrecompressedBody
+
+# Static files are served by static_assets() below with immutable caching.
+app = Flask(__name__, static_folder=None)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5000))
 APP_ENV = os.environ.get('APP_ENV', 'production')
 VERSION = os.environ.get('APP_VERSION', '2.0.0')
+JSON_COMPACT = os.environ.get('JSON_COMPACT', 'true').lower() == 'true'
+JSON_SORT_KEYS = os.environ.get('JSON_SORT_KEYS', 'false').lower() == 'true'
+# Request bodies past MAX_CONTENT_LENGTH_MB get 413 (0 = unlimited); /api/echo
+# turns bodies past ECHO_MAX_KB away before reading them
+MAX_CONTENT_LENGTH_MB = int(os.environ.get('MAX_CONTENT_LENGTH_MB', 32))
+ECHO_MAX_KB = int(os.environ.get('ECHO_MAX_KB', 1024))
+# Binary formats offered next to JSON through Accept/Content-Type (empty = JSON only)
+WIRE_FORMATS = [f for f in os.environ.get('WIRE_FORMATS', 'msgpack,cbor').split(',') if f]
+# Requests one worker serves concurrently; set by gunicorn.conf.py
+WORKER_CAPACITY = int(os.environ.get('WORKER_CAPACITY', 1))
+# /ready fails once more connections than this wait in the task's accept queue
+READY_MAX_QUEUE = int(os.environ.get('READY_MAX_QUEUE', 32))
+# Shared directory for per-worker metric snapshots; EMF log lines every N seconds (0 = off)
+METRICS_DIR = os.environ.get('METRICS_DIR', metrics.DEFAULT_DIR)
+METRICS_EMF_INTERVAL = float(os.environ.get('METRICS_EMF_INTERVAL', 0))
+# /metrics needs 'Authorization: Bearer $METRICS_TOKEN'; unset, it is a 404
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+CALCULATOR_MAX_BATCH = int(os.environ.get('CALCULATOR_MAX_BATCH', 10000))
+CURRENCY_MAX_BATCH = int(os.environ.get('CURRENCY_MAX_BATCH', 10000))
+RATES_PROVIDER = os.environ.get('RATES_PROVIDER', 'static')
+RATES_SOURCE = os.environ.get('RATES_SOURCE')
+RATES_TTL = float(os.environ.get('RATES_TTL', 300))
+RATES_STALE_TTL = float(os.environ.get('RATES_STALE_TTL', 3600))
+# Response cache for opted-in GET routes: off, memory (per worker) or shared (per task)
+RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', 'memory').lower()
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH', responsecache.DEFAULT_PATH)
+# Memoized calculator/encoder/text-utils results, per worker; 0 MB disables
+RESULT_CACHE_MB = int(os.environ.get('RESULT_CACHE_MB', 64))
+RESULT_CACHE_ENTRIES = int(os.environ.get('RESULT_CACHE_ENTRIES', 4096))
+RESULT_CACHE_MAX_ENTRY_KB = int(os.environ.get('RESULT_CACHE_MAX_ENTRY_KB', 1024))
+# Bumping this file's mtime invalidates both caches in every worker
+CACHE_GENERATION_PATH = os.environ.get('CACHE_GENERATION_PATH', resultcache.DEFAULT_GENERATION_PATH)
+# Admission control: concurrent requests per worker (heavy routes get a share),
+# accept-queue and wait limits for shedding, optional per-client rate limit
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', WORKER_CAPACITY))
+ADMISSION_HEAVY_SHARE = float(os.environ.get('ADMISSION_HEAVY_SHARE', 0.5))
+ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', READY_MAX_QUEUE))
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 1.0))
+RATE_LIMIT_RPS = float(os.environ.get('RATE_LIMIT_RPS', 0))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', 0))
+# Proxies in front of the task appending to X-Forwarded-For (1 = the ALB; 2 when
+# clients come through CloudFront); rate limits key on the address they saw
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 1))
+# Bearer token for /api/cache (stats and invalidation); the route is hidden when unset
+CACHE_ADMIN_TOKEN = os.environ.get('CACHE_ADMIN_TOKEN')
+# Shutdown: after SIGTERM keep serving DRAIN_DELAY seconds with /ready failing,
+# then give in-flight requests DRAIN_TIMEOUT seconds (gunicorn.conf.py reads these too)
+DRAIN_DELAY = float(os.environ.get('DRAIN_DELAY', 5))
+DRAIN_TIMEOUT = float(os.environ.get('DRAIN_TIMEOUT', 25))
+DRAIN_STATE_PATH = os.environ.get('DRAIN_STATE_PATH', lifecycle.DEFAULT_PATH)
+# Response compression: encodings offered in preference order (empty = off), smallest
+# body worth compressing; gzip request bodies may inflate to at most this many MB
+COMPRESSION_ENCODINGS = [e for e in os.environ.get('COMPRESSION_ENCODINGS', 'zstd,br,gzip').split(',') if e]
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_MAX_INFLATED_MB = int(os.environ.get('COMPRESSION_MAX_INFLATED_MB', 32))
+# Sampling profiler behind /debug/profile: on by default only in development, where
+# the route is open; elsewhere it needs PROFILING=true and PROFILE_TOKEN as a bearer token
+PROFILING = os.environ.get('PROFILING', str(APP_ENV == 'development')).lower() == 'true'
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 10))
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 1000))
+PROFILE_WINDOW = int(os.environ.get('PROFILE_WINDOW', 300))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', profiler.DEFAULT_DIR)
+# Large text-utils/encoder inputs run in a pool of helper processes per worker
+# (gunicorn.conf.py splits the task's vCPUs; 0 = always inline), OFFLOAD_MAX_QUEUE
+# more may wait, and jobs are cut off after OFFLOAD_TIMEOUT seconds
+OFFLOAD_WORKERS = int(os.environ.get('OFFLOAD_WORKERS', os.cpu_count() or 1))
+OFFLOAD_TEXT_THRESHOLD_KB = int(os.environ.get('OFFLOAD_TEXT_THRESHOLD_KB', 256))
+OFFLOAD_CODEC_THRESHOLD_KB = int(os.environ.get('OFFLOAD_CODEC_THRESHOLD_KB', 4096))
+OFFLOAD_MAX_QUEUE = int(os.environ.get('OFFLOAD_MAX_QUEUE', 4))
+OFFLOAD_TIMEOUT = float(os.environ.get('OFFLOAD_TIMEOUT', 10))
+# Structured JSON logs on stdout: access lines for ACCESS_LOG_SAMPLE of requests
+# (per-route overrides like "/api/echo=0.01,/static/*=0"; 5xx and requests over
+# ACCESS_LOG_SLOW_MS always) and app logs from LOG_LEVEL up, written in batches of
+# LOG_BATCH lines by a background thread; past LOG_BUFFER waiting lines new ones
+# are dropped and counted, so a stalled stdout never blocks requests
+ACCESS_LOG = os.environ.get('ACCESS_LOG', 'true').lower() == 'true'
+ACCESS_LOG_SAMPLE = float(os.environ.get('ACCESS_LOG_SAMPLE', 1.0))
+ACCESS_LOG_ROUTES = jsonlog.parse_rates(os.environ.get('ACCESS_LOG_ROUTES', ''))
+ACCESS_LOG_SLOW_MS = float(os.environ.get('ACCESS_LOG_SLOW_MS', 1000))
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_BUFFER = int(os.environ.get('LOG_BUFFER', 10000))
+LOG_BATCH = int(os.environ.get('LOG_BATCH', 512))
+LOG_FLUSH_MS = float(os.environ.get('LOG_FLUSH_MS', 200))
+# /api/quote/stream: a new quote every QUOTE_STREAM_INTERVAL seconds. A stream would
+# hold a worker thread for QUOTE_STREAM_DURATION under sync/gthread, so the route
+# (and the UI's live feed) is only on under gevent and asgi (which sets QUOTE_STREAM)
+GEVENT = 'gevent.monkey' in sys.modules and sys.modules['gevent.monkey'].is_module_patched('threading')
+QUOTE_STREAM = os.environ.get('QUOTE_STREAM', str(GEVENT)).lower() == 'true'
+QUOTE_STREAM_INTERVAL = float(os.environ.get('QUOTE_STREAM_INTERVAL', 10))
+QUOTE_STREAM_DURATION = float(os.environ.get('QUOTE_STREAM_DURATION', 300))
+QUOTE_STREAM_MAX_SUBSCRIBERS = int(os.environ.get('QUOTE_STREAM_MAX_SUBSCRIBERS', 500))
+
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH_MB * 1024 * 1024 or None
+
+# jsonify/get_json use orjson when available, compact and unsorted by default, and
+# speak MessagePack or CBOR instead when the request asks for it
+app.request_class = wireformats.WireRequest
+app.json = wireformats.WireFormatProvider(
+    app, formats=WIRE_FORMATS, compact=JSON_COMPACT, sort_keys=JSON_SORT_KEYS
+)
+
+# Logging: one writer per process behind both the access log and the logging module.
+log_writer = jsonlog.LogWriter(
+    capacity=LOG_BUFFER, batch_size=LOG_BATCH, flush_interval=LOG_FLUSH_MS / 1000
+)
+
+
+def _log_context():
+    """Request fields for app log records, and the route they are counted under."""
+    if not has_request_context():
+        return {}, '-'
+    return {
+        'method': request.method,
+        'path': request.path,
+        'trace_id': request.headers.get('X-Amzn-Trace-Id'),
+    }, request.environ.get('playground.route', 'unmatched')
+
+
+logging.root.addHandler(jsonlog.JSONLogHandler(log_writer, level=LOG_LEVEL, context=_log_context))
+logging.root.setLevel(LOG_LEVEL)
+# Unhandled exceptions reach the JSON handler through the root logger instead.
+app.logger.removeHandler(default_handler)
+
+# Exchange rates are refreshed in the background; handlers read the snapshot.
+rates.start_refresher(
+    rates.create_provider(RATES_PROVIDER, RATES_SOURCE),
+    ttl=RATES_TTL,
+    stale_ttl=RATES_STALE_TTL,
+)
+
+
+cache_generation = resultcache.Generation(CACHE_GENERATION_PATH)
+drain = lifecycle.DrainState(DRAIN_STATE_PATH)
+quote_store = quotes.QuoteStore()
+quote_feed = quotes.QuoteFeed(
+    quote_store, interval=QUOTE_STREAM_INTERVAL, max_subscribers=QUOTE_STREAM_MAX_SUBSCRIBERS
+)
+offloader = offload.Offloader(
+    OFFLOAD_WORKERS,
+    thresholds={
+        'text_utils': OFFLOAD_TEXT_THRESHOLD_KB * 1024,
+        'codec': OFFLOAD_CODEC_THRESHOLD_KB * 1024,
+    },
+    timeout=OFFLOAD_TIMEOUT,
+    max_queue=OFFLOAD_MAX_QUEUE,
+)
+
+
+def _rates_version():
+    """Cache key part that changes whenever a new rate snapshot is installed."""
+    return repr(rates.current_table().fetched_at)
+
+
+# Content-hashed asset URLs, e.g. 'playground.css' -> '/static/playground.<hash>.css'.
+ASSET_MANIFEST = load_manifest()
+
+# Hashed assets never change, so they can be cached for a year without revalidation.
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def asset_url(name):
+    """URL of the current build of a static asset."""
+    return ASSET_MANIFEST[name]
+
+
+# Home page is rendered once at import: it only depends on env vars fixed at startup.
+def _render_home_page():
+    """Render the home page template into a precompressed, ETag-validated body."""
+    with app.app_context():
+        html = render_template(
+            'index.html', version=VERSION, environment=APP_ENV, asset_url=asset_url,
+            quote_stream=QUOTE_STREAM
+        )
+    return PrecompressedBody(html.encode('utf-8'), 'text/html')
+
+
+HOME_PAGE = _render_home_page()
 
 
 @app.route('/')
 def home():
     """Interactive home page with web UI."""
-    html_template = '''
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>ECS Playground - Interactive Demo</title>
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body { 
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                min-height: 100vh; 
-                padding: 20px;
-            }
-            .container { 
-                max-width: 1200px; 
-                margin: 0 auto; 
-                background: white; 
-                border-radius: 20px; 
-                padding: 30px; 
-                box-shadow: 0 20px 40px rgba(0,0,0,0.1); 
-            }
-            h1 { 
-                color: #333; 
-                text-align: center; 
-                margin-bottom: 20px; 
-                font-size: 2.5em; 
-            }
-            .subtitle { 
-                text-align: center; 
-                color: #666; 
-                margin-bottom: 30px; 
-                font-size: 1.2em; 
-            }
-            .status-bar {
-                background: #e8f5e8; 
-                color: #2d5a2d; 
-                padding: 15px;
-                border-radius: 10px;
-                text-align: center;
-                margin-bottom: 30px;
-                font-weight: bold; 
-            }
-            .feature-grid { 
-                display: grid; 
-                grid-template-columns: repeat(auto-fit, minmax(350px, 1fr)); 
-                gap: 20px; 
-                margin-bottom: 30px; 
-            }
-            .feature-card { 
-                background: #f8f9fa; 
-                border-radius: 15px; 
-                padding: 25px; 
-                border-left: 5px solid #007bff;
-                transition: transform 0.3s ease, box-shadow 0.3s ease;
-            }
-            .feature-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 10px 25px rgba(0,0,0,0.1);
-            }
-            .feature-card h3 { 
-                color: #333; 
-                margin-bottom: 15px; 
-                font-size: 1.3em;
-                display: flex;
-                align-items: center;
-            }
-            .feature-card .icon {
-                font-size: 1.5em;
-                margin-right: 10px;
-            }
-            .input-group {
-                margin: 15px 0;
-            }
-            .input-group label {
-                display: block;
-                margin-bottom: 5px;
-                font-weight: 500;
-                color: #555;
-            }
-            .input-group input, .input-group select, .input-group textarea {
-                width: 100%;
-                padding: 10px;
-                border: 2px solid #ddd;
-                border-radius: 8px;
-                font-size: 14px;
-                transition: border-color 0.3s ease;
-            }
-            .input-group input:focus, .input-group select:focus, .input-group textarea:focus {
-                outline: none;
-                border-color: #007bff;
-            }
-            button {
-                background: #007bff;
-                color: white;
-                border: none;
-                padding: 12px 20px;
-                border-radius: 8px;
-                cursor: pointer;
-                font-size: 14px;
-                font-weight: 500;
-                transition: background 0.3s ease;
-                width: 100%;
-                margin-top: 10px;
-            }
-            button:hover {
-                background: #0056b3;
-            }
-            .result {
-                margin-top: 15px;
-                padding: 15px;
-                background: #e3f2fd;
-                border-radius: 8px;
-                border-left: 4px solid #2196f3;
-                display: none;
-            }
-            .result.show {
-                display: block;
-            }
-            .result pre {
-                margin: 0;
-                white-space: pre-wrap;
-                word-wrap: break-word;
-            }
-            .info-section {
-                background: #fff3cd;
-                border: 1px solid #ffeaa7;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-            }
-            .quote-display {
-                background: #f8f9fa;
-                border-left: 4px solid #28a745;
-                padding: 20px;
-                border-radius: 8px;
-                margin-top: 15px;
-                font-style: italic;
-            }
-            .quote-text {
-                font-size: 1.1em;
-                margin-bottom: 10px;
-            }
-            .quote-author {
-                text-align: right;
-                font-weight: bold;
-                color: #666;
-            }
-            @media (max-width: 768px) {
-                .container { padding: 15px; }
-                h1 { font-size: 2em; }
-                .feature-grid { grid-template-columns: 1fr; }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🚀 ECS Playground</h1>
-            <div class="subtitle">Interactive Demo - AWS Fargate Container Application</div>
-            
-            <div class="status-bar">
-                ✅ Running on AWS Fargate in Tokyo Region | Version {{ version }} | Environment: {{ environment }}
-                </div>
-
-            <div class="info-section">
-                <strong>🏗️ User Flow:</strong> User → CloudFront → ALB → Fargate (You are here!) <br>
-                <strong>⚙️ Infrastructure Flow:</strong> S3 Upload → CodeBuild → ECR Push → Manual Approval → ECS Deploy → Auto-scaling <br>
-                <strong>🌏 Region:</strong> ap-northeast-1 | 
-                <strong>🐍 Tech:</strong> Python 3.12 + Flask + Docker
-                </div>
-
-            <div class="feature-grid">
-                <!-- Currency Exchange -->
-                <div class="feature-card">
-                    <h3><span class="icon">💱</span>Currency Exchange</h3>
-                    <div class="input-group">
-                        <label>From Currency:</label>
-                        <select id="fromCurrency">
-                            <option value="USD">USD - US Dollar</option>
-                            <option value="EUR">EUR - Euro</option>
-                            <option value="GBP">GBP - British Pound</option>
-                            <option value="JPY">JPY - Japanese Yen</option>
-                            <option value="CNY">CNY - Chinese Yuan</option>
-                            <option value="KRW">KRW - Korean Won</option>
-                        </select>
-                </div>
-                    <div class="input-group">
-                        <label>To Currency:</label>
-                        <select id="toCurrency">
-                            <option value="EUR">EUR - Euro</option>
-                            <option value="USD">USD - US Dollar</option>
-                            <option value="GBP">GBP - British Pound</option>
-                            <option value="JPY">JPY - Japanese Yen</option>
-                            <option value="CNY">CNY - Chinese Yuan</option>
-                            <option value="KRW">KRW - Korean Won</option>
-                        </select>
-                </div>
-                    <div class="input-group">
-                        <label>Amount:</label>
-                        <input type="number" id="amount" value="100" min="0" step="0.01">
-                </div>
-                    <button onclick="convertCurrency()">Convert Currency</button>
-                    <div id="currencyResult" class="result"></div>
-            </div>
-
-                <!-- Calculator -->
-                <div class="feature-card">
-                    <h3><span class="icon">🧮</span>Calculator</h3>
-                    <div class="input-group">
-                        <label>Operation:</label>
-                        <select id="operation">
-                            <option value="add">Add (+)</option>
-                            <option value="subtract">Subtract (-)</option>
-                            <option value="multiply">Multiply (×)</option>
-                            <option value="divide">Divide (÷)</option>
-                            <option value="power">Power (^)</option>
-                            <option value="sqrt">Square Root (√)</option>
-                            <option value="log">Natural Log (ln)</option>
-                        </select>
-            </div>
-                    <div class="input-group">
-                        <label>Number A:</label>
-                        <input type="number" id="numberA" value="10" step="any">
-                 </div>
-                    <div class="input-group">
-                        <label>Number B:</label>
-                        <input type="number" id="numberB" value="5" step="any">
-                 </div>
-                    <button onclick="calculate()">Calculate</button>
-                    <div id="calcResult" class="result"></div>
-                 </div>
-
-                <!-- Text Utilities -->
-                <div class="feature-card">
-                    <h3><span class="icon">📝</span>Text Utilities</h3>
-                    <div class="input-group">
-                        <label>Enter your text:</label>
-                        <textarea id="textInput" rows="4" placeholder="Type or paste your text here...">Hello from AWS Fargate in Tokyo!</textarea>
-                 </div>
-                    <button onclick="analyzeText()">Analyze Text</button>
-                    <div id="textResult" class="result"></div>
-                 </div>
-                 
-                <!-- Random Quote -->
-                <div class="feature-card">
-                    <h3><span class="icon">💬</span>Inspirational Quotes</h3>
-                    <p>Get motivated with random quotes from great minds!</p>
-                    <button onclick="getRandomQuote()">Get Random Quote</button>
-                    <div id="quoteDisplay" class="quote-display" style="display: none;">
-                        <div id="quoteText" class="quote-text"></div>
-                        <div id="quoteAuthor" class="quote-author"></div>
-                 </div>
-                 </div>
-
-                <!-- Base64 Encoder -->
-                <div class="feature-card">
-                    <h3><span class="icon">🔐</span>Base64 Encoder/Decoder</h3>
-                    <div class="input-group">
-                        <label>Operation:</label>
-                        <select id="encodeOperation">
-                            <option value="encode">Encode to Base64</option>
-                            <option value="decode">Decode from Base64</option>
-                        </select>
-                 </div>
-                    <div class="input-group">
-                        <label>Text:</label>
-                        <textarea id="encodeText" rows="3" placeholder="Enter text to encode/decode...">Hello AWS Fargate!</textarea>
-                 </div>
-                    <button onclick="processBase64()">Process</button>
-                    <div id="encodeResult" class="result"></div>
-             </div>
-
-                <!-- API Information -->
-                <div class="feature-card">
-                    <h3><span class="icon">🔗</span>API Endpoints</h3>
-                    <p>This app also provides JSON API endpoints:</p>
-                    <ul style="margin: 10px 0; padding-left: 20px;">
-                        <li><strong>GET /api/info</strong> - API information</li>
-                        <li><strong>GET /api/currency</strong> - Exchange rates</li>
-                        <li><strong>GET /api/quote</strong> - Random quote</li>
-                        <li><strong>POST /api/calculator</strong> - Calculator</li>
-                        <li><strong>POST /api/text-utils</strong> - Text analysis</li>
-                        <li><strong>POST /api/encoder</strong> - Base64 operations</li>
-                    </ul>
-                    <button onclick="window.open('/api/info', '_blank')">View API Info</button>
-                </div>
-            </div>
-        </div>
-
-        <script>
-            async function convertCurrency() {
-                const from = document.getElementById('fromCurrency').value;
-                const to = document.getElementById('toCurrency').value;
-                const amount = document.getElementById('amount').value;
-                
-                try {
-                    const response = await fetch(`/api/currency/convert?from=${from}&to=${to}&amount=${amount}`);
-                    const data = await response.json();
-                    
-                    const resultDiv = document.getElementById('currencyResult');
-                    if (response.ok) {
-                        resultDiv.innerHTML = `
-                            <strong>Conversion Result:</strong><br>
-                            ${data.from.amount} ${data.from.currency} = 
-                            <strong>${data.to.amount} ${data.to.currency}</strong><br>
-                            <small>Exchange rate: 1 ${data.from.currency} = ${data.rate} ${data.to.currency}</small>
-                        `;
-                    } else {
-                        resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
-                    }
-                    resultDiv.classList.add('show');
-                } catch (error) {
-                    document.getElementById('currencyResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
-                    document.getElementById('currencyResult').classList.add('show');
-                }
-            }
-
-            async function calculate() {
-                const operation = document.getElementById('operation').value;
-                const a = parseFloat(document.getElementById('numberA').value);
-                const b = parseFloat(document.getElementById('numberB').value);
-                
-                try {
-                    const response = await fetch('/api/calculator', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ operation, a, b })
-                    });
-                    const data = await response.json();
-                    
-                    const resultDiv = document.getElementById('calcResult');
-                    if (response.ok) {
-                        const inputs = operation === 'sqrt' || operation === 'log' ? 
-                            `${operation}(${a})` : `${a} ${operation} ${b}`;
-                        resultDiv.innerHTML = `
-                            <strong>Calculation:</strong><br>
-                            ${inputs} = <strong>${data.result}</strong>
-                        `;
-                    } else {
-                        resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
-                    }
-                    resultDiv.classList.add('show');
-                } catch (error) {
-                    document.getElementById('calcResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
-                    document.getElementById('calcResult').classList.add('show');
-                }
-            }
-
-            async function analyzeText() {
-                const text = document.getElementById('textInput').value;
-                
-                try {
-                    const response = await fetch('/api/text-utils', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ text })
-                    });
-                    const data = await response.json();
-                    
-                    const resultDiv = document.getElementById('textResult');
-                    if (response.ok) {
-                        resultDiv.innerHTML = `
-                            <strong>Text Analysis:</strong><br>
-                            • Characters: ${data.stats.characters}<br>
-                            • Characters (no spaces): ${data.stats.characters_no_spaces}<br>
-                            • Words: ${data.stats.words}<br>
-                            • Lines: ${data.stats.lines}<br>
-                            • Sentences: ${data.stats.sentences}<br><br>
-                            <strong>Transformations:</strong><br>
-                            • Uppercase: ${data.transformations.uppercase}<br>
-                            • Lowercase: ${data.transformations.lowercase}<br>
-                            • Title Case: ${data.transformations.title_case}<br>
-                            • Reversed: ${data.transformations.reversed}
-                        `;
-                    } else {
-                        resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
-                    }
-                    resultDiv.classList.add('show');
-                } catch (error) {
-                    document.getElementById('textResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
-                    document.getElementById('textResult').classList.add('show');
-                }
-            }
-
-            async function getRandomQuote() {
-                try {
-                    const response = await fetch('/api/quote');
-                    const data = await response.json();
-                    
-                    if (response.ok) {
-                        document.getElementById('quoteText').textContent = `"${data.quote.text}"`;
-                        document.getElementById('quoteAuthor').textContent = `— ${data.quote.author}`;
-                        document.getElementById('quoteDisplay').style.display = 'block';
-                    }
-                } catch (error) {
-                    console.error('Error fetching quote:', error);
-                }
-            }
-
-            async function processBase64() {
-                const operation = document.getElementById('encodeOperation').value;
-                const text = document.getElementById('encodeText').value;
-                
-                try {
-                    const response = await fetch('/api/encoder', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ operation, text })
-                    });
-                    const data = await response.json();
-                    
-                    const resultDiv = document.getElementById('encodeResult');
-                    if (response.ok) {
-                        resultDiv.innerHTML = `
-                            <strong>${operation === 'encode' ? 'Encoded' : 'Decoded'} Result:</strong><br>
-                            <pre>${data.result}</pre>
-                        `;
-                    } else {
-                        resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
-                    }
-                    resultDiv.classList.add('show');
-                } catch (error) {
-                    document.getElementById('encodeResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
-                    document.getElementById('encodeResult').classList.add('show');
-                }
-            }
-
-            // Update operation labels based on selection
-            document.getElementById('operation').addEventListener('change', function() {
-                const operation = this.value;
-                const numberBDiv = document.getElementById('numberB').parentElement;
-                if (operation === 'sqrt' || operation === 'log') {
-                    numberBDiv.style.display = 'none';
-                } else {
-                    numberBDiv.style.display = 'block';
-                }
-            });
-
-            // Load a quote on page load
-            window.addEventListener('load', getRandomQuote);
-        </script>
-    </body>
-    </html>
-    '''
-    
-    return render_template_string(html_template, version=VERSION, environment=APP_ENV)
-
-
-@app.route('/health')
-def health_check():
-    """Health check endpoint for ALB target group."""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'ecs-playground',
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'version': VERSION,
-        'environment': APP_ENV,
-        'region': 'ap-northeast-1'
-    }), 200
+    return HOME_PAGE.make_response(request)
+
+
+@app.route('/static/<path:filename>')
+def static_assets(filename):
+    """Content-hashed UI assets, cacheable forever by CloudFront and browsers."""
+    if filename == MANIFEST:
+        abort(404)
+    response = send_from_directory(STATIC_DIR, filename, max_age=STATIC_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+# Health probes. /health and /ready are answered by ProbeMiddleware ahead of
+# Flask routing; the liveness body is serialized once since it never changes.
+HEALTH_BODY = app.json.dumps_bytes({
+    'status': 'healthy',
+    'service': 'ecs-playground',
+    'version': VERSION,
+    'environment': APP_ENV,
+    'region': 'ap-northeast-1'
+})
+
+
+def _rates_check():
+    """Readiness of the exchange rate snapshot; only an expired one fails."""
+    refresher = rates.refresher()
+    table = rates.current_table()
+    status = refresher.status() if refresher else 'static'
+    return {
+        'ok': status != 'expired',
+        'status': status,
+        'age_seconds': round(table.age(), 1),
+        'source': table.source,
+    }
 
 
 @app.route('/api/info')
+@responsecache.cached(ttl=60)
 def api_info():
     """API info endpoint."""
     return jsonify({
@@ -506,7 +287,18 @@ def api_info():
 
 @app.route('/api/echo', methods=['POST'])
 def echo():
-    """Echo endpoint that returns the request body."""
+    """Echo endpoint that returns the request body.
+
+    With ``?raw=true`` a JSON body is only validated: its bytes are spliced
+    into the response as they arrived, the cheapest round trip for latency
+    probes. Bodies over ECHO_MAX_KB get 413 before they are read (or inflated).
+    """
+    limit = ECHO_MAX_KB * 1024
+    if request.content_length is not None and request.content_length > limit:
+        return _body_too_large(limit)
+    if request.args.get('raw') == 'true':
+        return _raw_echo(limit)
+
     try:
         data = request.get_json() or {}
         return jsonify({
@@ -516,6 +308,8 @@ def echo():
             'region': 'ap-northeast-1',
             'service': 'ecs-playground'
         })
+    except RequestEntityTooLarge:
+        return _body_too_large(app.config['MAX_CONTENT_LENGTH'])
     except Exception as e:
         return jsonify({
             'error': str(e),
@@ -523,36 +317,69 @@ def echo():
         }), 400
 
 
+def _body_too_large(limit):
+    return jsonify({'error': f'Request body too large (max {limit} bytes)'}), 413
+
+
+def _raw_echo(limit):
+    """The echo envelope around the body as sent; the body must be valid JSON itself."""
+    if not (request.mimetype == 'application/json' or request.mimetype.endswith('+json')):
+        return jsonify({'error': 'Raw echo needs a JSON body'}), 415
+
+    if request.content_length is not None:
+        body = request.stream.read()
+    else:
+        # Chunked: read only until the body proves too large.
+        chunks, size = [], 0
+        while size <= limit:
+            chunk = request.stream.read(64 * 1024)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        if size > limit:
+            return _body_too_large(limit)
+        body = b''.join(chunks)
+    if body:
+        # Parsed only to be rejected if invalid; the original bytes go out.
+        try:
+            app.json.loads(body)
+        except ValueError:
+            return jsonify({'error': 'Invalid JSON body'}), 400
+
+    envelope = app.json.dumps_bytes({
+        'method': request.method,
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'region': 'ap-northeast-1',
+        'service': 'ecs-playground'
+    })
+    # The parts go out as they are; the body is never copied into a new buffer.
+    return app.response_class([b'{"echo":', body or b'{}', b',' + envelope.strip()[1:], b'\n'],
+                              mimetype='application/json')
+
+
 # Interactive Features
 
 @app.route('/api/currency')
+@responsecache.cached(ttl=5, key=_rates_version)
 def currency_exchange():
     """Simple currency exchange rates (mock data for demo)."""
-    # Current exchange rates relative to USD (July 2025 rates)
-    rates = {
-        'USD': 1.0,
-        'EUR': 0.8513,
-        'GBP': 0.7443,
-        'JPY': 147.65,
-        'CNY': 7.169,
-        'KRW': 1382.7,
-        'AUD': 1.523,
-        'CAD': 1.370,
-        'CHF': 0.7953,
-        'SGD': 1.281
-    }
-    
+    table = rates.current_table()
     return jsonify({
-        'base_currency': 'USD',
-        'rates': rates,
-        'last_updated': datetime.utcnow().isoformat() + 'Z',
-        'note': 'July 2025 market rates - demo purposes only',
+        'base_currency': table.base,
+        'rates': table.rates,
+        'last_updated': datetime.utcfromtimestamp(table.fetched_at).isoformat() + 'Z',
+        'age_seconds': round(table.age(), 1),
+        'status': rates.refresher().status(),
+        'source': table.source,
+        'note': table.note,
         'usage': 'GET /api/currency/convert?from=USD&to=EUR&amount=100',
         'region': 'ap-northeast-1'
     })
 
 
 @app.route('/api/currency/convert')
+@responsecache.cached(ttl=30, key=_rates_version)
 def currency_convert():
     """Convert between currencies."""
     try:
@@ -560,31 +387,130 @@ def currency_convert():
         to_currency = request.args.get('to', 'EUR').upper()
         amount = float(request.args.get('amount', 100))
         
-        # Current rates (July 2025)
-        rates = {
-            'USD': 1.0, 'EUR': 0.8513, 'GBP': 0.7443, 'JPY': 147.65,
-            'CNY': 7.169, 'KRW': 1382.7, 'AUD': 1.523, 'CAD': 1.370,
-            'CHF': 0.7953, 'SGD': 1.281
-        }
-        
-        if from_currency not in rates or to_currency not in rates:
+        table = rates.current_table()
+        if from_currency not in table or to_currency not in table:
             return jsonify({'error': 'Currency not supported'}), 400
             
-        # Convert via USD
-        usd_amount = amount / rates[from_currency]
-        converted_amount = usd_amount * rates[to_currency]
+        rate = table.rate(from_currency, to_currency)
         
         return jsonify({
             'from': {'currency': from_currency, 'amount': amount},
-            'to': {'currency': to_currency, 'amount': round(converted_amount, 2)},
-            'rate': round(rates[to_currency] / rates[from_currency], 4),
+            'to': {'currency': to_currency, 'amount': round(amount * rate, 2)},
+            'rate': round(rate, 4),
             'timestamp': datetime.utcnow().isoformat() + 'Z'
         })
     except (ValueError, TypeError):
         return jsonify({'error': 'Invalid amount provided'}), 400
 
 
+def _amount_column(values):
+    """Coerce amounts to finite floats, with None for invalid elements."""
+    column = []
+    for value in values:
+        try:
+            amount = float(value)
+        except (ValueError, TypeError, OverflowError):  # OverflowError: ints past float range
+            amount = None
+        column.append(amount if amount is not None and math.isfinite(amount) else None)
+    return column
+
+
+@app.route('/api/currency/convert/batch', methods=['POST'])
+def currency_convert_batch():
+    """Convert many amounts in one request using the precomputed cross rates.
+
+    Either ``{"conversions": [{"from", "to", "amount"}, ...]}``, answered
+    with aligned ``results`` and an ``error_mask`` (true = unsupported
+    currency or invalid amount), or ``{"from": "USD", "amount": 100}`` to
+    convert one amount into every supported currency.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+
+    table = rates.current_table()
+
+    if 'conversions' not in data:
+        from_currency = str(data.get('from', 'USD')).upper()
+        amounts = _amount_column([data.get('amount', 100)])
+        if from_currency not in table:
+            return jsonify({'error': 'Currency not supported'}), 400
+        if amounts[0] is None:
+            return jsonify({'error': 'Invalid amount provided'}), 400
+        converted = table.convert_all(from_currency, amounts[0])
+        return jsonify({
+            'from': {'currency': from_currency, 'amount': amounts[0]},
+            'to': {currency: round(value, 2) for currency, value in converted.items()},
+            'timestamp': datetime.utcnow().isoformat() + 'Z'
+        })
+
+    rows = data['conversions']
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        return jsonify({'error': 'conversions must be a list of objects'}), 400
+    if len(rows) > CURRENCY_MAX_BATCH:
+        return jsonify({
+            'error': f'Batch too large: {len(rows)} items (max {CURRENCY_MAX_BATCH})'
+        }), 413
+
+    results = table.convert_many(
+        [str(row.get('from', '')).upper() for row in rows],
+        [str(row.get('to', '')).upper() for row in rows],
+        _amount_column(row.get('amount') for row in rows),
+    )
+    error_mask = [result is None for result in results]
+    return jsonify({
+        'count': len(results),
+        'errors': sum(error_mask),
+        'results': [round(r, 2) if r is not None else None for r in results],
+        'error_mask': error_mask,
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+
+# Calculator operations. Each returns None for inputs outside its domain.
+CALCULATOR_OPERATIONS = {
+    'add': lambda a, b: a + b,
+    'subtract': lambda a, b: a - b,
+    'multiply': lambda a, b: a * b,
+    'divide': lambda a, b: a / b if b != 0 else None,
+    'power': lambda a, b: pow(a, b),
+    'sqrt': lambda a, b: math.sqrt(a) if a >= 0 else None,
+    'log': lambda a, b: math.log(a) if a > 0 else None
+}
+UNARY_OPERATIONS = ('sqrt', 'log')
+
+
+def _calculate(operation, a, b):
+    """Evaluate one operation, or None if it is invalid for these inputs."""
+    try:
+        result = CALCULATOR_OPERATIONS[operation](a, b)
+    except (ArithmeticError, ValueError):
+        return None
+    # pow() of a negative base with a fractional exponent is complex, and
+    # overflowing floats are not representable in JSON
+    if not isinstance(result, float | int) or not math.isfinite(result):
+        return None
+    return result
+
+
+def _calculate_column(operation, a_values, b_values):
+    """Evaluate one operation over aligned columns of inputs in a single pass."""
+    return [_calculate(operation, a, b) for a, b in zip(a_values, b_values)]
+
+
+def _to_float_column(values):
+    """Coerce a column to floats, with None for elements that are not numbers."""
+    column = []
+    for value in values:
+        try:
+            column.append(float(value))
+        except (ValueError, TypeError, OverflowError):  # OverflowError: ints past float range
+            column.append(None)
+    return column
+
+
 @app.route('/api/calculator', methods=['POST'])
+@resultcache.memoized
 def calculator():
     """Simple calculator for basic operations."""
     try:
@@ -593,135 +519,446 @@ def calculator():
         a = float(data.get('a', 0))
         b = float(data.get('b', 0))
         
-        operations = {
-            'add': a + b,
-            'subtract': a - b,
-            'multiply': a * b,
-            'divide': a / b if b != 0 else None,
-            'power': pow(a, b),
-            'sqrt': math.sqrt(a) if a >= 0 else None,
-            'log': math.log(a) if a > 0 else None
-        }
-        
-        if operation not in operations:
+        if operation not in CALCULATOR_OPERATIONS:
             return jsonify({
                 'error': 'Invalid operation',
-                'supported': list(operations.keys())
+                'supported': list(CALCULATOR_OPERATIONS)
             }), 400
             
-        result = operations[operation]
+        result = _calculate(operation, a, b)
         if result is None:
             return jsonify({'error': 'Invalid calculation (division by zero, negative sqrt, etc.)'}), 400
             
         return jsonify({
             'operation': operation,
-            'inputs': {'a': a, 'b': b} if operation not in ['sqrt', 'log'] else {'a': a},
+            'inputs': {'a': a, 'b': b} if operation not in UNARY_OPERATIONS else {'a': a},
             'result': result,
             'timestamp': datetime.utcnow().isoformat() + 'Z'
         })
-    except (ValueError, TypeError) as e:
+    except (ValueError, TypeError, OverflowError) as e:
         return jsonify({'error': f'Invalid input: {str(e)}'}), 400
 
 
+@app.route('/api/calculator/batch', methods=['POST'])
+def calculator_batch():
+    """Evaluate many calculations in one request.
+
+    Accepts either rows, ``{"operations": [{"operation", "a", "b"}, ...]}``,
+    or columns for a single operation, ``{"operation": "add", "a": [...],
+    "b": [...]}`` where ``b`` may also be a scalar. Rows are grouped by
+    operation and each group is evaluated as one column. ``error_mask`` is
+    true where an element is invalid and its ``result`` is null.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+
+    if 'operations' in data:
+        rows = data['operations']
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            return jsonify({'error': 'operations must be a list of objects'}), 400
+        operations = [row.get('operation') if isinstance(row.get('operation'), str) else None
+                      for row in rows]
+        a_values = [row.get('a', 0) for row in rows]
+        b_values = [row.get('b', 0) for row in rows]
+    else:
+        operation = data.get('operation')
+        a_values = data.get('a')
+        b_values = data.get('b', 0)
+        if operation not in CALCULATOR_OPERATIONS:
+            return jsonify({
+                'error': 'Invalid operation',
+                'supported': list(CALCULATOR_OPERATIONS)
+            }), 400
+        if not isinstance(a_values, list):
+            return jsonify({'error': 'a must be a list of numbers'}), 400
+        if not isinstance(b_values, list):
+            b_values = [b_values] * len(a_values)
+        if len(b_values) != len(a_values):
+            return jsonify({'error': 'a and b must have the same length'}), 400
+        operations = [operation] * len(a_values)
+
+    count = len(operations)
+    if count > CALCULATOR_MAX_BATCH:
+        return jsonify({
+            'error': f'Batch too large: {count} items (max {CALCULATOR_MAX_BATCH})'
+        }), 413
+
+    a_values = _to_float_column(a_values)
+    b_values = _to_float_column(b_values)
+
+    # Group element indices by operation so each operation runs as one column.
+    groups = {}
+    for index, operation in enumerate(operations):
+        groups.setdefault(operation, []).append(index)
+
+    results = [None] * count
+    for operation, indices in groups.items():
+        if operation not in CALCULATOR_OPERATIONS:
+            continue
+        valid = [i for i in indices
+                 if a_values[i] is not None and b_values[i] is not None]
+        column = _calculate_column(
+            operation, [a_values[i] for i in valid], [b_values[i] for i in valid]
+        )
+        for index, result in zip(valid, column):
+            results[index] = result
+
+    error_mask = [result is None for result in results]
+    return jsonify({
+        'count': count,
+        'errors': sum(error_mask),
+        'results': results,
+        'error_mask': error_mask,
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+
+def _selection(value, allowed):
+    """Names selected by a list or comma-separated string; all of them if omitted."""
+    if value is None:
+        return tuple(allowed)
+    if isinstance(value, str):
+        value = [name.strip() for name in value.split(',') if name.strip()]
+    if not isinstance(value, list) or any(name not in allowed for name in value):
+        raise ValueError(f'Expected a list of: {", ".join(allowed)}')
+    return tuple(dict.fromkeys(value))
+
+
 @app.route('/api/text-utils', methods=['POST'])
+@resultcache.memoized
 def text_utils():
-    """Text utilities like word count, character count, etc."""
+    """Text utilities like word count, character count, etc.
+
+    JSON bodies may narrow the output with ``stats`` and ``transformations``
+    lists and drop the echoed input with ``"include_original": false``.
+    A ``text/plain`` body (optionally chunked) is processed as a stream in
+    one pass instead; ``?stats=`` and ``?transformations=`` select the
+    output, which is streamed back as NDJSON lines.
+    """
+    if request.mimetype == 'text/plain':
+        return _text_utils_stream()
+
     try:
         data = request.get_json() or {}
         text = data.get('text', '')
         
         if not isinstance(text, str):
             return jsonify({'error': 'Text must be a string'}), 400
-            
-        return jsonify({
-            'original_text': text,
-            'stats': {
-                'characters': len(text),
-                'characters_no_spaces': len(text.replace(' ', '')),
-                'words': len(text.split()),
-                'lines': len(text.splitlines()),
-                'sentences': len([s for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()])
-            },
-            'transformations': {
-                'uppercase': text.upper(),
-                'lowercase': text.lower(),
-                'title_case': text.title(),
-                'reversed': text[::-1]
-            },
-            'timestamp': datetime.utcnow().isoformat() + 'Z'
-        })
+
+        try:
+            stats = _selection(data.get('stats'), textstream.STATS)
+            transformations = _selection(data.get('transformations'), textstream.TRANSFORMATIONS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        response = {}
+        if data.get('include_original', True):
+            response['original_text'] = text
+        response['stats'], response['transformations'] = offload.text_utils(
+            offloader, text, stats, transformations, label=request.path
+        )
+        response['timestamp'] = datetime.utcnow().isoformat() + 'Z'
+        return jsonify(response)
+    except offload.Rejected as e:
+        return _offload_error(e)
     except Exception as e:
         return jsonify({'error': f'Processing error: {str(e)}'}), 400
 
 
+def _text_utils_stream():
+    """Single-pass text-utils over a text/plain request stream."""
+    try:
+        stats = _selection(request.args.get('stats'), textstream.STATS)
+        transformations = _selection(request.args.get('transformations', ''),
+                                     textstream.TRANSFORMATIONS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    lines = textstream.stream_text_utils(
+        request.stream, stats, transformations,
+        timestamp=datetime.utcnow().isoformat() + 'Z',
+    )
+    return app.response_class(_body_errors_as_lines(lines), mimetype='application/x-ndjson')
+
+
+def _body_errors_as_lines(lines):
+    """End an NDJSON stream with an error line when reading the body fails mid-stream.
+
+    Chunked bodies past MAX_CONTENT_LENGTH_MB and corrupt gzip bodies are
+    only found out once the response has started.
+    """
+    try:
+        yield from lines
+    except HTTPException as e:
+        yield json.dumps({'error': e.description, 'status_code': e.code}) + '\n'
+
+
+def _fragment_response(key, fragment, value, rest):
+    """``{key: ..., **rest}`` with ``key`` spliced in from preserialized JSON.
+
+    Clients negotiating another wire format get ``value`` serialized instead.
+    """
+    if app.json.negotiate(request.headers.get('Accept')) != wireformats.JSON:
+        return jsonify({key: value, **rest})
+    body = quotes.splice(key, fragment, app.json.dumps_bytes(rest)) + b'\n'
+    response = app.response_class(body, mimetype='application/json')
+    if app.json.formats:
+        response.vary.add('Accept')
+    return response
+
+
 @app.route('/api/quote')
 def random_quote():
-    """Get a random inspirational quote."""
-    quotes = [
-        {"text": "The only way to do great work is to love what you do.", "author": "Steve Jobs"},
-        {"text": "Innovation distinguishes between a leader and a follower.", "author": "Steve Jobs"},
-        {"text": "Life is what happens to you while you're busy making other plans.", "author": "John Lennon"},
-        {"text": "The future belongs to those who believe in the beauty of their dreams.", "author": "Eleanor Roosevelt"},
-        {"text": "It is during our darkest moments that we must focus to see the light.", "author": "Aristotle"},
-        {"text": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "author": "Winston Churchill"},
-        {"text": "The way to get started is to quit talking and begin doing.", "author": "Walt Disney"},
-        {"text": "Don't let yesterday take up too much of today.", "author": "Will Rogers"},
-        {"text": "You learn more from failure than from success.", "author": "Unknown"},
-        {"text": "If you are working on something exciting that you really care about, you don't have to be pushed.", "author": "Steve Jobs"},
-        {"text": "Code is like humor. When you have to explain it, it's bad.", "author": "Cory House"},
-        {"text": "First, solve the problem. Then, write the code.", "author": "John Johnson"},
-        {"text": "The best error message is the one that never shows up.", "author": "Thomas Fuchs"}
-    ]
-    
-    quote = random.choice(quotes)
-    return jsonify({
-        'quote': quote,
-        'total_quotes': len(quotes),
+    """Get a random inspirational quote.
+
+    ``author`` and ``q`` (keywords) narrow the pick; ``seed`` makes it
+    deterministic, e.g. ``?seed=2024-06-01`` for a quote of the day.
+    """
+    ids = quote_store.matching(request.args.get('q'), request.args.get('author'))
+    quote = quote_store.pick(ids, seed=request.args.get('seed') or None)
+    if quote is None:
+        return jsonify({'error': 'No quote matches the filters'}), 404
+    return _fragment_response('quote', quote.fragment, quotes.as_dict(quote), {
+        'total_quotes': len(quote_store),
         'timestamp': datetime.utcnow().isoformat() + 'Z',
         'region': 'ap-northeast-1'
     })
 
 
+@app.route('/api/quote/search')
+def search_quotes():
+    """Quotes containing every keyword of ``q`` by an author matching ``author``."""
+    query, author = request.args.get('q', ''), request.args.get('author', '')
+    if not query.strip() and not author.strip():
+        return jsonify({'error': 'Give q (keywords) and/or author'}), 400
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    limit = min(max(limit, 1), 100)
+
+    ids = quote_store.matching(query, author)
+    found = [quote_store.quotes[i] for i in ids[:limit]]
+    fragment = b'[' + b','.join(quote.fragment for quote in found) + b']'
+    return _fragment_response('results', fragment, [quotes.as_dict(q) for q in found], {
+        'query': {'q': query, 'author': author},
+        'count': len(ids),
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    })
+
+
+@app.route('/api/quote/authors')
+@responsecache.cached(ttl=3600)
+def quote_authors():
+    """Authors in the quote store, most quoted first."""
+    return jsonify({'authors': quote_store.authors, 'total_quotes': len(quote_store)})
+
+
+@app.route('/api/quote/stream')
+def quote_stream():
+    """Server-Sent Events: the current quote, then a new one every interval.
+
+    Streams end after QUOTE_STREAM_DURATION seconds or when the task starts
+    draining; EventSource reconnects by itself (to another task if needed).
+    Under asgi the bridge serves this route on its event loop instead.
+    """
+    if not QUOTE_STREAM:
+        abort(404)
+    stream = quote_feed.subscribe(QUOTE_STREAM_DURATION, stop=drain.draining)
+    if stream is None:
+        response = jsonify({'error': 'Too many quote streams on this worker, retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    return app.response_class(stream, mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache'})
+
+
 @app.route('/api/encoder', methods=['POST'])
+@resultcache.memoized
 def encoder_decoder():
-    """Base64 encoder and decoder."""
+    """Base64 encoder and decoder.
+
+    ``variant`` selects ``base64`` (default), ``base64url`` or ``hex``. An
+    ``application/octet-stream`` body is encoded or decoded as a raw stream
+    instead (``?operation=&variant=``), which also handles binary data.
+    """
+    if request.mimetype == 'application/octet-stream':
+        return _encoder_stream()
+
     try:
         data = request.get_json() or {}
         text = data.get('text', '')
         operation = data.get('operation', 'encode')  # 'encode' or 'decode'
+        variant = data.get('variant', 'base64')
         
         if not isinstance(text, str):
             return jsonify({'error': 'Text must be a string'}), 400
-            
+        if variant not in encoders.CODECS:
+            return jsonify({
+                'error': 'Invalid variant',
+                'supported': list(encoders.CODECS)
+            }), 400
+        run = lambda data: offload.run_codec(offloader, variant, operation, data, label=request.path)
+
         if operation == 'encode':
-            encoded = base64.b64encode(text.encode('utf-8')).decode('utf-8')
+            encoded = run(text.encode('utf-8')).decode('utf-8')
             return jsonify({
                 'operation': 'encode',
+                'variant': variant,
                 'original': text,
                 'result': encoded,
                 'timestamp': datetime.utcnow().isoformat() + 'Z'
             })
         elif operation == 'decode':
             try:
-                decoded = base64.b64decode(text.encode('utf-8')).decode('utf-8')
+                decoded = run(text.encode('utf-8'))
+            except ValueError:
+                return jsonify({'error': f'Invalid {variant} string'}), 400
+            try:
+                decoded = decoded.decode('utf-8')
+            except UnicodeDecodeError:
                 return jsonify({
-                    'operation': 'decode',
-                    'original': text,
-                    'result': decoded,
-                    'timestamp': datetime.utcnow().isoformat() + 'Z'
-                })
-            except Exception:
-                return jsonify({'error': 'Invalid base64 string'}), 400
+                    'error': 'Decoded data is binary, not UTF-8 text; '
+                             'send it as application/octet-stream to get the raw bytes'
+                }), 400
+            return jsonify({
+                'operation': 'decode',
+                'variant': variant,
+                'original': text,
+                'result': decoded,
+                'timestamp': datetime.utcnow().isoformat() + 'Z'
+            })
         else:
             return jsonify({
                 'error': 'Invalid operation',
                 'supported': ['encode', 'decode']
             }), 400
             
+    except offload.Rejected as e:
+        return _offload_error(e)
     except Exception as e:
         return jsonify({'error': f'Processing error: {str(e)}'}), 400
 
 
+def _offload_error(error):
+    """JSON response for a job the offload pool rejected or cut off."""
+    response = jsonify({'error': str(error)})
+    response.status_code = error.status
+    if error.retry_after:
+        response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def _encoder_stream():
+    """Encode or decode a raw application/octet-stream body chunk by chunk."""
+    operation = request.args.get('operation', 'encode')
+    variant = request.args.get('variant', 'base64')
+    if operation not in ('encode', 'decode'):
+        return jsonify({'error': 'Invalid operation', 'supported': ['encode', 'decode']}), 400
+    if variant not in encoders.CODECS:
+        return jsonify({'error': 'Invalid variant', 'supported': list(encoders.CODECS)}), 400
+
+    codec = encoders.CODECS[variant]
+    process = encoders.stream_encode if operation == 'encode' else encoders.stream_decode
+    chunks = process(request.stream, codec)
+
+    # Decode the first chunk up front so malformed input still gets a 400.
+    # Errors further into the stream abort the response mid-body.
+    try:
+        first = next(chunks, b'')
+    except ValueError:
+        return jsonify({'error': f'Invalid {variant} data'}), 400
+
+    return app.response_class(
+        itertools.chain([first], chunks), mimetype='application/octet-stream'
+    )
+
+
+# Cache administration
+
+def _authorized(token):
+    """Whether the request carries ``Authorization: Bearer <token>``, compared in constant time."""
+    header = request.headers.get('Authorization', '').encode('latin-1')
+    return hmac.compare_digest(header, f'Bearer {token}'.encode('utf-8'))
+
+
+@app.route('/api/cache', methods=['GET', 'DELETE'])
+def cache_admin():
+    """This worker's cache statistics (GET) or task-wide invalidation (DELETE).
+
+    Requires ``Authorization: Bearer $CACHE_ADMIN_TOKEN``; without a
+    configured token the route does not exist.
+    """
+    if not CACHE_ADMIN_TOKEN:
+        abort(404)
+    if not _authorized(CACHE_ADMIN_TOKEN):
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    if request.method == 'DELETE':
+        generation = cache_generation.bump()
+        return jsonify({
+            'invalidated': True,
+            'generation': generation,
+            'note': f'All workers drop cached entries within {cache_generation.interval:g}s',
+        })
+
+    return jsonify({
+        'pid': os.getpid(),
+        'response_cache': dict(cache.stats(), backend=RESPONSE_CACHE),
+        'result_cache': result_cache.stats() if result_cache else None,
+    })
+
+
+# Profiling
+
+def _profile_query():
+    """(seconds, route, None) for a /debug/profile request, or (None, None, error response).
+
+    Outside development the caller needs ``Authorization: Bearer $PROFILE_TOKEN``;
+    with profiling off, or no token configured there, the routes do not exist.
+    """
+    if profiling is None or (APP_ENV != 'development' and not PROFILE_TOKEN):
+        abort(404)
+    if APP_ENV != 'development' and not _authorized(PROFILE_TOKEN):
+        return None, None, (jsonify({'error': 'Unauthorized'}), 401)
+    try:
+        seconds = max(float(request.args.get('seconds', 60)), 0)
+    except ValueError:
+        return None, None, (jsonify({'error': 'seconds must be a number'}), 400)
+    return seconds, request.args.get('route') or None, None
+
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Task-wide collapsed stacks of sampled requests over the last ``seconds``.
+
+    One ``frame;frame;frame count`` line per stack, ready for flamegraph.pl
+    or speedscope; ``route`` keeps only one route's stacks.
+    """
+    seconds, route, error = _profile_query()
+    if error:
+        return error
+    stacks = profiling.profile(seconds, route)
+    body = ''.join(f'{line}\n' for line in profiler.collapsed_lines(stacks))
+    response = app.response_class(body, mimetype='text/plain')
+    response.headers['X-Profile-Samples'] = str(sum(stacks.values()))
+    return response
+
+
+@app.route('/debug/profile/slow')
+def debug_profile_slow():
+    """Task-wide slow requests of the last ``seconds``, slowest first, with their stacks."""
+    seconds, route, error = _profile_query()
+    if error:
+        return error
+    return jsonify({
+        'threshold_ms': PROFILE_SLOW_MS,
+        'requests': profiling.slow_requests(seconds, route),
+    })
+
+
 @app.errorhandler(404)
 def not_found(error):
     """Custom 404 handler."""
@@ -734,6 +971,18 @@ def not_found(error):
     }), 404
 
 
+@app.errorhandler(413)
+def too_large(error):
+    """JSON 413 for bodies past MAX_CONTENT_LENGTH_MB."""
+    return jsonify({
+        'error': 'Payload Too Large',
+        'message': f"Request bodies are limited to {app.config['MAX_CONTENT_LENGTH']} bytes",
+        'status_code': 413,
+        'region': 'ap-northeast-1',
+        'timestamp': datetime.utcnow().isoformat() + 'Z'
+    }), 413
+
+
 @app.errorhandler(500)
 def internal_error(error):
     """Custom 500 handler."""
@@ -746,13 +995,135 @@ def internal_error(error):
     }), 500
 
 
+# Long-lived responses bounded by their own caps: admission control, in-flight
+# accounting, the profiler's slow captures and slow access logging leave them out.
+STREAMING_ROUTES = ('/api/quote/stream',)
+
+# CPU- or body-heavy routes; admission control gives them only part of a worker.
+# /api/echo stays light: latency probes measure it and must not be shed with the rest.
+HEAVY_ROUTES = (
+    '/api/text-utils',
+    '/api/encoder',
+    '/api/calculator/batch',
+    '/api/currency/convert/batch',
+)
+
+# Routes with a tighter body limit than MAX_CONTENT_LENGTH_MB: compression stops
+# inflating and the asgi bridge stops reading at it, so 413 comes before the work.
+BODY_LIMITS = {'/api/echo': ECHO_MAX_KB * 1024}
+
+# Middleware, outermost first: probes answer /health and /ready without
+# touching the rest; the access log (when enabled) queues a record for the
+# requests it samples; the profiler (when enabled) tracks requests for its stack
+# sampler; metrics time everything else, including /metrics scrapes;
+# compression encodes responses and inflates gzip request bodies, outside the
+# caches so they hold one uncompressed copy; the response cache answers hits on
+# @responsecache.cached views and the result cache replays @resultcache.memoized
+# views, both before Flask; admission control then caps what actually reaches
+# Flask, so cheap cache hits are still served under overload.
+# Cached GET responses carry the timestamp of the request that produced them.
+admission_control = app.wsgi_app = admission.AdmissionMiddleware(
+    app.wsgi_app,
+    app.url_map,
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    heavy_paths=HEAVY_ROUTES,
+    heavy_share=ADMISSION_HEAVY_SHARE,
+    port=PORT,
+    max_queue=ADMISSION_MAX_QUEUE,
+    max_wait=ADMISSION_MAX_WAIT,
+    rate=RATE_LIMIT_RPS,
+    burst=RATE_LIMIT_BURST,
+    trusted_hops=TRUSTED_PROXY_HOPS,
+    exempt_paths=STREAMING_ROUTES,
+)
+result_cache = None
+if RESULT_CACHE_MB > 0:
+    result_cache = app.wsgi_app = resultcache.ResultCache(
+        app.wsgi_app,
+        app,
+        cache_generation,
+        max_bytes=RESULT_CACHE_MB * 1024 * 1024,
+        max_entries=RESULT_CACHE_ENTRIES,
+        max_entry_bytes=RESULT_CACHE_MAX_ENTRY_KB * 1024,
+    )
+cache = app.wsgi_app = responsecache.ResponseCache(
+    app.wsgi_app,
+    app,
+    responsecache.create_backend(RESPONSE_CACHE, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_PATH),
+    generation=cache_generation,
+)
+if COMPRESSION_ENCODINGS:
+    app.wsgi_app = compression.CompressionMiddleware(
+        app.wsgi_app,
+        min_size=COMPRESSION_MIN_SIZE,
+        encodings=COMPRESSION_ENCODINGS,
+        max_inflated=COMPRESSION_MAX_INFLATED_MB * 1024 * 1024,
+        body_limits=BODY_LIMITS,
+    )
+app.wsgi_app = metrics.MetricsMiddleware(
+    app.wsgi_app,
+    app.url_map,
+    directory=METRICS_DIR,
+    emf_interval=METRICS_EMF_INTERVAL,
+    writer=log_writer,
+    token=METRICS_TOKEN,
+    counters={
+        'response_cache_hits': lambda: cache.stats()['hits'],
+        'response_cache_misses': lambda: cache.stats()['misses'],
+        'result_cache_hits': lambda: result_cache.stats()['hits'] if result_cache else {},
+        'result_cache_misses': lambda: result_cache.stats()['misses'] if result_cache else {},
+        'admission_shed': lambda: admission_control.stats()['shed'],
+        'admission_rate_limited': lambda: admission_control.stats()['rate_limited'],
+        'offload_jobs': lambda: offloader.stats()['jobs'],
+        'offload_rejected': lambda: offloader.stats()['rejected'],
+        'offload_timeouts': lambda: offloader.stats()['timeouts'],
+        'log_lines': lambda: log_writer.stats()['written'],
+        'log_dropped': lambda: log_writer.stats()['dropped'],
+    },
+)
+profiling = None
+if PROFILING and profiler.supported():
+    profiling = app.wsgi_app = profiler.ProfilerMiddleware(
+        app.wsgi_app,
+        app.url_map,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        interval=PROFILE_INTERVAL_MS / 1000,
+        slow_threshold=PROFILE_SLOW_MS / 1000,
+        window=PROFILE_WINDOW,
+        directory=PROFILE_DIR,
+        exclude_paths=STREAMING_ROUTES,
+    )
+if ACCESS_LOG:
+    app.wsgi_app = jsonlog.AccessLogMiddleware(
+        app.wsgi_app,
+        app.url_map,
+        log_writer,
+        sample_rate=ACCESS_LOG_SAMPLE,
+        route_rates=ACCESS_LOG_ROUTES,
+        slow_threshold=ACCESS_LOG_SLOW_MS / 1000,
+        streaming_routes=STREAMING_ROUTES,
+    )
+probes = app.wsgi_app = ProbeMiddleware(
+    app.wsgi_app,
+    HEALTH_BODY,
+    capacity=WORKER_CAPACITY,
+    port=PORT,
+    max_queue=READY_MAX_QUEUE,
+    checks={'rates': _rates_check},
+    drain=drain,
+    untracked_paths=STREAMING_ROUTES,
+)
+
+
 if __name__ == '__main__':
     print(f"🚀 Starting ECS Playground app on port {PORT}")
     print(f"🌏 Region: Tokyo (ap-northeast-1)")
     print(f"🏷️  Environment: {APP_ENV}")
     print(f"📦 Version: {VERSION}")
     print(f"🐍 Python: 3.12")
-    
+
+    drain.clear()
+    lifecycle.install_signal_handler(drain, probes, DRAIN_DELAY, DRAIN_TIMEOUT)
     app.run(
         host='0.0.0.0',
         port=PORT,
@@ -0,0 +1,280 @@
+"""
+ASGI entry point for ECS Playground.
+
+Serves the same Flask app (handlers, probes and metrics included) from an
+asyncio event loop, e.g. under uvicorn:
+
+    uvicorn asgi:app --port 5000
+    GUNICORN_PROFILE=asgi gunicorn -c gunicorn.conf.py
+
+The event loop owns every connection: it reads request bodies and writes
+responses, so slow or idle keep-alive clients cost no thread. A request
+only takes one of ``threads`` pool threads once its body has fully arrived,
+for as long as the Flask handler runs. Bodies are spooled to a temporary
+file past ``spool_size`` bytes; bodies past the app's MAX_CONTENT_LENGTH get
+413 from the event loop, without being read when Content-Length announces
+them.
+
+The quote feed's Server-Sent Events streams are served by the event loop
+itself, one coroutine per subscriber, so an open stream never holds a pool
+thread.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool threads per process; /ready reports saturation against the same number.
+THREADS = int(os.environ.setdefault('WORKER_CAPACITY', '8'))
+# Streams cost a coroutine here, not a thread, so the live quote feed is on.
+os.environ.setdefault('QUOTE_STREAM', 'true')
+
+from app import BODY_LIMITS, QUOTE_STREAM, QUOTE_STREAM_DURATION, drain, quote_feed  # noqa: E402
+from app import app as flask_app  # noqa: E402
+
+# Responses up to this size are collected in the pool thread and sent in one
+# message; larger or unsized ones are streamed chunk by chunk.
+BUFFER_SIZE = 256 * 1024
+
+# _read_body() result when the client went away before the body was complete.
+DISCONNECTED = object()
+
+
+class WSGIBridge:
+    """ASGI application that runs a WSGI app on a thread pool.
+
+    ``inline_paths`` are answered on the event loop without a thread hop;
+    they must never block (the health probes qualify). Bodies larger than
+    ``max_body`` bytes (None = unlimited), or than the ``body_limits`` entry
+    for their path, are refused with 413.
+    ``event_streams`` maps a path to a callable returning an async iterable
+    of Server-Sent Events bytes with a ``close()`` method, or None when no
+    more subscribers are taken; GETs on it never reach the WSGI app.
+    """
+
+    def __init__(self, wsgi_app, threads=8, spool_size=1024 * 1024, inline_paths=(),
+                 max_body=None, event_streams=None, body_limits=None):
+        self.wsgi_app = wsgi_app
+        self.threads = max(threads, 1)
+        self.spool_size = spool_size
+        self.max_body = max_body
+        self.body_limits = dict(body_limits or {})
+        self.event_streams = dict(event_streams or {})
+        self.inline_paths = frozenset(inline_paths)
+        self._executor = None
+        self._executor_pid = None
+
+    @property
+    def executor(self):
+        # Created lazily so a pool built before a fork is never reused.
+        if self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix='asgi')
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        open_stream = self.event_streams.get(scope['path'])
+        if open_stream is not None and scope['method'] == 'GET':
+            return await self._event_stream(open_stream(), receive, send)
+
+        max_body = self.body_limits.get(scope['path'], self.max_body)
+        body = await self._read_body(scope, receive, max_body)
+        if body is DISCONNECTED:
+            return  # nobody is left to answer; never run the app on a truncated body
+        if body is None:
+            return await self._too_large(send, max_body)
+        environ = self._environ(scope, body)
+        # Lets admission control shed requests that waited too long for a thread.
+        environ['playground.queued_at'] = time.monotonic()
+        loop = asyncio.get_running_loop()
+        if scope['path'] in self.inline_paths:
+            status, headers, content = self._run(environ, loop, send)
+        else:
+            status, headers, content = await loop.run_in_executor(
+                self.executor, self._run, environ, loop, send)
+        if content is not None:
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': content})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _read_body(self, scope, receive, max_body):
+        """The spooled request body, or None when it is larger than ``max_body``.
+
+        DISCONNECTED when the client went away before sending all of it.
+        """
+        if max_body is not None:
+            for name, value in scope['headers']:
+                if name == b'content-length' and value.isdigit() and int(value) > max_body:
+                    return None
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return DISCONNECTED
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if max_body is not None and size > max_body:
+                body.close()
+                return None
+            body.write(chunk)
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body
+
+    async def _too_large(self, send, max_body):
+        await _json_error(send, 413, f'Request body too large (max {max_body} bytes)',
+                          [(b'connection', b'close')])
+
+    async def _event_stream(self, stream, receive, send):
+        if stream is None:
+            return await _json_error(send, 503, 'Too many streams on this worker, retry shortly',
+                                     [(b'retry-after', b'30')])
+
+        async def forward():
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+            ]})
+            async for chunk in stream:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+
+        async def disconnected():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        # Whichever ends first (the stream or the client) ends the other.
+        tasks = [asyncio.ensure_future(forward()), asyncio.ensure_future(disconnected())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            stream.close()
+
+    def _environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(body.seek(0, os.SEEK_END)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            # The spooled body ends at EOF, also for chunked requests, where
+            # werkzeug would otherwise ignore CONTENT_LENGTH and read nothing.
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        body.seek(0)
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                key = f'HTTP_{name}'
+                environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+    def _run(self, environ, loop, send):
+        """Run the WSGI app in the calling thread.
+
+        Returns (status, headers, body); body is None when the response was
+        already streamed through ``send``.
+        """
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'], response['headers'] = status, headers
+
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            chunks = iter(iterable)
+            # start_response may be deferred until the first chunk.
+            first = b'' if response else next(chunks, b'')
+            code = int(response['status'][:3])
+            headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                       for name, value in response['headers']]
+            length = dict(headers).get(b'content-length')
+            if length is not None and int(length) <= BUFFER_SIZE:
+                return code, headers, first + b''.join(chunks)
+
+            for chunk in itertools.chain([first], chunks):
+                if not chunk:
+                    continue
+                if not response.get('started'):
+                    send_sync({'type': 'http.response.start', 'status': code, 'headers': headers})
+                    response['started'] = True
+                send_sync({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not response.get('started'):
+                return code, headers, b''
+            send_sync({'type': 'http.response.body', 'body': b''})
+            return code, headers, None
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            environ['wsgi.input'].close()
+
+
+async def _json_error(send, status, message, headers=()):
+    body = json.dumps({'error': message}, separators=(',', ':')).encode()
+    await send({'type': 'http.response.start', 'status': status, 'headers': [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode('latin-1')),
+        *headers,
+    ]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+app = WSGIBridge(
+    flask_app.wsgi_app,
+    threads=THREADS,
+    inline_paths=('/health', '/ready'),
+    max_body=flask_app.config['MAX_CONTENT_LENGTH'],
+    body_limits=BODY_LIMITS,
+    event_streams={
+        '/api/quote/stream': lambda: quote_feed.subscribe_async(QUOTE_STREAM_DURATION,
+                                                                stop=drain.draining),
+    } if QUOTE_STREAM else None,
+)
@@ -0,0 +1,178 @@
+async function convertCurrency() {
+    const from = document.getElementById('fromCurrency').value;
+    const to = document.getElementById('toCurrency').value;
+    const amount = document.getElementById('amount').value;
+
+    try {
+        const response = await fetch(`/api/currency/convert?from=${from}&to=${to}&amount=${amount}`);
+        const data = await response.json();
+
+        const resultDiv = document.getElementById('currencyResult');
+        if (response.ok) {
+            resultDiv.innerHTML = `
+                <strong>Conversion Result:</strong><br>
+                ${data.from.amount} ${data.from.currency} = 
+                <strong>${data.to.amount} ${data.to.currency}</strong><br>
+                <small>Exchange rate: 1 ${data.from.currency} = ${data.rate} ${data.to.currency}</small>
+            `;
+        } else {
+            resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
+        }
+        resultDiv.classList.add('show');
+    } catch (error) {
+        document.getElementById('currencyResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
+        document.getElementById('currencyResult').classList.add('show');
+    }
+}
+
+async function calculate() {
+    const operation = document.getElementById('operation').value;
+    const a = parseFloat(document.getElementById('numberA').value);
+    const b = parseFloat(document.getElementById('numberB').value);
+
+    try {
+        const response = await fetch('/api/calculator', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ operation, a, b })
+        });
+        const data = await response.json();
+
+        const resultDiv = document.getElementById('calcResult');
+        if (response.ok) {
+            const inputs = operation === 'sqrt' || operation === 'log' ? 
+                `${operation}(${a})` : `${a} ${operation} ${b}`;
+            resultDiv.innerHTML = `
+                <strong>Calculation:</strong><br>
+                ${inputs} = <strong>${data.result}</strong>
+            `;
+        } else {
+            resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
+        }
+        resultDiv.classList.add('show');
+    } catch (error) {
+        document.getElementById('calcResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
+        document.getElementById('calcResult').classList.add('show');
+    }
+}
+
+async function analyzeText() {
+    const text = document.getElementById('textInput').value;
+
+    try {
+        const response = await fetch('/api/text-utils', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ text })
+        });
+        const data = await response.json();
+
+        const resultDiv = document.getElementById('textResult');
+        if (response.ok) {
+            resultDiv.innerHTML = `
+                <strong>Text Analysis:</strong><br>
+                • Characters: ${data.stats.characters}<br>
+                • Characters (no spaces): ${data.stats.characters_no_spaces}<br>
+                • Words: ${data.stats.words}<br>
+                • Lines: ${data.stats.lines}<br>
+                • Sentences: ${data.stats.sentences}<br><br>
+                <strong>Transformations:</strong><br>
+                • Uppercase: ${data.transformations.uppercase}<br>
+                • Lowercase: ${data.transformations.lowercase}<br>
+                • Title Case: ${data.transformations.title_case}<br>
+                • Reversed: ${data.transformations.reversed}
+            `;
+        } else {
+            resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
+        }
+        resultDiv.classList.add('show');
+    } catch (error) {
+        document.getElementById('textResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
+        document.getElementById('textResult').classList.add('show');
+    }
+}
+
+function showQuote(quote) {
+    document.getElementById('quoteText').textContent = `"${quote.text}"`;
+    document.getElementById('quoteAuthor').textContent = `— ${quote.author}`;
+    document.getElementById('quoteDisplay').style.display = 'block';
+}
+
+async function getRandomQuote() {
+    try {
+        const response = await fetch('/api/quote');
+        const data = await response.json();
+
+        if (response.ok) {
+            showQuote(data.quote);
+        }
+    } catch (error) {
+        console.error('Error fetching quote:', error);
+    }
+}
+
+// Live quotes: the server pushes a new one every few seconds. EventSource
+// reconnects by itself when a stream ends; if the server turns it away
+// (too many streams), show a single quote and try again later.
+function followQuoteStream() {
+    if (!window.EventSource) {
+        getRandomQuote();
+        return;
+    }
+    const stream = new EventSource('/api/quote/stream');
+    stream.addEventListener('quote', event => showQuote(JSON.parse(event.data).quote));
+    stream.onerror = () => {
+        if (stream.readyState === EventSource.CLOSED) {
+            getRandomQuote();
+            setTimeout(followQuoteStream, 30000);
+        }
+    };
+}
+
+async function processBase64() {
+    const operation = document.getElementById('encodeOperation').value;
+    const text = document.getElementById('encodeText').value;
+
+    try {
+        const response = await fetch('/api/encoder', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ operation, text })
+        });
+        const data = await response.json();
+
+        const resultDiv = document.getElementById('encodeResult');
+        if (response.ok) {
+            resultDiv.innerHTML = `
+                <strong>${operation === 'encode' ? 'Encoded' : 'Decoded'} Result:</strong><br>
+                <pre>${data.result}</pre>
+            `;
+        } else {
+            resultDiv.innerHTML = `<strong>Error:</strong> ${data.error}`;
+        }
+        resultDiv.classList.add('show');
+    } catch (error) {
+        document.getElementById('encodeResult').innerHTML = `<strong>Error:</strong> ${error.message}`;
+        document.getElementById('encodeResult').classList.add('show');
+    }
+}
+
+// Update operation labels based on selection
+document.getElementById('operation').addEventListener('change', function() {
+    const operation = this.value;
+    const numberBDiv = document.getElementById('numberB').parentElement;
+    if (operation === 'sqrt' || operation === 'log') {
+        numberBDiv.style.display = 'none';
+    } else {
+        numberBDiv.style.display = 'block';
+    }
+});
+
+// Follow the live quote feed from page load where the server offers it
+window.addEventListener('load', () => {
+    if (document.body.dataset.quoteStream === 'on') {
+        followQuoteStream();
+    } else {
+        getRandomQuote();
+    }
+});
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Build content-hashed static assets for the ECS Playground UI.
+
+Copies every file in assets/ to static/<name>.<hash>.<ext> and writes
+static/manifest.json mapping logical names to the hashed URLs. Hashed files
+never change, so CloudFront and browsers can cache /static/* for a year.
+
+    python build_assets.py
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 12
+
+
+def hashed_name(filename, content):
+    """'playground.css' -> 'playground.<hash>.css' for the given content."""
+    stem, ext = os.path.splitext(filename)
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return f'{stem}.{digest}{ext}'
+
+
+def _write_atomic(path, content):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def build(assets_dir=ASSETS_DIR, static_dir=STATIC_DIR, clean=True):
+    """Emit hashed copies of all assets and return the manifest.
+
+    Files are written atomically, so workers building concurrently with
+    clean=False never observe a partial asset or manifest.
+    """
+    if clean and os.path.isdir(static_dir):
+        shutil.rmtree(static_dir)
+    os.makedirs(static_dir, exist_ok=True)
+
+    manifest = {}
+    for filename in sorted(os.listdir(assets_dir)):
+        with open(os.path.join(assets_dir, filename), 'rb') as f:
+            content = f.read()
+        target = hashed_name(filename, content)
+        _write_atomic(os.path.join(static_dir, target), content)
+        manifest[filename] = f'/static/{target}'
+
+    _write_atomic(
+        os.path.join(static_dir, MANIFEST),
+        json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'),
+    )
+    return manifest
+
+
+def load_manifest(static_dir=STATIC_DIR):
+    """Manifest written by build(); builds it first when running from a bare checkout."""
+    try:
+        with open(os.path.join(static_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return build(static_dir=static_dir, clean=False)
+
+
+if __name__ == '__main__':
+    for name, url in build().items():
+        print(f'📦 {name} -> {url}')
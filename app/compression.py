@@ -0,0 +1,351 @@
+"""
+HTTP compression for ECS Playground.
+
+CompressionMiddleware negotiates ``Accept-Encoding`` (zstd, br, gzip; zstd
+and br only when their optional packages are installed) and compresses
+responses in front of the caches, so cached entries stay uncompressed and
+are shared by every encoding:
+
+- Responses with a Content-Length of at least ``min_size`` are compressed in
+  one shot and keep a Content-Length; smaller ones are sent as they are.
+- Streamed responses (no Content-Length) are compressed chunk by chunk, with
+  a flush after every chunk so NDJSON lines still reach the client as
+  they are produced.
+- Responses that already carry a Content-Encoding (e.g. the precompressed
+  home page), are not compressible types, are partial or ask for
+  ``no-transform`` pass through untouched.
+
+Request bodies sent with ``Content-Encoding: gzip`` (or zlib ``deflate``)
+are inflated before the app sees them, up to ``max_inflated`` bytes. JSON
+and form bodies are inflated up front, so they get a Content-Length again;
+other bodies (the text and octet streams) are inflated as they are read.
+"""
+
+import io
+import json
+import zlib
+
+from werkzeug.exceptions import BadRequest, HTTPException, RequestEntityTooLarge
+from werkzeug.wsgi import get_input_stream
+
+try:
+    import brotli
+except ImportError:  # optional, like in precompressed.py
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional; zstd is not offered without it
+    zstandard = None
+
+# Server preference when the client accepts several encodings with equal q.
+PREFERENCE = ('zstd', 'br', 'gzip')
+
+# Fast levels: dynamic responses are compressed on every request.
+LEVELS = {'zstd': 3, 'br': 4, 'gzip': 6}
+
+COMPRESSIBLE_TYPES = frozenset({
+    'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml', 'application/msgpack', 'application/cbor',
+})
+
+# Request bodies inflated up front; anything else is inflated while it is read.
+BUFFERED_REQUEST_TYPES = ('application/json', 'application/x-www-form-urlencoded',
+                          'application/msgpack', 'application/cbor')
+
+REQUEST_ENCODINGS = frozenset({'gzip', 'x-gzip', 'deflate'})
+
+CHUNK_SIZE = 64 * 1024
+
+
+def available_encodings():
+    """Encodings this process can produce, in preference order."""
+    installed = {'zstd': zstandard is not None, 'br': brotli is not None, 'gzip': True}
+    return tuple(name for name in PREFERENCE if installed[name])
+
+
+def compress(encoding, body, level):
+    """One-shot compression of a complete body."""
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return zstandard.ZstdCompressor(level=level).compress(body)
+
+
+class StreamCompressor:
+    """Incremental compressor; every ``compress`` call returns a decodable flush."""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'gzip':
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk):
+        c = self._compressor
+        if self.encoding == 'gzip':
+            return c.compress(chunk) + c.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == 'br':
+            return c.process(chunk) + c.flush()
+        return c.compress(chunk) + c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class InflatingStream(io.RawIOBase):
+    """Readable stream of a gzip- or zlib-compressed stream, bounded in size.
+
+    Raises BadRequest on corrupt input and RequestEntityTooLarge past ``limit``,
+    so a view reading it answers 400/413.
+    """
+
+    def __init__(self, stream, limit, chunk_size=CHUNK_SIZE):
+        self._stream = stream
+        self._limit = limit
+        self._chunk_size = chunk_size
+        self._inflater = zlib.decompressobj(32 + zlib.MAX_WBITS)  # gzip or zlib header
+        self._pending = b''
+        self._inflated = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            if self._inflater.eof:
+                return 0
+            data = self._inflater.unconsumed_tail or self._stream.read(self._chunk_size)
+            if not data:
+                raise BadRequest('Compressed request body is truncated')
+            try:
+                self._pending = self._inflater.decompress(data, self._limit - self._inflated + 1)
+            except zlib.error:
+                raise BadRequest('Malformed compressed request body') from None
+            self._inflated += len(self._pending)
+            if self._inflated > self._limit:
+                raise RequestEntityTooLarge(f'Request body inflates past {self._limit} bytes')
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _error(status, message, headers=()):
+    body = json.dumps({'error': message}, separators=(',', ':')).encode('utf-8')
+    return status, [('Content-Type', 'application/json'), ('Content-Length', str(len(body))),
+                    *headers], body
+
+
+def _media_type(headers):
+    for name, value in headers:
+        if name.lower() == 'content-type':
+            return value.split(';', 1)[0].strip().lower()
+    return ''
+
+
+def _compressible(media_type):
+    return (media_type.startswith('text/') or media_type in COMPRESSIBLE_TYPES
+            or media_type.endswith('+json') or media_type.endswith('+xml'))
+
+
+def _varying(headers):
+    """``headers`` with Accept-Encoding added to Vary."""
+    result, vary = [], None
+    for name, value in headers:
+        if name.lower() == 'vary':
+            if 'accept-encoding' in value.lower():
+                return headers
+            vary = value
+        else:
+            result.append((name, value))
+    result.append(('Vary', f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding'))
+    return result
+
+
+def _encoded_headers(headers, encoding):
+    """Response headers for the ``encoding`` representation (no Content-Length)."""
+    result = []
+    for name, value in headers:
+        lname = name.lower()
+        if lname in ('content-length', 'accept-ranges'):
+            continue
+        if lname == 'etag' and value.endswith('"'):
+            # A different representation needs a different validator.
+            value = f'{value[:-1]}-{encoding}"'
+        result.append((name, value))
+    result.append(('Content-Encoding', encoding))
+    return _varying(result)
+
+
+class CompressedStream:
+    """Response iterable compressing a streamed body, closing the original."""
+
+    def __init__(self, iterable, compressor):
+        self.iterable = iterable
+        self.compressor = compressor
+
+    def __iter__(self):
+        for chunk in self.iterable:
+            if chunk:
+                yield self.compressor.compress(chunk)
+        yield self.compressor.finish()
+
+    def close(self):
+        if hasattr(self.iterable, 'close'):
+            self.iterable.close()
+
+
+class CompressionMiddleware:
+    """Negotiated response compression and compressed request bodies."""
+
+    def __init__(self, app, min_size=1024, encodings=None, levels=None,
+                 max_inflated=32 * 1024 * 1024, body_limits=None):
+        self.app = app
+        self.min_size = min_size
+        available = available_encodings()
+        self.encodings = tuple(e for e in (encodings or available) if e in available)
+        self.levels = dict(LEVELS, **(levels or {}))
+        self.max_inflated = max_inflated
+        # path -> tighter inflated size limit
+        self.body_limits = dict(body_limits or {})
+        self._negotiated = {}  # Accept-Encoding header -> encoding or None
+        self._unsupported = _error('415 Unsupported Media Type',
+                                   'Unsupported Content-Encoding, send gzip',
+                                   [('Accept-Encoding', 'gzip')])
+
+    def negotiate(self, accept_encoding):
+        """Encoding to use for an ``Accept-Encoding`` header, or None."""
+        if not accept_encoding:
+            return None
+        encoding = self._negotiated.get(accept_encoding, False)
+        if encoding is not False:
+            return encoding
+        weights = {}
+        for item in accept_encoding.split(','):
+            name, _, params = item.strip().partition(';')
+            q = 1.0
+            params = params.strip()
+            if params.startswith('q='):
+                try:
+                    q = float(params[2:])
+                except ValueError:
+                    q = 0.0
+            weights[name.strip().lower()] = q
+        wildcard = weights.get('*', 0.0)
+        best, best_q = None, 0.0
+        for name in self.encodings:
+            q = weights.get(name, wildcard)
+            if q > best_q:
+                best, best_q = name, q
+        if len(self._negotiated) < 256:  # client headers come in a handful of variants
+            self._negotiated[accept_encoding] = best
+        return best
+
+    def __call__(self, environ, start_response):
+        content_encoding = environ.get('HTTP_CONTENT_ENCODING')
+        if content_encoding:
+            rejection = self._inflate_request(environ, content_encoding.strip().lower())
+            if rejection is not None:
+                status, headers, body = rejection
+                start_response(status, headers)
+                return [body]
+
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            # Sent as is, but another client could get it compressed: caches must know.
+            def varying_start_response(status, headers, exc_info=None):
+                if self._mode(status, headers) is not None:
+                    headers = _varying(headers)
+                return start_response(status, headers, exc_info)
+
+            return self.app(environ, varying_start_response)
+
+        plan = []
+
+        def compressing_start_response(status, headers, exc_info=None):
+            mode = self._mode(status, headers)
+            if mode == 'buffered':
+                plan[:] = [mode, status, headers, exc_info]
+                return None  # the app must not use write(); none in this stack does
+            if mode == 'stream':
+                plan[:] = [mode]
+                headers = _encoded_headers(headers, encoding)
+            return start_response(status, headers, exc_info)
+
+        iterable = self.app(environ, compressing_start_response)
+        if not plan:
+            return iterable
+        if plan[0] == 'stream':
+            return CompressedStream(iterable, StreamCompressor(encoding, self.levels[encoding]))
+
+        _, status, headers, exc_info = plan
+        try:
+            body = b''.join(iterable)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+        encoded = compress(encoding, body, self.levels[encoding])
+        if len(encoded) >= len(body):
+            start_response(status, _varying(headers), exc_info)
+            return [body]
+        headers = _encoded_headers(headers, encoding)
+        headers.append(('Content-Length', str(len(encoded))))
+        start_response(status, headers, exc_info)
+        return [encoded]
+
+    def _mode(self, status, headers):
+        """'buffered', 'stream' or None (send as is) for a response."""
+        if status[:3] in ('204', '206') or not status.startswith('2'):
+            return None
+        length = None
+        for name, value in headers:
+            lname = name.lower()
+            if lname == 'content-encoding':
+                return None
+            if lname == 'cache-control' and 'no-transform' in value.lower():
+                return None
+            if lname == 'content-length':
+                length = int(value)
+        if not _compressible(_media_type(headers)):
+            return None
+        if length is None:
+            return 'stream'
+        return 'buffered' if length >= self.min_size else None
+
+    def _inflate_request(self, environ, content_encoding):
+        """Replace a compressed wsgi.input with its inflated body; error response or None."""
+        if content_encoding == 'identity':
+            del environ['HTTP_CONTENT_ENCODING']
+            return None
+        if content_encoding not in REQUEST_ENCODINGS:
+            return self._unsupported
+        del environ['HTTP_CONTENT_ENCODING']
+        limit = self.body_limits.get(environ.get('PATH_INFO'), self.max_inflated)
+        stream = InflatingStream(get_input_stream(environ), limit)
+        buffered = environ.get('CONTENT_TYPE', '').startswith(BUFFERED_REQUEST_TYPES)
+        try:
+            if buffered:
+                body = stream.read()
+            else:
+                # Inflate the first block now so a body that is not gzip at all
+                # gets a 400; corruption further in aborts the streamed response.
+                reader = io.BufferedReader(stream, CHUNK_SIZE)
+                reader.peek(1)
+        except HTTPException as e:
+            return _error(f'{e.code} {e.name}', e.description)
+        if buffered:
+            environ['wsgi.input'] = io.BytesIO(body)
+            environ['CONTENT_LENGTH'] = str(len(body))
+        else:
+            environ['wsgi.input'] = reader
+            environ['wsgi.input_terminated'] = True
+            environ.pop('CONTENT_LENGTH', None)
+        return None
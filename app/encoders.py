@@ -0,0 +1,88 @@
+"""
+Base64 / hex codecs for ECS Playground, including chunked streaming.
+
+Streaming works on fixed-size chunks aligned to the codec's block sizes
+(3 raw bytes <-> 4 base64 characters, 1 byte <-> 2 hex digits), so any
+amount of data is processed with constant memory.
+"""
+
+import base64
+import binascii
+from collections import namedtuple
+from functools import partial
+
+# encode/decode work on bytes. decode_strict rejects anything outside the
+# alphabet; decode is decode_strict for a whole value, accepting what
+# stream_decode() does (whitespace ignored, final base64 padding optional), so
+# the JSON and streaming endpoints agree on what is valid.
+Codec = namedtuple('Codec', 'encode decode decode_strict raw_block encoded_block padded')
+
+WHITESPACE = b' \t\r\n\v\f'
+
+
+def _whole_value(decode_strict, padded):
+    def decode(data):
+        data = data.translate(None, WHITESPACE)
+        if padded:
+            data += b'=' * (-len(data) % 4)
+        return decode_strict(data)
+    return decode
+
+
+def _codec(encode, decode_strict, raw_block, encoded_block, padded):
+    return Codec(encode, _whole_value(decode_strict, padded), decode_strict,
+                 raw_block, encoded_block, padded)
+
+
+CODECS = {
+    'base64': _codec(base64.b64encode, partial(base64.b64decode, validate=True), 3, 4, True),
+    'base64url': _codec(
+        base64.urlsafe_b64encode, partial(base64.b64decode, altchars=b'-_', validate=True), 3, 4, True,
+    ),
+    'hex': _codec(binascii.hexlify, binascii.unhexlify, 1, 2, False),
+}
+
+# 48 KiB is a multiple of both 3 and 4, so full chunks need no carry-over.
+CHUNK_SIZE = 48 * 1024
+
+
+def _read_blocks(stream, block, chunk_size, transform=None):
+    """Read a stream and yield chunks whose length is a multiple of block.
+
+    The final chunk holds whatever is left over and may be shorter.
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if transform is not None:
+            chunk = transform(chunk)
+        pending += chunk
+        usable = len(pending) - len(pending) % block
+        if usable >= chunk_size:
+            yield pending[:usable]
+            pending = pending[usable:]
+    if pending:
+        yield pending
+
+
+def stream_encode(stream, codec, chunk_size=CHUNK_SIZE):
+    """Encode a byte stream chunk by chunk."""
+    chunk_size -= chunk_size % codec.raw_block
+    for chunk in _read_blocks(stream, codec.raw_block, chunk_size):
+        yield codec.encode(chunk)
+
+
+def stream_decode(stream, codec, chunk_size=CHUNK_SIZE):
+    """Decode a stream of encoded text chunk by chunk, ignoring whitespace.
+
+    Raises ValueError (binascii.Error) on data outside the codec's alphabet.
+    A missing final base64 padding is tolerated.
+    """
+    chunk_size -= chunk_size % codec.encoded_block
+    strip = lambda chunk: chunk.translate(None, WHITESPACE)
+    for chunk in _read_blocks(stream, codec.encoded_block, chunk_size, strip):
+        if codec.padded:
+            chunk += b'=' * (-len(chunk) % codec.encoded_block)
+        yield codec.decode_strict(chunk)
@@ -0,0 +1,222 @@
+"""
+Gunicorn configuration for ECS Playground.
+
+Worker counts are sized from the Fargate task's CPU/memory allocation.
+Pick a profile with GUNICORN_PROFILE (sync, gthread, gevent or asgi); every
+derived value can still be overridden through its own environment variable.
+"""
+
+import math
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value not in (None, '') else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def _read_cgroup(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def task_vcpus():
+    """vCPUs available to the task: TASK_CPU units, cgroup quota, then cpu_count."""
+    task_cpu = os.environ.get('TASK_CPU')
+    if task_cpu:
+        return int(task_cpu) / 1024
+
+    cpu_max = _read_cgroup('/sys/fs/cgroup/cpu.max')
+    if cpu_max:
+        quota, _, period = cpu_max.partition(' ')
+        if quota != 'max':
+            return int(quota) / int(period)
+
+    quota = _read_cgroup('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+    period = _read_cgroup('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+
+    return float(os.cpu_count() or 1)
+
+
+def task_memory_mb():
+    """Memory available to the task in MiB, or None when unbounded."""
+    task_memory = os.environ.get('TASK_MEMORY')
+    if task_memory:
+        return int(task_memory)
+
+    for path in ('/sys/fs/cgroup/memory.max',
+                 '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = _read_cgroup(path)
+        if limit and limit.isdigit() and int(limit) < 1 << 60:
+            return int(limit) // (1024 * 1024)
+
+    return None
+
+
+# Profiles: how many workers per vCPU and how much concurrency each worker has.
+# sync    - one request per worker, the classic (2 x vCPU) + 1 layout.
+# gthread - fewer processes, a thread pool per worker; good for mixed I/O.
+# gevent  - one process per vCPU multiplexing many keep-alive connections.
+# asgi    - one uvicorn event loop per vCPU owning the connections, with a
+#           thread pool for the Flask handlers (see asgi.py).
+PROFILES = {
+    'sync': {'worker_class': 'sync', 'workers_per_cpu': 2, 'extra_workers': 1, 'threads': 1},
+    'gthread': {'worker_class': 'gthread', 'workers_per_cpu': 1, 'extra_workers': 1, 'threads': 4},
+    'gevent': {'worker_class': 'gevent', 'workers_per_cpu': 1, 'extra_workers': 0, 'threads': 1},
+    'asgi': {'worker_class': 'uvicorn_worker.UvicornWorker', 'workers_per_cpu': 1,
+             'extra_workers': 0, 'threads': 8},
+}
+
+# Approximate resident size of one worker process running the app.
+WORKER_MEMORY_MB = _env_int('GUNICORN_WORKER_MEMORY_MB', 64)
+# Memory left to the master process and the rest of the container.
+RESERVED_MEMORY_MB = _env_int('GUNICORN_RESERVED_MEMORY_MB', 96)
+
+profile_name = os.environ.get('GUNICORN_PROFILE', 'gthread').lower()
+if profile_name not in PROFILES:
+    raise RuntimeError(
+        f"Unknown GUNICORN_PROFILE '{profile_name}', expected one of {sorted(PROFILES)}"
+    )
+
+if profile_name == 'gevent':
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        print("⚠️  gevent is not installed, falling back to the gthread profile")
+        profile_name = 'gthread'
+
+if profile_name == 'asgi':
+    try:
+        import uvicorn_worker  # noqa: F401
+    except ImportError:
+        print("⚠️  uvicorn-worker is not installed, falling back to the gthread profile")
+        profile_name = 'gthread'
+
+profile = PROFILES[profile_name]
+
+
+def default_workers():
+    """Workers for the active profile, capped by what fits in task memory."""
+    vcpus = task_vcpus()
+    workers = math.ceil(vcpus * profile['workers_per_cpu']) + profile['extra_workers']
+
+    memory_mb = task_memory_mb()
+    if memory_mb is not None:
+        workers = min(workers, (memory_mb - RESERVED_MEMORY_MB) // WORKER_MEMORY_MB)
+
+    return max(workers, 1)
+
+
+# Application: the ASGI profile serves asgi.py, every other profile wsgi.py.
+wsgi_app = 'asgi:app' if profile_name == 'asgi' else 'wsgi:app'
+
+# Server socket
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+
+# Workers
+worker_class = profile['worker_class']
+workers = _env_int('WEB_CONCURRENCY', default_workers())
+threads = _env_int('GUNICORN_THREADS', profile['threads'])
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Admission control caps concurrent requests at the thread count; a gevent
+# worker would take up to worker_connections, far more CPU-bound work than
+# one core can serve within the ALB timeout, so it gets a smaller cap.
+admission_max_in_flight = _env_int(
+    'ADMISSION_MAX_IN_FLIGHT', min(worker_connections, 100) if worker_class == 'gevent' else threads
+)
+
+# Helper processes per worker for large text-utils/encoder jobs: together the
+# workers' pools cover the task's vCPUs.
+offload_workers = _env_int('OFFLOAD_WORKERS', max(math.ceil(task_vcpus() / workers), 1))
+
+# Tell the app how many requests each worker serves at once (for /ready), its
+# admission cap and offload pool; for the asgi profile this also sizes the
+# handler thread pool.
+raw_env = [
+    f"WORKER_CAPACITY={worker_connections if worker_class == 'gevent' else threads}",
+    f"ADMISSION_MAX_IN_FLIGHT={admission_max_in_flight}",
+    f"OFFLOAD_WORKERS={offload_workers}",
+]
+
+# Heartbeat files on tmpfs so a slow overlay filesystem never stalls workers.
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+# Load the app once in the master and fork it into workers. gevent must patch
+# the standard library before the app is imported, so it never preloads.
+preload_app = _env_bool('GUNICORN_PRELOAD', profile_name != 'gevent')
+
+# Graceful recycling: restart each worker after a jittered number of requests
+# so slow leaks are bounded and workers never all restart at once.
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+
+# Shutdown (see lifecycle.py): on SIGTERM keep serving DRAIN_DELAY seconds with
+# /ready failing while the ALB finishes deregistering the task, then stop
+# accepting and give in-flight requests DRAIN_TIMEOUT seconds. ECS stopTimeout
+# must exceed their sum or the task is killed mid-drain.
+# Both may be fractional, as in app.py; gunicorn takes whole seconds, so the
+# graceful timeout is rounded up.
+drain_delay = _env_float('DRAIN_DELAY', 5)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', math.ceil(_env_float('DRAIN_TIMEOUT', 25)))
+
+# Longer than the ALB idle timeout (60s) so the ALB, not the task, closes
+# idle keep-alive connections and never reuses a half-closed socket.
+keepalive = _env_int('GUNICORN_KEEPALIVE', 75)
+
+# Logging: the app writes its own JSON access log (jsonlog.py); gunicorn's is off
+# unless GUNICORN_ACCESSLOG is set
+accesslog = os.environ.get('GUNICORN_ACCESSLOG') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def _drain_state():
+    import lifecycle
+    return lifecycle.DrainState(os.environ.get('DRAIN_STATE_PATH', lifecycle.DEFAULT_PATH))
+
+
+def on_starting(server):
+    # Drop per-worker metric snapshots and a drain flag left over from a previous run.
+    import metrics
+    metrics.reset_directory(os.environ.get('METRICS_DIR', metrics.DEFAULT_DIR))
+    _drain_state().clear()
+
+    server.log.info(
+        "🚀 Profile %s: %s workers x %s threads (%s), preload=%s, max_requests=%s",
+        profile_name, workers, threads, worker_class, preload_app, max_requests,
+    )
+
+
+def when_ready(server):
+    import lifecycle
+    lifecycle.install_gunicorn_drain(server, _drain_state(), drain_delay, graceful_timeout)
+
+
+def child_exit(server, worker):
+    # Fold the exited worker's metric snapshot into the task aggregate.
+    import metrics
+    metrics.compact(worker.pid, os.environ.get('METRICS_DIR', metrics.DEFAULT_DIR))
+
+
+def on_exit(server):
+    _drain_state().clear()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Container health probe for ECS Playground.
+
+Replaces ``curl -f`` in the Dockerfile HEALTHCHECK and the ECS container
+health check, so the image needs no curl. It only uses ``socket`` and runs
+fine under ``python -I -S`` (no site-packages), which keeps each probe at
+interpreter start-up cost:
+
+    python -I -S healthcheck.py [path]
+
+Exits 0 when GET ``path`` (default /health) on localhost:$PORT answers 2xx
+within the timeout, 1 otherwise.
+"""
+
+import os
+import socket
+import sys
+
+TIMEOUT = float(os.environ.get('HEALTHCHECK_TIMEOUT', 3))
+
+
+def probe(port, path='/health', timeout=TIMEOUT):
+    """HTTP status of GET ``path``, or None when the server does not answer."""
+    request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=timeout) as sock:
+            sock.sendall(request.encode('ascii'))
+            status_line = sock.makefile('rb').readline(256)
+    except OSError:
+        return None
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+        return None
+    return int(parts[1])
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else '/health'
+    status = probe(int(os.environ.get('PORT', 5000)), path)
+    if status is None or not 200 <= status < 300:
+        print(f'unhealthy: GET {path} -> {status}', file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,277 @@
+"""
+Structured JSON logging for ECS Playground.
+
+Every line written to stdout ends up in CloudWatch through the awslogs
+driver, so it is a JSON object CloudWatch Logs Insights can query. Nothing
+is written on the request path:
+
+- AccessLogMiddleware builds one record per logged request: a sampled
+  fraction of each route (``sample_rate``, with per-route overrides), plus
+  every 5xx and every request slower than ``slow_threshold``.
+- JSONLogHandler is a logging.Handler for the app's own warnings and errors
+  (unhandled exceptions with their traceback included).
+- Both hand their records to a LogWriter, which appends them to a bounded
+  buffer. A background thread serializes them and writes them in batches.
+  When stdout stalls and the buffer is full, new records are dropped and
+  counted instead of blocking requests.
+
+Batches are cut at PIPE_BUF bytes, so lines from different workers sharing
+the container's stdout never interleave.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import select
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime, timezone
+from time import perf_counter
+
+from metrics import RouteResolver
+
+# Writes up to this size are atomic on a pipe.
+PIPE_BUF = getattr(select, 'PIPE_BUF', 4096)
+
+
+def parse_rates(value):
+    """Per-route sample rates from ``/api/echo=0.01,/static/*=0``."""
+    rates = {}
+    for item in value.split(','):
+        if item.strip():
+            route, _, rate = item.rpartition('=')
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+def _timestamp(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+class LogWriter:
+    """Bounded buffer of records written to a stream by a background thread."""
+
+    def __init__(self, stream=None, capacity=10000, batch_size=512, flush_interval=0.2):
+        self.stream = stream or sys.stdout
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        try:
+            self._fd = self.stream.fileno()
+        except (AttributeError, OSError, ValueError):  # e.g. a captured or in-memory stream
+            self._fd = None
+        self._reset()
+        os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.flush)
+        self._start_thread()
+
+    def _reset(self):
+        self._buffer = deque()     # (key, record); deque appends are atomic
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.written = Counter()   # key -> lines written
+        self.dropped = Counter()   # key -> lines dropped (buffer full, write failed)
+
+    def submit(self, record, key='-'):
+        """Queue ``record`` (a JSON-serializable dict); False if it was dropped.
+
+        A float ``timestamp`` (epoch seconds) is formatted by the writer.
+        ``key`` (the route) is what the written/dropped counters count by.
+        """
+        buffer = self._buffer
+        if len(buffer) >= self.capacity:
+            with self._lock:
+                self.dropped[key] += 1
+            return False
+        buffer.append((key, record))
+        if len(buffer) >= self.batch_size and not self._wake.is_set():
+            self._wake.set()
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffered': len(self._buffer),
+                'written': dict(self.written),
+                'dropped': dict(self.dropped),
+            }
+
+    # Background work
+
+    def _start_thread(self):
+        threading.Thread(target=self._run, name='log-writer', daemon=True).start()
+
+    def _after_fork(self):
+        # A worker starts empty: the parent writes its own buffered lines.
+        self._reset()
+        self._start_thread()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far."""
+        with self._flush_lock:
+            buffer = self._buffer
+            while buffer:
+                batch = [buffer.popleft() for _ in range(min(len(buffer), self.batch_size))]
+                self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        lines = []
+        for _, record in batch:
+            timestamp = record.get('timestamp')
+            if isinstance(timestamp, float):
+                record['timestamp'] = _timestamp(timestamp)
+            lines.append(json.dumps(record, separators=(',', ':'), default=str).encode('utf-8') + b'\n')
+
+        chunk, size = [], 0
+        try:
+            for line in lines:
+                if chunk and size + len(line) > PIPE_BUF:
+                    self._write(b''.join(chunk))
+                    chunk, size = [], 0
+                chunk.append(line)
+                size += len(line)
+            if chunk:
+                self._write(b''.join(chunk))
+        except (OSError, ValueError):
+            # stdout is gone (closed pipe); count the batch as lost rather than raise.
+            with self._lock:
+                self.dropped.update(key for key, _ in batch)
+            return
+        with self._lock:
+            self.written.update(key for key, _ in batch)
+
+    def _write(self, data):
+        if self._fd is None:
+            self.stream.write(data.decode('utf-8'))
+            self.stream.flush()
+            return
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+
+class JSONLogHandler(logging.Handler):
+    """logging.Handler that queues records as JSON objects on a LogWriter."""
+
+    def __init__(self, writer, level=logging.NOTSET, context=None):
+        super().__init__(level)
+        self.writer = writer
+        # Returns extra fields (e.g. the current request) and the counter key.
+        self.context = context
+
+    def emit(self, record):
+        try:
+            entry = {
+                'timestamp': record.created,
+                'level': record.levelname.lower(),
+                'type': 'log',
+                'logger': record.name,
+                'message': record.getMessage(),
+                'pid': record.process,
+            }
+            if record.exc_info:
+                # Formatted now, while the traceback is still meaningful.
+                entry['exception'] = ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+            key = '-'
+            if self.context is not None:
+                fields, key = self.context()
+                entry.update(fields)
+            self.writer.submit(entry, key)
+        except Exception:
+            self.handleError(record)
+
+
+class AccessLogMiddleware:
+    """WSGI middleware queuing one access record per logged request."""
+
+    def __init__(self, app, url_map, writer, sample_rate=1.0, route_rates=None,
+                 slow_threshold=1.0, streaming_routes=()):
+        self.app = app
+        self.route = RouteResolver(url_map)
+        self.writer = writer
+        self.sample_rate = sample_rate
+        self.route_rates = dict(route_rates or {})
+        self.slow_threshold = slow_threshold
+        # Long-lived streams are sampled like any route but never logged as slow.
+        self.streaming_routes = frozenset(streaming_routes)
+
+    def __call__(self, environ, start_response):
+        started = perf_counter()
+        route = self.route(environ)
+        status = [None]
+
+        def logging_start_response(status_line, headers, exc_info=None):
+            status[0] = status_line
+            return start_response(status_line, headers, exc_info)
+
+        try:
+            iterable = self.app(environ, logging_start_response)
+        except BaseException:
+            self._finished(environ, route, '500', started, 0)
+            raise
+        return _LoggedBody(self, iterable, environ, route, status, started)
+
+    def _finished(self, environ, route, status_line, started, sent):
+        duration = perf_counter() - started
+        status = int(status_line[:3]) if status_line else 500
+        rate = self.route_rates.get(route, self.sample_rate)
+        slow = duration >= self.slow_threshold and route not in self.streaming_routes
+        if status < 500 and not slow and not (
+                rate >= 1 or (rate > 0 and random.random() < rate)):
+            return
+        forwarded = environ.get('HTTP_X_FORWARDED_FOR')
+        self.writer.submit({
+            'timestamp': time.time() - duration,
+            'level': 'error' if status >= 500 else 'info',
+            'type': 'access',
+            'method': environ.get('REQUEST_METHOD'),
+            'path': environ.get('PATH_INFO'),
+            'route': route,
+            'status': status,
+            'duration_ms': round(duration * 1000, 2),
+            'request_bytes': int(environ.get('CONTENT_LENGTH') or 0),
+            'response_bytes': sent,
+            'client': forwarded.split(',', 1)[0].strip() if forwarded else environ.get('REMOTE_ADDR'),
+            'user_agent': environ.get('HTTP_USER_AGENT'),
+            'trace_id': environ.get('HTTP_X_AMZN_TRACE_ID'),
+            'sample_rate': rate,
+            'pid': os.getpid(),
+        }, route)
+
+
+class _LoggedBody:
+    """Response iterable that counts bytes sent and logs on close()."""
+
+    def __init__(self, middleware, iterable, environ, route, status, started):
+        self.middleware = middleware
+        self.iterable = iterable
+        self.environ = environ
+        self.route = route
+        self.status = status
+        self.started = started
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.iterable:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, 'close'):
+                self.iterable.close()
+        finally:
+            self.middleware._finished(self.environ, self.route, self.status[0],
+                                      self.started, self.sent)
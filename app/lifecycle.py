@@ -0,0 +1,136 @@
+"""
+Graceful shutdown for ECS Playground.
+
+When ECS stops a task it first deregisters it from the ALB target group,
+waits out the deregistration delay, then sends SIGTERM and, ``stopTimeout``
+seconds later, SIGKILL. Deregistration takes a few seconds to reach every
+ALB node, so new requests can still arrive after SIGTERM. On the first
+SIGTERM the task therefore:
+
+1. marks itself draining: /ready fails (503) and /health reports the drain
+   while staying 200, so the container is not restarted mid-drain;
+2. keeps serving for ``delay`` seconds while the ALB stops routing to it;
+3. stops accepting connections and lets in-flight requests finish for up to
+   ``timeout`` seconds (gunicorn's graceful_timeout), then exits.
+
+A second SIGTERM skips the rest of the delay. The drain flag is a small
+JSON file on tmpfs so every worker process sees it, including workers
+started during the drain.
+"""
+
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'ecs-playground-draining',
+)
+
+
+class DrainState:
+    """Task-wide drain flag, re-read at most every ``interval`` seconds."""
+
+    def __init__(self, path=DEFAULT_PATH, interval=0.5):
+        self.path = path
+        self.interval = interval
+        self._state = self._read()
+        self._checked = time.monotonic()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def state(self):
+        """``{'started', 'delay', 'deadline'}`` in epoch seconds, or None when serving."""
+        now = time.monotonic()
+        if now - self._checked >= self.interval:
+            self._state, self._checked = self._read(), now
+        return self._state
+
+    def draining(self):
+        return self.state() is not None
+
+    def begin(self, delay, timeout):
+        """Start draining: stop accepting after ``delay``, give up ``timeout`` later."""
+        now = time.time()
+        state = {'started': now, 'delay': delay, 'deadline': now + delay + timeout}
+        temporary = f'{self.path}.{os.getpid()}'
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, self.path)
+        self._state, self._checked = state, time.monotonic()
+        return state
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self._state, self._checked = None, time.monotonic()
+
+    def report(self):
+        """Drain progress for the probe endpoints."""
+        state = self.state()
+        if state is None:
+            return {'draining': False}
+        now = time.time()
+        return {
+            'draining': True,
+            'elapsed': round(now - state['started'], 3),
+            'accepting': now < state['started'] + state['delay'],
+            'deadline_in': round(max(state['deadline'] - now, 0), 3),
+        }
+
+
+def install_gunicorn_drain(arbiter, drain, delay, timeout):
+    """Delay the gunicorn master's graceful stop by ``delay`` seconds after SIGTERM.
+
+    Call from the ``when_ready`` hook. The stop itself waits for in-flight
+    requests up to ``graceful_timeout``, which should equal ``timeout``.
+    """
+    stop = arbiter.handle_term
+
+    def handle_term():
+        if not drain.draining():
+            drain.begin(delay, timeout)
+            if delay > 0:
+                arbiter.log.info('SIGTERM: draining, /ready fails; stopping in %ss', delay)
+                timer = threading.Timer(delay, os.kill, (os.getpid(), signal.SIGTERM))
+                timer.daemon = True
+                timer.start()
+                return
+        arbiter.log.info('Stopping workers, waiting up to %ss for in-flight requests', timeout)
+        stop()  # raises StopIteration into the master loop
+
+    arbiter.handle_term = handle_term
+
+
+def install_signal_handler(drain, probes, delay, timeout):
+    """SIGTERM handling for the development server (``python app.py``).
+
+    Drains like gunicorn does, using the in-flight count of ``probes``
+    (a ProbeMiddleware), then interrupts the server.
+    """
+    def wait_and_stop():
+        time.sleep(delay)
+        deadline = time.monotonic() + timeout
+        while probes.in_flight > 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        drain.clear()
+        os.kill(os.getpid(), signal.SIGINT)
+
+    def handle_term(signum, frame):
+        if drain.draining():
+            return
+        drain.begin(delay, timeout)
+        print(f'🛑 SIGTERM: draining, stopping in {delay}s')
+        threading.Thread(target=wait_and_stop, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_term)
@@ -0,0 +1,510 @@
+"""
+Request metrics for ECS Playground.
+
+MetricsMiddleware records, per route: request counts by method and status,
+a latency histogram, request/response body bytes and in-flight requests.
+The request path only appends raw observations to lock-free deques; they
+are folded into counters when a snapshot is taken, off the hot path.
+
+Each gunicorn worker keeps its own counters in memory and periodically
+writes a snapshot to a shared directory (tmpfs by default). /metrics merges
+the snapshots of every worker, past and present, with its own live
+counters, so any worker can answer a scrape for the whole task. Counters
+of recycled workers keep counting towards the totals; their in-flight
+gauges are dropped. When a worker exits, the gunicorn master folds its
+snapshot into a single aggregate file (``compact``), so the directory
+holds one file per live worker however often workers are recycled.
+
+/metrics is served only with ``Authorization: Bearer <token>``; without a
+configured token the path falls through to the app (a 404).
+
+Other components can contribute per-route counters (e.g. cache hits) through
+``counters``; they are merged and exported the same way.
+
+Metrics are exported in the Prometheus text format and, optionally, as
+CloudWatch Embedded Metric Format (EMF) records queued on the app's
+jsonlog.LogWriter, so they share its batching with the other log lines.
+"""
+
+import atexit
+import bisect
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from time import perf_counter
+
+# Histogram bucket upper bounds in seconds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_DIR = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'ecs-playground-metrics',
+)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Counters of exited workers, folded together by compact().
+EXITED_FILE = 'exited.json'
+
+
+def route_table(url_map):
+    """Map literal request paths to their route label.
+
+    Rules with converters (e.g. /static/<path:filename>) are collapsed to
+    a prefix so label cardinality stays bounded.
+    """
+    exact, prefixes = {}, []
+    for rule in url_map.iter_rules():
+        if rule.arguments:
+            prefix = rule.rule.split('<', 1)[0]
+            prefixes.append((prefix, prefix + '*'))
+        else:
+            exact[rule.rule] = rule.rule
+    prefixes.sort(key=lambda p: len(p[0]), reverse=True)
+    return exact, tuple(prefixes)
+
+
+class RouteResolver:
+    """Route label of a request, resolved once per request.
+
+    The outermost middleware to ask stores the label as
+    ``environ['playground.route']``; the ones inside it read it back.
+    """
+
+    def __init__(self, url_map):
+        self.exact_routes, self.prefix_routes = route_table(url_map)
+
+    def label(self, path):
+        route = self.exact_routes.get(path)
+        if route is not None:
+            return route
+        for prefix, label in self.prefix_routes:
+            if path.startswith(prefix):
+                return label
+        return 'unmatched'
+
+    def __call__(self, environ):
+        route = environ.get('playground.route')
+        if route is None:
+            path = environ.get('PATH_INFO', '')
+            route = environ['playground.route'] = self.exact_routes.get(path) or self.label(path)
+        return route
+
+
+class WorkerMetrics:
+    """Counters for one process.
+
+    Requests append to ``started``/``finished`` (deque appends are atomic);
+    snapshot() drains them into the counters under a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = deque()    # route
+        # (route, method, status line, seconds, CONTENT_LENGTH, bytes sent: int or header value)
+        self.finished = deque()
+        self.requests = {}        # (route, method, status) -> count
+        self.latency = {}         # route -> [bucket counts..., +Inf count, sum]
+        self.request_bytes = {}   # route -> bytes
+        self.response_bytes = {}  # route -> bytes
+        self.in_flight = {}       # route -> gauge
+
+    def _drain(self):
+        started, finished, in_flight = self.started, self.finished, self.in_flight
+        while started:
+            route = started.popleft()
+            in_flight[route] = in_flight.get(route, 0) + 1
+        while finished:
+            route, method, status, seconds, request_bytes, response_bytes = finished.popleft()
+            in_flight[route] = in_flight.get(route, 0) - 1
+            key = (route, method, int(status[:3]))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get(route)
+            if histogram is None:
+                histogram = self.latency[route] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            histogram[-1] += seconds
+            self.request_bytes[route] = self.request_bytes.get(route, 0) + int(request_bytes or 0)
+            self.response_bytes[route] = self.response_bytes.get(route, 0) + int(response_bytes)
+
+    def snapshot(self):
+        """JSON-serializable copy of the counters."""
+        with self.lock:
+            self._drain()
+            return {
+                'requests': [[*key, count] for key, count in self.requests.items()],
+                'latency': {route: list(h) for route, h in self.latency.items()},
+                'request_bytes': dict(self.request_bytes),
+                'response_bytes': dict(self.response_bytes),
+                'in_flight': dict(self.in_flight),
+            }
+
+
+def merge(snapshots):
+    """Sum worker snapshots into one."""
+    total = {'requests': {}, 'latency': {}, 'request_bytes': {}, 'response_bytes': {},
+             'in_flight': {}, 'counters': {}}
+    for snap in snapshots:
+        for route, method, status, count in snap['requests']:
+            key = (route, method, status)
+            total['requests'][key] = total['requests'].get(key, 0) + count
+        for route, histogram in snap['latency'].items():
+            current = total['latency'].get(route)
+            total['latency'][route] = (list(histogram) if current is None
+                                       else [a + b for a, b in zip(current, histogram)])
+        for name in ('request_bytes', 'response_bytes', 'in_flight'):
+            for route, value in snap[name].items():
+                total[name][route] = total[name].get(route, 0) + value
+        for name, values in snap.get('counters', {}).items():
+            counter = total['counters'].setdefault(name, {})
+            for route, value in values.items():
+                counter[route] = counter.get(route, 0) + value
+    return total
+
+
+def _snapshot_of(total):
+    """A merged total in snapshot form again (JSON-serializable)."""
+    snap = dict(total)
+    snap['requests'] = [[*key, count] for key, count in total['requests'].items()]
+    return snap
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def compact(pid, directory=DEFAULT_DIR):
+    """Fold an exited worker's snapshot into the aggregate file and delete it.
+
+    Called by the gunicorn master (child_exit), the only writer of the
+    aggregate file.
+    """
+    path = os.path.join(directory, f'worker-{pid}.json')
+    snap = _read_json(path)
+    if snap is not None:
+        snap['in_flight'] = {}
+        aggregate_path = os.path.join(directory, EXITED_FILE)
+        snapshots = [snap]
+        aggregate = _read_json(aggregate_path)
+        if aggregate is not None:
+            snapshots.append(aggregate)
+        try:
+            _write_json(aggregate_path, _snapshot_of(merge(snapshots)))
+        except OSError:
+            return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(total, prefix='playground'):
+    """Render merged metrics in the Prometheus text exposition format."""
+    lines = [
+        f'# HELP {prefix}_http_requests_total HTTP requests by route, method and status.',
+        f'# TYPE {prefix}_http_requests_total counter',
+    ]
+    for (route, method, status), count in sorted(total['requests'].items()):
+        lines.append(f'{prefix}_http_requests_total{{route="{_label(route)}",'
+                     f'method="{method}",status="{status}"}} {count}')
+
+    lines += [
+        f'# HELP {prefix}_http_request_duration_seconds Request latency by route.',
+        f'# TYPE {prefix}_http_request_duration_seconds histogram',
+    ]
+    for route, histogram in sorted(total['latency'].items()):
+        label = _label(route)
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), histogram):
+            cumulative += count
+            lines.append(f'{prefix}_http_request_duration_seconds_bucket'
+                         f'{{route="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_http_request_duration_seconds_sum{{route="{label}"}} {histogram[-1]:.6f}')
+        lines.append(f'{prefix}_http_request_duration_seconds_count{{route="{label}"}} {cumulative}')
+
+    for name, metric, kind, help_text in (
+        ('request_bytes', 'request_bytes_total', 'counter', 'Request body bytes received by route.'),
+        ('response_bytes', 'response_bytes_total', 'counter', 'Response body bytes sent by route.'),
+        ('in_flight', 'requests_in_flight', 'gauge', 'Requests currently being served by route.'),
+    ):
+        metric = f'{prefix}_http_{metric}'
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        for route, value in sorted(total[name].items()):
+            lines.append(f'{metric}{{route="{_label(route)}"}} {value}')
+
+    for name, values in sorted(total['counters'].items()):
+        metric = f'{prefix}_{name}_total'
+        lines += [f'# TYPE {metric} counter']
+        for route, value in sorted(values.items()):
+            lines.append(f'{metric}{{route="{_label(route)}"}} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def emf_records(previous, current, namespace, timestamp_ms):
+    """CloudWatch EMF records for the change between two merged snapshots."""
+    records = []
+    for route, histogram in current['latency'].items():
+        before = previous['latency'].get(route, [0] * len(histogram))
+        count = sum(histogram[:-1]) - sum(before[:-1])
+        if count <= 0:
+            continue
+        errors = sum(
+            n - previous['requests'].get(key, 0)
+            for key, n in current['requests'].items()
+            if key[0] == route and str(key[2]).startswith('5')
+        )
+        records.append({
+            '_aws': {
+                'Timestamp': timestamp_ms,
+                'CloudWatchMetrics': [{
+                    'Namespace': namespace,
+                    'Dimensions': [['Route']],
+                    'Metrics': [
+                        {'Name': 'Requests', 'Unit': 'Count'},
+                        {'Name': 'Errors5xx', 'Unit': 'Count'},
+                        {'Name': 'LatencyAvg', 'Unit': 'Milliseconds'},
+                        {'Name': 'InFlight', 'Unit': 'Count'},
+                    ],
+                }],
+            },
+            'Route': route,
+            'Requests': count,
+            'Errors5xx': errors,
+            'LatencyAvg': round((histogram[-1] - before[-1]) / count * 1000, 3),
+            'InFlight': current['in_flight'].get(route, 0),
+        })
+    return records
+
+
+class MetricsMiddleware:
+    """WSGI middleware that records request metrics and serves /metrics."""
+
+    def __init__(self, app, url_map, directory=DEFAULT_DIR, path='/metrics',
+                 flush_interval=1.0, emf_interval=0.0, emf_namespace='ECSPlayground',
+                 counters=None, token=None, writer=None):
+        self.app = app
+        self.token = f'Bearer {token}'.encode() if token else None
+        # metric name -> callable returning this process's {route: count}
+        self.counters = dict(counters or {})
+        self.route = RouteResolver(url_map)
+        self.directory = directory
+        self.path = path
+        self.flush_interval = flush_interval
+        self.emf_interval = emf_interval
+        self.emf_namespace = emf_namespace
+        self.writer = writer  # jsonlog.LogWriter the EMF records go to
+        self.worker = WorkerMetrics()
+        os.makedirs(directory, exist_ok=True)
+        # Threads start with the first request, so a preloading gunicorn master
+        # (which never serves) runs none and writes no snapshot.
+        self._running = False
+        self._start_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+        atexit.register(self.flush)
+
+    # Request path (kept to the minimum: raw values are converted in _drain)
+
+    def __call__(self, environ, start_response):
+        if not self._running:
+            self._start_threads()
+        route = environ.get('playground.route') or self.route(environ)
+        if route == 'unmatched' and self.token and environ.get('PATH_INFO') == self.path:
+            return self._serve(environ, start_response)
+
+        worker = self.worker
+        worker.started.append(route)
+        status_line = '500'
+        response_headers = ()
+
+        def recording_start_response(status, headers, exc_info=None):
+            nonlocal status_line, response_headers
+            status_line = status
+            response_headers = headers
+            return start_response(status, headers, exc_info)
+
+        started = perf_counter()
+        try:
+            iterable = self.app(environ, recording_start_response)
+        except BaseException:
+            worker.finished.append((route, environ.get('REQUEST_METHOD'), status_line,
+                                    perf_counter() - started, environ.get('CONTENT_LENGTH'), 0))
+            raise
+
+        for name, value in response_headers:
+            if name == 'Content-Length':  # Werkzeug always uses this spelling
+                # Buffered body: the work is done, record now and skip wrapping.
+                worker.finished.append((route, environ.get('REQUEST_METHOD'), status_line,
+                                        perf_counter() - started, environ.get('CONTENT_LENGTH'),
+                                        value))
+                return iterable
+        # The status may only be set once the body starts, so it is read on close().
+        return _StreamedBody(iterable, worker.finished, route, environ,
+                             lambda: status_line, started)
+
+    # Aggregation and export
+
+    def snapshot(self):
+        """This worker's request metrics plus contributed counters."""
+        snap = self.worker.snapshot()
+        snap['counters'] = {name: dict(read()) for name, read in self.counters.items()}
+        return snap
+
+    def _snapshot_path(self, pid):
+        return os.path.join(self.directory, f'worker-{pid}.json')
+
+    def flush(self):
+        """Write this worker's snapshot for the other workers to read."""
+        if not self._running:
+            return  # never served a request (e.g. the gunicorn master)
+        try:
+            _write_json(self._snapshot_path(os.getpid()), self.snapshot())
+        except OSError:
+            pass
+
+    def collect(self):
+        """Merged metrics of every worker in the task."""
+        pid = os.getpid()
+        snapshots = [self.snapshot()]
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        for name in names:
+            if name == EXITED_FILE:
+                worker_pid = None
+            elif name.startswith('worker-') and name.endswith('.json'):
+                worker_pid = int(name[7:-5])
+                if worker_pid == pid:
+                    continue
+            else:
+                continue
+            snap = _read_json(os.path.join(self.directory, name))
+            if snap is None:
+                continue
+            if worker_pid is not None and not _alive(worker_pid):
+                # Exited, not compacted yet.
+                snap['in_flight'] = {}
+            snapshots.append(snap)
+        return merge(snapshots)
+
+    def _serve(self, environ, start_response):
+        authorization = environ.get('HTTP_AUTHORIZATION', '').encode('latin-1')
+        if not hmac.compare_digest(authorization, self.token):
+            body = b'{"error":"Unauthorized"}'
+            start_response('401 Unauthorized', [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(body))),
+                ('WWW-Authenticate', 'Bearer'),
+            ])
+            return [body]
+        body = prometheus_text(self.collect()).encode('utf-8')
+        start_response('200 OK', [
+            ('Content-Type', PROMETHEUS_CONTENT_TYPE),
+            ('Content-Length', str(len(body))),
+            ('Cache-Control', 'no-store'),
+        ])
+        return [body]
+
+    # Background work
+
+    def _start_threads(self):
+        with self._start_lock:
+            if self._running:
+                return
+            self._running = True
+        if self.flush_interval > 0:
+            threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+        if self.emf_interval > 0 and self.writer is not None:
+            threading.Thread(target=self._emf_loop, name='metrics-emf', daemon=True).start()
+
+    def _after_fork(self):
+        # Each worker starts from zero; its threads start with its first request.
+        self.worker = WorkerMetrics()
+        self._running = False
+        self._start_lock = threading.Lock()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _emf_loop(self):
+        # EMF records cover this worker only; CloudWatch sums them across workers.
+        previous = merge([])
+        while True:
+            time.sleep(self.emf_interval)
+            current = merge([self.worker.snapshot()])
+            for record in emf_records(previous, current, self.emf_namespace,
+                                      int(time.time() * 1000)):
+                self.writer.submit(record, 'emf')
+            previous = current
+
+
+class _StreamedBody:
+    """Streamed response that counts bytes sent and records on close()."""
+
+    def __init__(self, iterable, finished, route, environ, status, started):
+        self.iterable = iterable
+        self.finished = finished
+        self.route = route
+        self.environ = environ
+        self.status = status  # callable returning the status line
+        self.started = started
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.iterable:
+            self.sent += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.iterable, 'close'):
+                self.iterable.close()
+        finally:
+            self.finished.append((
+                self.route, self.environ.get('REQUEST_METHOD'), self.status(),
+                perf_counter() - self.started, self.environ.get('CONTENT_LENGTH'), self.sent,
+            ))
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def reset_directory(directory=DEFAULT_DIR):
+    """Remove snapshots of a previous server run (called by the gunicorn master)."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith('worker-') or name.startswith(EXITED_FILE):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
@@ -0,0 +1,294 @@
+"""
+Process-pool offload of CPU-heavy text and encoding work for ECS Playground.
+
+String work on a large input holds the GIL for as long as it runs, which
+stalls every other request in the worker, /health included. Offloader runs
+inputs under their job's threshold inline, where a process round trip would
+cost more than the work, and sends larger ones to a small pool of helper
+processes owned by the worker:
+
+- Inputs and outputs cross the process boundary through shared memory:
+  files on tmpfs (/dev/shm) that the helper maps instead of reading. Only
+  paths, sizes and small results such as stats go through the pipe.
+- At most ``workers`` jobs run at once and ``max_queue`` more may wait for a
+  helper; past that, jobs are rejected at once with 503.
+- A job that has not finished ``timeout`` seconds after it was submitted
+  gets 504 (503 if it was still waiting for a helper); its helper is
+  killed and replaced, so runaway work never piles up.
+
+Helpers are started on first use as ``python -m offload``, not forked from
+the multi-threaded worker, so they load only this module and its small
+dependencies, never the app. They exit when their worker goes away.
+"""
+
+import itertools
+import mmap
+import os
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from multiprocessing.connection import Connection
+
+import encoders
+import textstream
+
+DEFAULT_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+# Lone surrogates are valid in JSON strings; keep them across the boundary.
+ERRORS = 'surrogatepass'
+
+
+class Rejected(Exception):
+    """A job the pool would not or could not finish; carries the HTTP status."""
+
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# Jobs: run in a helper on a read-only view of the input, return (meta, [bytes, ...]).
+
+def _text_utils_job(data, stats, transformations):
+    text = str(data, 'utf-8', ERRORS)
+    result, transformed = textstream.text_utils(text, stats, transformations)
+    return result, [transformed[name].encode('utf-8', ERRORS) for name in transformations]
+
+
+def _codec_job(data, variant, operation):
+    codec = encoders.CODECS[variant]
+    if operation == 'encode':
+        return None, [codec.encode(data)]
+    return None, [codec.decode(bytes(data))]  # the decoders copy to bytes anyway
+
+
+JOBS = {'text_utils': _text_utils_job, 'codec': _codec_job}
+
+# Input size (characters or bytes) from which a job is worth a round trip. The codecs run in C at
+# about 1 ms per MB, so only very large inputs hold the GIL long enough.
+THRESHOLDS = {'text_utils': 256 * 1024, 'codec': 4 * 1024 * 1024}
+
+
+def _mapped(path, size):
+    """Read-only memoryview of a file, mapped rather than read."""
+    if not size:
+        return memoryview(b'')
+    with open(path, 'rb') as f:
+        return memoryview(mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ))
+
+
+def _run_job(name, in_path, size, out_path, args):
+    data = _mapped(in_path, size)
+    try:
+        meta, outputs = JOBS[name](data, *args)
+    finally:
+        data.release()
+    with open(out_path, 'wb') as f:
+        for output in outputs:
+            f.write(output)
+    return meta, [len(output) for output in outputs]
+
+
+def serve(fd):
+    """Helper process loop: run jobs from the worker until it closes the socket."""
+    # Ctrl-C reaches the whole process group; the worker decides when helpers stop.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    conn = Connection(fd)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = ('ok', *_run_job(*request))
+        except Exception as e:
+            reply = ('error', e.with_traceback(None), None)
+        conn.send(reply)
+
+
+class _Helper:
+    def __init__(self):
+        parent, child = socket.socketpair()
+        with child:
+            self.process = subprocess.Popen(
+                [sys.executable, '-m', 'offload', str(child.fileno())],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                pass_fds=(child.fileno(),),
+            )
+        self.conn = Connection(parent.detach())
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+        self.conn.close()
+
+
+class Offloader:
+    """Runs large jobs in a bounded pool of helper processes, small ones inline."""
+
+    def __init__(self, workers, thresholds=None, timeout=10.0, max_queue=4,
+                 directory=DEFAULT_DIR):
+        self.workers = workers
+        self.thresholds = dict(THRESHOLDS, **(thresholds or {}))
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.directory = directory
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # A forked worker starts without helpers; the parent's belong to the parent.
+        self._lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._started = 0
+        self._pending = 0
+        self._ids = itertools.count()
+        self.jobs = Counter()       # label -> jobs completed in a helper
+        self.rejected = Counter()   # label -> jobs turned away (queue full, waited too long)
+        self.timeouts = Counter()   # label -> jobs killed at the timeout
+
+    def offloads(self, job, size):
+        """Whether ``job`` on an input of ``size`` goes to the pool."""
+        return self.workers > 0 and size >= self.thresholds[job]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'started': self._started,
+                'pending': self._pending,
+                'jobs': dict(self.jobs),
+                'rejected': dict(self.rejected),
+                'timeouts': dict(self.timeouts),
+            }
+
+    def _acquire(self, deadline):
+        with self._lock:
+            start = self._idle.empty() and self._started < self.workers
+            if start:
+                self._started += 1
+        if start:
+            try:
+                return _Helper()
+            except BaseException:
+                with self._lock:
+                    self._started -= 1
+                raise
+        return self._idle.get(timeout=max(deadline - time.monotonic(), 0))
+
+    def _discard(self, helper):
+        """Kill a helper and put a fresh one in its place for the next job."""
+        helper.kill()
+        try:
+            self._idle.put(_Helper())
+        except OSError:
+            with self._lock:
+                self._started -= 1
+
+    def run(self, job, data, *args, label=None):
+        """``JOBS[job](data, *args)`` in a helper; returns its (meta, [bytes, ...]).
+
+        Raises Rejected when the pool is full, the job times out or its helper
+        dies; exceptions raised by the job itself are re-raised here.
+        """
+        label = label or job
+        deadline = time.monotonic() + self.timeout
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected[label] += 1
+                raise Rejected(503, 'Too many large jobs in progress, retry shortly', retry_after=1)
+            self._pending += 1
+        try:
+            try:
+                helper = self._acquire(deadline)
+            except queue.Empty:
+                with self._lock:
+                    self.rejected[label] += 1
+                raise Rejected(503, f'No worker process free within {self.timeout:g}s', retry_after=1)
+            return self._run_on(helper, job, data, args, deadline, label)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _run_on(self, helper, job, data, args, deadline, label):
+        base = os.path.join(self.directory, f'ecs-playground-offload-{os.getpid()}-{next(self._ids)}')
+        in_path, out_path = f'{base}.in', f'{base}.out'
+        try:
+            try:
+                with open(in_path, 'wb') as f:
+                    f.write(data)
+            except OSError:
+                # e.g. a full /dev/shm: the helper is fine, keep it for the next job.
+                self._idle.put(helper)
+                raise Rejected(503, 'No scratch space for the job, retry shortly',
+                               retry_after=1) from None
+            try:
+                helper.conn.send((job, in_path, len(data), out_path, args))
+                finished = helper.conn.poll(max(deadline - time.monotonic(), 0))
+                reply = helper.conn.recv() if finished else None
+            except (OSError, EOFError):
+                self._discard(helper)
+                raise Rejected(503, 'Worker process exited, retry shortly', retry_after=1) from None
+            if reply is None:
+                self._discard(helper)
+                with self._lock:
+                    self.timeouts[label] += 1
+                raise Rejected(504, f'Processing took longer than {self.timeout:g}s')
+            self._idle.put(helper)
+
+            status, meta, lengths = reply
+            if status == 'error':
+                if isinstance(meta, OSError):  # the helper could not map or write its files
+                    raise Rejected(503, 'No scratch space for the job, retry shortly',
+                                   retry_after=1) from None
+                raise meta
+            try:
+                output = _mapped(out_path, sum(lengths))
+            except OSError:
+                raise Rejected(503, 'Job output was lost, retry shortly', retry_after=1) from None
+            try:
+                outputs = [bytes(output[start:start + length])
+                           for start, length in zip(itertools.accumulate([0, *lengths]), lengths)]
+            finally:
+                output.release()
+        finally:
+            for path in (in_path, out_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+        with self._lock:
+            self.jobs[label] += 1
+        return meta, outputs
+
+
+def text_utils(pool, text, stats, transformations, label=None):
+    """textstream.text_utils(), in the pool when ``text`` is large."""
+    if not pool.offloads('text_utils', len(text)):
+        return textstream.text_utils(text, stats, transformations)
+    result, outputs = pool.run('text_utils', text.encode('utf-8', ERRORS),
+                               stats, transformations, label=label)
+    return result, {name: output.decode('utf-8', ERRORS)
+                    for name, output in zip(transformations, outputs)}
+
+
+def run_codec(pool, variant, operation, data, label=None):
+    """Encode or decode ``data`` with a codec from encoders.CODECS, in the pool when large.
+
+    Raises ValueError on invalid input to decode.
+    """
+    if not pool.offloads('codec', len(data)):
+        codec = encoders.CODECS[variant]
+        return codec.encode(data) if operation == 'encode' else codec.decode(data)
+    _, (output,) = pool.run('codec', data, variant, operation, label=label)
+    return output
+
+
+if __name__ == '__main__':
+    serve(int(sys.argv[1]))
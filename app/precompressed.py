@@ -0,0 +1,64 @@
+"""
+Precompressed, ETag-validated response bodies for content fixed at startup.
+"""
+
+import gzip
+import hashlib
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Preferred order when the client accepts several encodings.
+ENCODINGS = ('br', 'gzip')
+
+
+class PrecompressedBody:
+    """Body bytes prepared once, with gzip/brotli variants and strong ETags.
+
+    Each encoded variant is a different representation, so it gets its own
+    strong ETag (``"<sha256>-br"``). Any of them validates a conditional
+    request, so a cache holding one encoding can revalidate against another.
+    """
+
+    def __init__(self, body, mimetype):
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.variants = {'identity': (body, self.digest[:32])}
+
+        encoded = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded['br'] = brotli.compress(body, quality=11)
+        for encoding, data in encoded.items():
+            if len(data) < len(body):
+                self.variants[encoding] = (data, f'{self.digest[:32]}-{encoding}')
+
+        self.etags = frozenset(etag for _, etag in self.variants.values())
+
+    def negotiate(self, accept_encodings):
+        """Best available encoding for an ``Accept-Encoding`` header."""
+        for encoding in ENCODINGS:
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return encoding
+        return 'identity'
+
+    def make_response(self, request, headers=None):
+        """Serve the negotiated variant, or a 304 if the client's copy is current."""
+        encoding = self.negotiate(request.accept_encodings)
+        body, etag = self.variants[encoding]
+
+        if any(request.if_none_match.contains_weak(e) for e in self.etags):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype=self.mimetype)
+            if encoding != 'identity':
+                response.content_encoding = encoding
+
+        response.set_etag(etag)
+        response.vary.add('Accept-Encoding')
+        if headers:
+            response.headers.update(headers)
+        return response
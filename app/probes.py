@@ -0,0 +1,132 @@
+"""
+Liveness and readiness probes for ECS Playground.
+
+ProbeMiddleware sits in front of the Flask app. /health is answered with a
+preserialized body before Flask creates a request context, so container and
+load balancer health checks cost next to nothing. /ready reports how busy
+this worker is and how deep the task's accept queue has grown, and fails
+(503) when the task should stop receiving new traffic, including while it
+drains before shutting down (see lifecycle.py).
+"""
+
+import json
+import threading
+
+from werkzeug.wsgi import ClosingIterator
+
+JSON_HEADERS = [('Content-Type', 'application/json'), ('Cache-Control', 'no-store')]
+
+# Sockets in /proc/net/tcp{,6} that are listening; their rx_queue is the
+# number of accepted connections waiting for the server to pick them up.
+TCP_LISTEN = '0A'
+
+
+def accept_queue_depth(port):
+    """Connections queued on the task's listening socket, or None if unknown."""
+    suffix = f':{port:04X}'
+    depth = None
+    for path in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(path) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[1].endswith(suffix) and fields[3] == TCP_LISTEN:
+                        queued = int(fields[4].split(':')[1], 16)
+                        depth = queued if depth is None else depth + queued
+        except OSError:
+            continue
+    return depth
+
+
+class ProbeMiddleware:
+    """Answers /health and /ready, and counts in-flight requests for the rest.
+
+    ``capacity`` is how many requests this worker serves at once (threads or
+    greenlets). ``checks`` maps a name to a callable returning a dict with at
+    least an ``ok`` key; any failing check makes /ready return 503.
+    ``drain`` is a lifecycle.DrainState: while it is set /ready fails and
+    /health, still 200, reports the drain progress. ``untracked_paths``
+    (long-lived streams) are not counted as in flight.
+    """
+
+    def __init__(self, app, health_body, capacity=1, port=None, max_queue=None, checks=None,
+                 drain=None, untracked_paths=()):
+        self.app = app
+        self.untracked_paths = frozenset(untracked_paths)
+        self.health_body = health_body
+        self.health_headers = JSON_HEADERS + [('Content-Length', str(len(health_body)))]
+        self.drain = drain
+        self.capacity = max(capacity, 1)
+        self.port = port
+        self.max_queue = max_queue
+        self.checks = dict(checks or {})
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO')
+        if path == '/health':
+            if self.drain is not None and self.drain.draining():
+                return self._draining_health(start_response)
+            start_response('200 OK', self.health_headers)
+            return [self.health_body]
+        if path == '/ready':
+            return self._ready(start_response)
+        if path in self.untracked_paths:
+            return self.app(environ, start_response)
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return ClosingIterator(self.app(environ, start_response), self._finished)
+        except BaseException:
+            self._finished()
+            raise
+
+    def _finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def readiness(self):
+        """Readiness report for this worker and task."""
+        in_flight = self.in_flight
+        queue_depth = accept_queue_depth(self.port) if self.port else None
+        checks = {name: check() for name, check in self.checks.items()}
+
+        saturated = in_flight >= self.capacity
+        queue_full = (self.max_queue is not None and queue_depth is not None
+                      and queue_depth > self.max_queue)
+        drain = self.drain.report() if self.drain is not None else {'draining': False}
+        ready = (not queue_full and not drain['draining']
+                 and all(c.get('ok', True) for c in checks.values()))
+        if drain['draining']:
+            status = 'draining'
+        else:
+            status = 'ready' if ready else 'not_ready'
+        return {
+            'status': status,
+            'worker': {
+                'in_flight': in_flight,
+                'capacity': self.capacity,
+                'saturation': round(in_flight / self.capacity, 3),
+                'saturated': saturated,
+            },
+            'queue': {'depth': queue_depth, 'max': self.max_queue},
+            'checks': checks,
+            'drain': drain,
+        }
+
+    def _draining_health(self, start_response):
+        # Still live: failing liveness now would get the task killed mid-drain.
+        report = dict(json.loads(self.health_body), status='draining', drain=self.drain.report())
+        body = json.dumps(report).encode('utf-8')
+        start_response('200 OK', JSON_HEADERS + [('Content-Length', str(len(body)))])
+        return [body]
+
+    def _ready(self, start_response):
+        report = self.readiness()
+        body = json.dumps(report).encode('utf-8')
+        status = '200 OK' if report['status'] == 'ready' else '503 Service Unavailable'
+        start_response(status, JSON_HEADERS + [('Content-Length', str(len(body)))])
+        return [body]
@@ -0,0 +1,284 @@
+"""
+Sampling profiler and slow-request capture for ECS Playground.
+
+ProfilerMiddleware notes which thread serves which request: a dict update
+per request, nothing more. A background thread wakes every ``interval``
+seconds and, only for requests that need it, reads their current Python
+stack from ``sys._current_frames()``:
+
+- sampled requests (a ``sample_rate`` fraction, chosen at random) feed a
+  task-wide profile kept in one-second buckets for ``window`` seconds;
+- any request running longer than ``slow_threshold`` seconds is sampled
+  from then on, and kept, with its route, status, payload size and stack
+  samples, among the last ``max_slow`` slow requests.
+
+Stacks are collapsed into ``frame;frame;frame count`` lines, rooted at the
+request (``POST /api/text-utils``), which flamegraph.pl, speedscope and
+similar tools read directly. Like the metrics snapshots, each worker writes
+its data to a shared directory on tmpfs so any worker can answer for the
+whole task.
+
+Stack sampling needs one OS thread per request: it works with the sync,
+gthread and asgi profiles and the dev server, not under gevent.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from time import perf_counter
+
+from werkzeug.wsgi import ClosingIterator
+
+from metrics import RouteResolver
+
+DEFAULT_DIR = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'ecs-playground-profiles',
+)
+
+# Deeper stacks are cut at the innermost MAX_DEPTH frames.
+MAX_DEPTH = 64
+
+
+def supported():
+    """False under gevent, where requests share OS threads."""
+    if 'gevent.monkey' not in sys.modules:
+        return True
+    return not sys.modules['gevent.monkey'].is_module_patched('threading')
+
+
+class _Request:
+    __slots__ = ('label', 'route', 'method', 'request_bytes', 'started', 'sampled',
+                 'status', 'stacks')
+
+    def __init__(self, route, method, request_bytes, sampled):
+        self.label = f'{method} {route}'
+        self.route = route
+        self.method = method
+        self.request_bytes = request_bytes
+        self.started = perf_counter()
+        self.sampled = sampled
+        self.status = None
+        self.stacks = Counter()
+
+
+class ProfilerMiddleware:
+    """WSGI middleware tracking in-flight requests for the stack sampler."""
+
+    def __init__(self, app, url_map, sample_rate=0.01, interval=0.01, slow_threshold=1.0,
+                 window=300, max_slow=50, directory=DEFAULT_DIR, flush_interval=1.0,
+                 exclude_paths=()):
+        self.app = app
+        # Long-lived streams: slow by design, they would crowd out real captures.
+        self.exclude_paths = frozenset(exclude_paths)
+        self.route = RouteResolver(url_map)
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.window = window
+        self.max_slow = max_slow
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._frame_labels = {}  # code object -> 'function (file'
+        # Import roots, longest first, so file names print relative to them.
+        self._roots = sorted({os.path.join(os.path.abspath(p or '.'), '') for p in sys.path},
+                             key=len, reverse=True)
+        self._reset()
+        os.makedirs(directory, exist_ok=True)
+        os.register_at_fork(after_in_child=self._after_fork)
+        self._start_thread()
+
+    def _reset(self):
+        self.active = {}                   # thread ident -> _Request
+        self.buckets = {}                  # epoch second -> Counter(stack -> samples)
+        self.slow = deque(maxlen=self.max_slow)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    # Request path
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') in self.exclude_paths:
+            return self.app(environ, start_response)
+        ident = threading.get_ident()
+        request = _Request(self.route(environ),
+                           environ.get('REQUEST_METHOD'),
+                           int(environ.get('CONTENT_LENGTH') or 0),
+                           random.random() < self.sample_rate)
+
+        def recording_start_response(status, headers, exc_info=None):
+            request.status = status[:3]
+            return start_response(status, headers, exc_info)
+
+        self.active[ident] = request
+        try:
+            iterable = self.app(environ, recording_start_response)
+        except BaseException:
+            request.status = '500'
+            self._finished(ident, request)
+            raise
+        return ClosingIterator(iterable, lambda: self._finished(ident, request))
+
+    def _finished(self, ident, request):
+        self.active.pop(ident, None)
+        duration = perf_counter() - request.started
+        if duration < self.slow_threshold:
+            return
+        record = {
+            'route': request.route,
+            'method': request.method,
+            'status': request.status,
+            'duration_ms': round(duration * 1000, 1),
+            'request_bytes': request.request_bytes,
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'sampled': request.sampled,
+            'pid': os.getpid(),
+            'stacks': collapsed_lines(request.stacks),
+        }
+        with self._lock:
+            self.slow.append(record)
+            self._dirty = True
+
+    # Sampling
+
+    def _frame_label(self, frame):
+        code = frame.f_code
+        label = self._frame_labels.get(code)
+        if label is None:
+            path = code.co_filename
+            for root in self._roots:
+                if path.startswith(root):
+                    path = path[len(root):]
+                    break
+            label = self._frame_labels[code] = f'{code.co_name} ({path}'
+        return f'{label}:{frame.f_lineno})'
+
+    def _collapse(self, request, frame):
+        frames = []
+        while frame is not None and len(frames) < MAX_DEPTH:
+            frames.append(self._frame_label(frame))
+            frame = frame.f_back
+        frames.append(request.label)
+        return ';'.join(reversed(frames))
+
+    def sample(self):
+        """Take one stack sample of every request that is sampled or slow."""
+        now = perf_counter()
+        targets = [(ident, request) for ident, request in list(self.active.items())
+                   if request.sampled or now - request.started >= self.slow_threshold]
+        if not targets:
+            return
+        frames = sys._current_frames()
+        second = int(time.time())
+        with self._lock:
+            bucket = self.buckets.get(second)
+            if bucket is None:
+                bucket = self.buckets[second] = Counter()
+                for old in [s for s in self.buckets if s <= second - self.window]:
+                    del self.buckets[old]
+            for ident, request in targets:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = self._collapse(request, frame)
+                request.stacks[stack] += 1
+                if request.sampled:
+                    bucket[stack] += 1
+            self._dirty = True
+
+    def _start_thread(self):
+        threading.Thread(target=self._sample_loop, name='profiler', daemon=True).start()
+
+    def _after_fork(self):
+        # Each worker profiles its own threads from an empty state.
+        self._reset()
+        self._start_thread()
+
+    def _sample_loop(self):
+        flushed = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+            if time.monotonic() - flushed >= self.flush_interval:
+                self.flush()
+                flushed = time.monotonic()
+
+    # Export
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'buckets': {str(s): dict(c) for s, c in self.buckets.items()},
+                'slow': list(self.slow),
+            }
+
+    def flush(self):
+        """Write this worker's profile for the other workers to read, if it changed."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        path = os.path.join(self.directory, f'profile-{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _snapshots(self):
+        pid = os.getpid()
+        snapshots = [self.snapshot()]
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+        oldest = time.time() - self.window
+        for name in names:
+            if not (name.startswith('profile-') and name.endswith('.json')) or name == f'profile-{pid}.json':
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.stat(path).st_mtime < oldest:
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def profile(self, seconds=60, route=None):
+        """Task-wide sampled stacks of the last ``seconds``, optionally for one route."""
+        since = time.time() - min(seconds, self.window)
+        prefix = f'{route};' if route else None
+        total = Counter()
+        for snapshot in self._snapshots():
+            for second, stacks in snapshot['buckets'].items():
+                if int(second) < since:
+                    continue
+                for stack, count in stacks.items():
+                    # Stacks start with "METHOD /route"; match on the route part.
+                    if prefix is None or stack.split(' ', 1)[1].startswith(prefix):
+                        total[stack] += count
+        return total
+
+    def slow_requests(self, seconds=None, route=None):
+        """Task-wide slow-request captures, slowest first."""
+        records = [r for s in self._snapshots() for r in s['slow']]
+        if seconds is not None:
+            since = datetime.fromtimestamp(time.time() - seconds, timezone.utc).isoformat()
+            records = [r for r in records if r['finished_at'] >= since]
+        if route:
+            records = [r for r in records if r['route'] == route]
+        return sorted(records, key=lambda r: r['duration_ms'], reverse=True)
+
+
+def collapsed_lines(stacks):
+    """``stack count`` lines, most frequent first: the flamegraph input format."""
+    return [f'{stack} {count}' for stack, count in stacks.most_common()]
@@ -0,0 +1,258 @@
+"""
+Quote store and live quote feed for ECS Playground.
+
+QuoteStore is built once at import: every quote is serialized to a JSON
+fragment up front, and author and keyword indexes map to quote ids, so
+serving a quote or a search result is a lookup and a byte join. Random
+picks are weighted and may be seeded (the same seed always picks the same
+quote, e.g. a quote of the day).
+
+QuoteFeed pushes quotes to Server-Sent Events subscribers. A quote is
+published every ``interval`` seconds, picked with the time slot as seed so
+every worker and task publishes the same quote; the event is formatted once
+and shared by all subscribers. Under WSGI one producer thread per worker
+wakes blocking subscribers; on an event loop (asgi.py) subscribers are
+coroutines that sleep until the next slot, and no thread is involved.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect
+from collections import namedtuple
+from datetime import datetime
+
+QUOTES = (
+    {"text": "The only way to do great work is to love what you do.", "author": "Steve Jobs"},
+    {"text": "Innovation distinguishes between a leader and a follower.", "author": "Steve Jobs"},
+    {"text": "Life is what happens to you while you're busy making other plans.", "author": "John Lennon"},
+    {"text": "The future belongs to those who believe in the beauty of their dreams.", "author": "Eleanor Roosevelt"},
+    {"text": "It is during our darkest moments that we must focus to see the light.", "author": "Aristotle"},
+    {"text": "Success is not final, failure is not fatal: it is the courage to continue that counts.", "author": "Winston Churchill"},
+    {"text": "The way to get started is to quit talking and begin doing.", "author": "Walt Disney"},
+    {"text": "Don't let yesterday take up too much of today.", "author": "Will Rogers"},
+    {"text": "You learn more from failure than from success.", "author": "Unknown"},
+    {"text": "If you are working on something exciting that you really care about, you don't have to be pushed.", "author": "Steve Jobs"},
+    {"text": "Code is like humor. When you have to explain it, it's bad.", "author": "Cory House"},
+    {"text": "First, solve the problem. Then, write the code.", "author": "John Johnson"},
+    {"text": "The best error message is the one that never shows up.", "author": "Thomas Fuchs"},
+)
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# fragment: the quote as serialized JSON bytes, ready to be spliced into a response.
+Quote = namedtuple('Quote', 'id text author weight fragment')
+
+
+def keywords(text):
+    """Lower-case words of ``text``, as indexed and as matched by search."""
+    return WORD.findall(text.lower())
+
+
+def dumps(obj):
+    """Compact UTF-8 JSON; always one line, as SSE data lines require."""
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def splice(key, fragment, rest):
+    """JSON object bytes with ``key`` set to the serialized ``fragment``, followed by
+    the members of ``rest``, itself a serialized JSON object."""
+    members = rest.strip()[1:]
+    if members.lstrip() != b'}':
+        members = b',' + members
+    return b'{"' + key.encode('ascii') + b'":' + fragment + members
+
+
+def as_dict(quote):
+    """The public fields of a quote, as in its fragment."""
+    return {'id': quote.id, 'text': quote.text, 'author': quote.author}
+
+
+class QuoteStore:
+    """Immutable quotes with preserialized fragments and search indexes."""
+
+    def __init__(self, quotes=QUOTES):
+        self.quotes = tuple(
+            Quote(i, q['text'], q['author'], q.get('weight', 1),
+                  dumps({'id': i, 'text': q['text'], 'author': q['author']}))
+            for i, q in enumerate(quotes)
+        )
+        self.by_author = {}   # lower-case author -> (ids, ...)
+        self.by_keyword = {}  # keyword -> frozenset of ids
+        for quote in self.quotes:
+            self.by_author.setdefault(quote.author.lower(), []).append(quote.id)
+            for word in set(keywords(quote.text)):
+                self.by_keyword.setdefault(word, set()).add(quote.id)
+        self.by_author = {name: tuple(ids) for name, ids in self.by_author.items()}
+        self.by_keyword = {word: frozenset(ids) for word, ids in self.by_keyword.items()}
+        self.all_ids = tuple(q.id for q in self.quotes)
+        self._cum_weights = tuple(itertools.accumulate(q.weight for q in self.quotes))
+        self.authors = tuple(sorted(
+            ({'name': self.quotes[ids[0]].author, 'count': len(ids)} for ids in self.by_author.values()),
+            key=lambda a: (-a['count'], a['name']),
+        ))
+
+    def __len__(self):
+        return len(self.quotes)
+
+    def matching(self, query=None, author=None):
+        """Ids of quotes containing every word of ``query`` whose author contains ``author``."""
+        ids = None
+        if author:
+            author = author.strip().lower()
+            ids = {i for name, found in self.by_author.items() if author in name for i in found}
+        for word in keywords(query or ''):
+            found = self.by_keyword.get(word, frozenset())
+            ids = set(found) if ids is None else ids & found
+            if not ids:
+                break
+        return self.all_ids if ids is None else tuple(sorted(ids))
+
+    def pick(self, ids=None, seed=None):
+        """Weighted random quote among ``ids`` (default: all); deterministic for a seed."""
+        rng = random if seed is None else random.Random(seed)
+        if ids is None or ids is self.all_ids:
+            # Equivalent to random.choices(cum_weights=...), without building a list.
+            index = bisect(self._cum_weights, rng.random() * self._cum_weights[-1])
+            return self.quotes[min(index, len(self.quotes) - 1)]
+        if not ids:
+            return None
+        weights = [self.quotes[i].weight for i in ids]
+        return self.quotes[rng.choices(ids, weights)[0]]
+
+
+class QuoteFeed:
+    """One producer per worker broadcasting Server-Sent Events to many subscribers."""
+
+    def __init__(self, store, interval=10.0, max_subscribers=100, heartbeat=15.0,
+                 retry_ms=5000):
+        self.store = store
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.retry = f'retry: {retry_ms}\n\n'.encode('ascii')
+        self.subscribers = 0
+        self._cond = threading.Condition()
+        self._event = None          # (slot, event bytes) currently published
+        self._producer_pid = None
+
+    def _event_for(self, slot):
+        quote = self.store.pick(seed=slot)
+        data = splice('quote', quote.fragment, dumps({
+            'slot': slot,
+            'timestamp': datetime.utcfromtimestamp(slot * self.interval).isoformat() + 'Z',
+        }))
+        return slot, b'id: %d\nevent: quote\ndata: %s\n\n' % (slot, data)
+
+    def current(self):
+        """The event of the current time slot, publishing it if the producer has not yet."""
+        slot = int(time.time() // self.interval)
+        with self._cond:
+            if self._event is None or self._event[0] < slot:
+                self._event = self._event_for(slot)
+                self._cond.notify_all()
+            return self._event
+
+    def _produce(self):
+        while True:
+            time.sleep(self.interval - time.time() % self.interval)
+            self.current()
+
+    def _ensure_producer(self):
+        # Started lazily, once per process, so a pre-fork master never owns it.
+        with self._cond:
+            if self._producer_pid == os.getpid():
+                return
+            self._producer_pid = os.getpid()
+        threading.Thread(target=self._produce, name='quote-feed', daemon=True).start()
+
+    def _reserve(self):
+        with self._cond:
+            if self.subscribers >= self.max_subscribers:
+                return False
+            self.subscribers += 1
+            return True
+
+    def subscribe(self, duration=300.0, stop=None):
+        """Response iterable of SSE bytes for one subscriber, or None when the worker is full.
+
+        The stream ends after ``duration`` seconds, or at the next heartbeat
+        once ``stop()`` is true; EventSource clients reconnect by themselves.
+        """
+        if not self._reserve():
+            return None
+        self._ensure_producer()
+        return _Subscription(self, time.monotonic() + duration, stop)
+
+    def subscribe_async(self, duration=300.0, stop=None):
+        """Like subscribe(), but an async iterable for one coroutine per subscriber."""
+        if not self._reserve():
+            return None
+        return _AsyncSubscription(self, time.monotonic() + duration, stop)
+
+    def _unsubscribe(self):
+        with self._cond:
+            self.subscribers -= 1
+
+
+class _Subscription:
+    """One subscriber's stream; close() releases its slot even if never iterated."""
+
+    def __init__(self, feed, deadline, stop):
+        self.feed = feed
+        self.deadline = deadline
+        self.stop = stop
+        self._closed = False
+
+    def __iter__(self):
+        feed = self.feed
+        seen, event = feed.current()
+        yield feed.retry + event
+        while True:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0 or (self.stop is not None and self.stop()):
+                return
+            with feed._cond:
+                feed._cond.wait_for(lambda: feed._event[0] != seen,
+                                    timeout=min(feed.heartbeat, remaining))
+                latest = feed._event
+            if latest[0] != seen:
+                seen, event = latest
+                yield event
+            else:
+                yield b': keep-alive\n\n'
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.feed._unsubscribe()
+
+
+class _AsyncSubscription(_Subscription):
+    """One subscriber's stream on an event loop; sleeps until the next slot or heartbeat."""
+
+    def __iter__(self):
+        raise TypeError('iterate with async for')
+
+    async def __aiter__(self):
+        feed = self.feed
+        seen, event = feed.current()
+        yield feed.retry + event
+        while True:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0 or (self.stop is not None and self.stop()):
+                return
+            # Just past the slot boundary, so current() sees the new slot.
+            next_slot = feed.interval - time.time() % feed.interval + 0.001
+            await asyncio.sleep(min(next_slot, feed.heartbeat, remaining))
+            latest = feed.current()
+            if latest[0] != seen:
+                seen, event = latest
+                yield event
+            else:
+                yield b': keep-alive\n\n'
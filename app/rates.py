@@ -0,0 +1,273 @@
+"""
+Exchange rate table for ECS Playground.
+
+Rates are held in an immutable RateTable snapshot with a precomputed
+cross-rate matrix. Updating rates builds a complete new table and swaps
+the module-level reference, so readers always see one consistent snapshot.
+
+A RateProvider (static stub, JSON file or HTTP endpoint) supplies the rates
+and a background RateRefresher pulls them into a new snapshot whenever the
+current one is older than its TTL. Request handlers only ever read the
+current snapshot; a failing provider leaves the last good one in place
+(stale-while-revalidate) and is retried in the background.
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+
+BASE_CURRENCY = 'USD'
+
+# Exchange rates relative to USD (July 2025 rates)
+DEFAULT_RATES = {
+    'USD': 1.0,
+    'EUR': 0.8513,
+    'GBP': 0.7443,
+    'JPY': 147.65,
+    'CNY': 7.169,
+    'KRW': 1382.7,
+    'AUD': 1.523,
+    'CAD': 1.370,
+    'CHF': 0.7953,
+    'SGD': 1.281
+}
+DEFAULT_NOTE = 'July 2025 market rates - demo purposes only'
+
+
+class RateTable:
+    """Immutable snapshot of base-currency rates and all N x N cross rates."""
+
+    def __init__(self, rates, base=BASE_CURRENCY, source='builtin', note=DEFAULT_NOTE,
+                 fetched_at=None):
+        if rates.get(base) != 1.0:
+            raise ValueError(f'Rates must be relative to {base} (rate 1.0)')
+        if any(not rate > 0 for rate in rates.values()):
+            raise ValueError('Rates must be positive')
+
+        self.base = base
+        self.source = source
+        self.note = note
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.rates = dict(rates)
+        self.currencies = tuple(rates)
+        self.index = {currency: i for i, currency in enumerate(self.currencies)}
+        # matrix[i][j] converts one unit of currencies[i] into currencies[j]
+        self.matrix = tuple(
+            tuple(rates[to] / rates[from_currency] for to in self.currencies)
+            for from_currency in self.currencies
+        )
+
+    def __contains__(self, currency):
+        return currency in self.index
+
+    def age(self):
+        """Seconds since these rates were fetched from their provider."""
+        return max(time.time() - self.fetched_at, 0.0)
+
+    def rate(self, from_currency, to_currency):
+        """Cross rate from one currency to another; KeyError if unsupported."""
+        return self.matrix[self.index[from_currency]][self.index[to_currency]]
+
+    def convert(self, from_currency, to_currency, amount):
+        return amount * self.rate(from_currency, to_currency)
+
+    def convert_many(self, from_currencies, to_currencies, amounts):
+        """Convert aligned columns in one pass; None where a triple is invalid."""
+        index, matrix = self.index, self.matrix
+        results = []
+        for source, to, amount in zip(from_currencies, to_currencies, amounts):
+            i, j = index.get(source), index.get(to)
+            if i is None or j is None or amount is None:
+                results.append(None)
+            else:
+                results.append(amount * matrix[i][j])
+        return results
+
+    def convert_all(self, from_currency, amount):
+        """One amount converted into every supported currency."""
+        row = self.matrix[self.index[from_currency]]
+        return {to: amount * rate for to, rate in zip(self.currencies, row)}
+
+
+_table = RateTable(DEFAULT_RATES)
+
+
+def current_table():
+    """The active rate snapshot. Hold on to it for the whole request."""
+    return _table
+
+
+def set_rates(rates, **kwargs):
+    """Build a new table from base-currency rates and swap it in atomically."""
+    global _table
+    table = RateTable(rates, **kwargs)
+    _table = table
+    return table
+
+
+# Providers
+
+def parse_rates(payload):
+    """Rates from ``{"rates": {...}}`` or a flat ``{"USD": 1.0, ...}`` mapping."""
+    rates = payload.get('rates', payload) if isinstance(payload, dict) else None
+    if not isinstance(rates, dict) or not rates:
+        raise ValueError('Rate payload must be a non-empty object')
+    return {str(currency).upper(): float(rate) for currency, rate in rates.items()}
+
+
+class RateProvider:
+    """Source of base-currency rates. fetch() may block; it never runs on a request."""
+
+    name = 'provider'
+    note = ''
+
+    def fetch(self):
+        raise NotImplementedError
+
+
+class StaticRateProvider(RateProvider):
+    """Local stub returning a fixed set of rates."""
+
+    name = 'static'
+    note = DEFAULT_NOTE
+
+    def __init__(self, rates=None):
+        self.rates = dict(rates or DEFAULT_RATES)
+
+    def fetch(self):
+        return dict(self.rates)
+
+
+class FileRateProvider(RateProvider):
+    """Rates read from a JSON file, e.g. one mounted into the task."""
+
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+        self.note = f'Rates loaded from {os.path.basename(path)}'
+
+    def fetch(self):
+        with open(self.path) as f:
+            return parse_rates(json.load(f))
+
+
+class HttpRateProvider(RateProvider):
+    """Rates fetched as JSON from an HTTP(S) endpoint."""
+
+    name = 'http'
+
+    def __init__(self, url, timeout=5.0):
+        self.url = url
+        self.timeout = timeout
+        self.note = 'Rates fetched from the configured rate service'
+
+    def fetch(self):
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            return parse_rates(json.load(response))
+
+
+PROVIDERS = {
+    'static': lambda source: StaticRateProvider(),
+    'file': FileRateProvider,
+    'http': HttpRateProvider,
+}
+
+
+def create_provider(kind, source=None):
+    """Provider for RATES_PROVIDER/RATES_SOURCE style configuration."""
+    if kind not in PROVIDERS:
+        raise ValueError(f"Unknown rate provider '{kind}', expected one of {sorted(PROVIDERS)}")
+    if kind != 'static' and not source:
+        raise ValueError(f"Rate provider '{kind}' needs a source path or URL")
+    return PROVIDERS[kind](source)
+
+
+# Background refresh
+
+class RateRefresher:
+    """Keeps the rate snapshot fresh from a provider on a daemon thread.
+
+    A snapshot is 'fresh' for ``ttl`` seconds, then 'stale' but still served
+    for up to ``stale_ttl`` more while the refresher retries, then 'expired'.
+    """
+
+    def __init__(self, provider, ttl=300.0, stale_ttl=3600.0, retry_interval=30.0):
+        self.provider = provider
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.retry_interval = retry_interval
+        self.failures = 0
+        self.last_error = None
+        self.last_attempt = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Fetch from the provider and swap in a new snapshot; False on failure."""
+        self.last_attempt = time.time()
+        try:
+            set_rates(self.provider.fetch(), source=self.provider.name,
+                      note=self.provider.note)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = f'{type(e).__name__}: {e}'
+            return False
+        self.failures = 0
+        self.last_error = None
+        return True
+
+    def _next_delay(self):
+        if self.failures:
+            return self.retry_interval
+        return max(self.ttl - current_table().age(), 1.0)
+
+    def _run(self):
+        self.refresh()
+        while not self._stop.wait(self._next_delay()):
+            self.refresh()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='rate-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        """Freshness of the current snapshot: 'fresh', 'stale' or 'expired'."""
+        age = current_table().age()
+        if age < self.ttl:
+            return 'fresh'
+        if age < self.ttl + self.stale_ttl:
+            return 'stale'
+        return 'expired'
+
+
+_refresher = None
+
+
+def _restart_after_fork():
+    # Threads do not survive fork(), so each gunicorn worker runs its own.
+    if _refresher is not None:
+        _refresher.start()
+
+
+def start_refresher(provider, **kwargs):
+    """Start refreshing rates in the background, once per process."""
+    global _refresher
+    if _refresher is None:
+        os.register_at_fork(after_in_child=_restart_after_fork)
+    else:
+        _refresher.stop()
+    _refresher = RateRefresher(provider, **kwargs)
+    _refresher.start()
+    return _refresher
+
+
+def refresher():
+    """The running RateRefresher, or None if rates are not being refreshed."""
+    return _refresher
@@ -0,0 +1,224 @@
+"""
+Response cache for idempotent GET routes of ECS Playground.
+
+Views opt in with the ``cached`` decorator and a TTL. ResponseCache is WSGI
+middleware in front of Flask: a hit is answered from stored bytes without
+routing, a request context or serialization. Entries are keyed by path,
+sorted query arguments and an optional route-specific key (e.g. the
+exchange rate snapshot, so a rate refresh never serves old conversions).
+Only complete 200 responses without cookies are stored.
+
+Two backends:
+- ``MemoryBackend``: per-process LRU dict; each gunicorn worker has its own.
+- ``SharedBackend``: one SQLite database on tmpfs (/dev/shm) shared by all
+  workers of the task, with the same TTL and LRU eviction.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_PATH = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'ecs-playground-cache.sqlite',
+)
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SharedBackend:
+    """LRU cache shared by every process of the task, stored in SQLite on tmpfs.
+
+    Each thread opens its own connection (reopened after a fork). Writes
+    are unsynchronized: the file lives in memory and is a cache. sqlite3 is
+    imported on first use, so tasks using the memory backend never load it.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=1024):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        db = self._connect()
+        db.execute('CREATE TABLE IF NOT EXISTS entries ('
+                   ' key TEXT PRIMARY KEY, expires REAL, used REAL,'
+                   ' status TEXT, headers TEXT, body BLOB)')
+        db.execute('CREATE INDEX IF NOT EXISTS entries_used ON entries (used)')
+        db.close()
+
+    def _connect(self):
+        import sqlite3
+        db = sqlite3.connect(self.path, timeout=1.0, isolation_level=None,
+                             check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=OFF')
+        return db
+
+    @property
+    def db(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            local.db, local.pid = self._connect(), os.getpid()
+        return local.db
+
+    def get(self, key):
+        import sqlite3
+        now = time.time()
+        try:
+            row = self.db.execute(
+                'SELECT status, headers, body, used FROM entries WHERE key = ? AND expires > ?',
+                (key, now)).fetchone()
+            if row is None:
+                return None
+            # Recency only needs to be approximate; skip the write on hot keys.
+            if now - row[3] > 1.0:
+                self.db.execute('UPDATE entries SET used = ? WHERE key = ?', (now, key))
+        except sqlite3.Error:
+            return None
+        return row[0], [tuple(h) for h in json.loads(row[1])], row[2]
+
+    def set(self, key, value, ttl):
+        import sqlite3
+        now = time.time()
+        status, headers, body = value
+        try:
+            db = self.db
+            db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                       (key, now + ttl, now, status, json.dumps(headers), body))
+            db.execute('DELETE FROM entries WHERE expires <= ?', (now,))
+            db.execute('DELETE FROM entries WHERE key IN (SELECT key FROM entries'
+                       ' ORDER BY used DESC LIMIT -1 OFFSET ?)', (self.max_entries,))
+        except sqlite3.Error:
+            pass  # a busy or broken cache only costs a miss
+
+    def clear(self):
+        import sqlite3
+        try:
+            self.db.execute('DELETE FROM entries')
+        except sqlite3.Error:
+            pass
+
+
+def create_backend(kind, max_entries=1024, path=DEFAULT_PATH):
+    """Build the backend for RESPONSE_CACHE; 'off' disables caching."""
+    if kind == 'off':
+        return None
+    if kind == 'memory':
+        return MemoryBackend(max_entries)
+    if kind == 'shared':
+        return SharedBackend(path, max_entries)
+    raise ValueError(f"Unknown response cache '{kind}', expected off, memory or shared")
+
+
+def cached(ttl, key=None):
+    """Opt a GET view into the response cache for ``ttl`` seconds.
+
+    ``key`` returns extra key material, such as the version of the data
+    the response is built from. It runs outside any request context.
+    """
+    def decorator(view):
+        view.response_cache = (ttl, key)
+        return view
+    return decorator
+
+
+class ResponseCache:
+    """WSGI middleware serving opted-in routes from a cache backend."""
+
+    def __init__(self, app, flask_app, backend, generation=None):
+        self.app = app
+        self.backend = backend
+        # Optional resultcache.Generation; bumping it invalidates every entry.
+        self.generation = generation
+        # Response media type for an Accept header when the app speaks several formats.
+        self.negotiate = getattr(flask_app.json, 'negotiate', None)
+        # Literal path -> (route, ttl, key) for every view marked with cached().
+        self.routes = {}
+        for rule in flask_app.url_map.iter_rules():
+            settings = getattr(flask_app.view_functions[rule.endpoint], 'response_cache', None)
+            if settings and not rule.arguments:
+                self.routes[rule.rule] = (rule.rule, *settings)
+        self.hits = {}    # route -> count (this process)
+        self.misses = {}
+        self._lock = threading.Lock()
+
+    def _count(self, counter, route):
+        with self._lock:
+            counter[route] = counter.get(route, 0) + 1
+
+    def __call__(self, environ, start_response):
+        settings = self.routes.get(environ.get('PATH_INFO'))
+        if settings is None or self.backend is None or environ.get('REQUEST_METHOD') != 'GET':
+            return self.app(environ, start_response)
+
+        route, ttl, key = settings
+        query = environ.get('QUERY_STRING', '')
+        if '&' in query:
+            query = '&'.join(sorted(query.split('&')))
+        cache_key = f"{route}?{query}#{key() if key else ''}"
+        if self.negotiate is not None:
+            cache_key = f"{cache_key}|{self.negotiate(environ.get('HTTP_ACCEPT'))}"
+        if self.generation is not None:
+            cache_key = f'{self.generation.value()}:{cache_key}'
+
+        entry = self.backend.get(cache_key)
+        if entry is not None:
+            self._count(self.hits, route)
+            status, headers, body = entry
+            start_response(status, headers + [('X-Cache', 'HIT')])
+            return [body]
+
+        self._count(self.misses, route)
+        response = []
+
+        def capturing_start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+            return start_response(status, headers + [('X-Cache', 'MISS')], exc_info)
+
+        iterable = self.app(environ, capturing_start_response)
+        status, headers = response
+        names = {name.lower() for name, _ in headers}
+        if not status.startswith('200') or 'content-length' not in names or 'set-cookie' in names:
+            return iterable
+        try:
+            body = b''.join(iterable)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+        self.backend.set(cache_key, (status, headers, body), ttl)
+        return [body]
+
+    def stats(self):
+        with self._lock:
+            return {'hits': dict(self.hits), 'misses': dict(self.misses)}
@@ -0,0 +1,212 @@
+"""
+Memoization of pure POST handlers for ECS Playground.
+
+Views whose JSON response depends only on the request opt in with the
+``memoized`` decorator. ResultCache is WSGI middleware in front of Flask
+that keys each JSON request by a hash of its path, query string and body
+and replays the stored response bytes on a hit, with a fresh
+``"timestamp"`` spliced in. Only 200 responses are stored.
+
+The cache is per process and bounded by total bytes and entry count
+(least recently used first out); responses over ``max_entry_bytes`` are
+never stored. The cache is dropped whenever a task-wide generation, kept
+in a file on tmpfs, changes; bumping it (``python resultcache.py
+invalidate`` or ``Generation.bump``) invalidates all workers without a
+restart.
+"""
+
+import hashlib
+import io
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+DEFAULT_GENERATION_PATH = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'ecs-playground-cache-generation',
+)
+
+# Top-level "timestamp" member; JSON strings cannot contain an unescaped quote,
+# so this never matches inside a string value.
+TIMESTAMP = re.compile(rb'("timestamp": ?")[^"]*(")')
+
+
+class Generation:
+    """Task-wide cache generation: the mtime of a file on tmpfs.
+
+    Workers stat the file at most every ``interval`` seconds, so an
+    invalidation reaches all of them within that time.
+    """
+
+    def __init__(self, path=DEFAULT_GENERATION_PATH, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self._value = self._read()
+        self._checked = time.monotonic()
+
+    def _read(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def value(self):
+        now = time.monotonic()
+        if now - self._checked >= self.interval:
+            self._value, self._checked = self._read(), now
+        return self._value
+
+    def bump(self):
+        """Invalidate every cache keyed on this generation."""
+        with open(self.path, 'a'):
+            pass
+        now = time.time_ns()
+        os.utime(self.path, ns=(now, now))
+        self._value, self._checked = self._read(), time.monotonic()
+        return self._value
+
+
+def memoized(view):
+    """Opt a POST view whose response is a pure function of its JSON body into ResultCache."""
+    view.memoized = True
+    return view
+
+
+class ResultCache:
+    """WSGI middleware replaying responses of @memoized views for identical requests."""
+
+    def __init__(self, app, flask_app, generation, max_bytes=64 * 1024 * 1024,
+                 max_entries=4096, max_entry_bytes=1024 * 1024):
+        self.app = app
+        self.generation = generation
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.max_entry_bytes = max_entry_bytes
+        # Entries are JSON (the timestamp is spliced into the text), so requests
+        # negotiating another response format are passed through.
+        self.negotiate = getattr(flask_app.json, 'negotiate', None)
+        self.routes = {
+            rule.rule for rule in flask_app.url_map.iter_rules()
+            if not rule.arguments and getattr(flask_app.view_functions[rule.endpoint], 'memoized', False)
+        }
+        self._entries = OrderedDict()  # digest -> (status, headers, prefix, suffix)
+        self._bytes = 0
+        self._generation = generation.value()
+        self._lock = threading.Lock()
+        self.hits = {}     # route -> count (this process)
+        self.misses = {}
+        self.skipped = {}  # responses not stored: too large, not 200 or streamed
+
+    def _count(self, counter, route):
+        with self._lock:
+            counter[route] = counter.get(route, 0) + 1
+
+    def __call__(self, environ, start_response):
+        route = environ.get('PATH_INFO')
+        if (route not in self.routes or environ.get('REQUEST_METHOD') != 'POST'
+                or not environ.get('CONTENT_TYPE', '').startswith('application/json')
+                or (self.negotiate is not None
+                    and self.negotiate(environ.get('HTTP_ACCEPT')) != 'application/json')):
+            return self.app(environ, start_response)
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or -1)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= self.max_entry_bytes:
+            return self.app(environ, start_response)
+
+        body = environ['wsgi.input'].read(length)
+        environ['wsgi.input'] = io.BytesIO(body)
+        digest = hashlib.blake2b(body, digest_size=16)
+        digest.update(f"\0{route}?{environ.get('QUERY_STRING', '')}".encode('latin-1'))
+        key = digest.digest()
+
+        with self._lock:
+            if self.generation.value() != self._generation:
+                self._entries.clear()
+                self._bytes = 0
+                self._generation = self.generation.value()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            self._count(self.hits, route)
+            status, headers, prefix, suffix = entry
+            content = prefix + (datetime.utcnow().isoformat() + 'Z').encode('ascii') + suffix
+            start_response(status, headers + [('Content-Length', str(len(content))),
+                                              ('X-Cache', 'HIT')])
+            return [content]
+
+        self._count(self.misses, route)
+        response = []
+
+        def capturing_start_response(status, headers, exc_info=None):
+            response[:] = [status, headers]
+            return start_response(status, headers + [('X-Cache', 'MISS')], exc_info)
+
+        iterable = self.app(environ, capturing_start_response)
+        status, headers = response
+        names = {name.lower() for name, _ in headers}
+        if not status.startswith('200') or 'content-length' not in names:
+            self._count(self.skipped, route)
+            return iterable
+        try:
+            content = b''.join(iterable)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+        self._store(key, route, status, headers, content)
+        return [content]
+
+    def _store(self, key, route, status, headers, content):
+        stamps = list(TIMESTAMP.finditer(content))
+        if len(content) > self.max_entry_bytes or not stamps:
+            self._count(self.skipped, route)
+            return
+        stamp = stamps[-1]
+        headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+        entry = (status, headers, content[:stamp.end(1)], content[stamp.start(2):])
+        size = len(entry[2]) + len(entry[3])
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[2]) + len(old[3])
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes
+                                     or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[2]) + len(evicted[3])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """This worker's counters, hit ratio and occupancy."""
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                'hits': dict(self.hits),
+                'misses': dict(self.misses),
+                'skipped': dict(self.skipped),
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'generation': self.generation.value(),
+            }
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['invalidate']:
+        sys.exit(f'usage: {sys.argv[0]} invalidate')
+    path = os.environ.get('CACHE_GENERATION_PATH', DEFAULT_GENERATION_PATH)
+    print(f'Cache generation bumped to {Generation(path).bump()}')
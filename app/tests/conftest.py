@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('ADMISSION_MAX_IN_FLIGHT', '1000')
+os.environ.setdefault('ACCESS_LOG', 'false')
+
+
+@pytest.fixture(scope='session')
+def client():
+    from app import app
+    return app.test_client()
@@ -0,0 +1,40 @@
+"""Batch endpoints flag bad elements in error_mask instead of failing the batch."""
+
+import json
+
+BIG = '1' + '0' * 400  # an integer literal past the float range
+
+
+def post(client, path, body):
+    return client.post(path, data=body, content_type='application/json')
+
+
+def test_calculator_batch_masks_out_of_range_element(client):
+    response = post(client, '/api/calculator/batch',
+                    '{"operation": "add", "a": [%s, 2], "b": 1}' % BIG)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['error_mask'] == [True, False]
+    assert data['results'] == [None, 3]
+
+
+def test_calculator_rejects_out_of_range_input(client):
+    response = post(client, '/api/calculator', '{"operation": "add", "a": %s, "b": 1}' % BIG)
+    assert response.status_code == 400
+    assert json.loads(response.data)['error'].startswith('Invalid input')
+
+
+def test_currency_batch_masks_out_of_range_amount(client):
+    response = post(client, '/api/currency/convert/batch',
+                    '{"conversions": [{"from": "USD", "to": "EUR", "amount": %s},'
+                    ' {"from": "USD", "to": "EUR", "amount": 5}]}' % BIG)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['error_mask'] == [True, False]
+    assert data['results'][1] is not None
+
+
+def test_currency_batch_rejects_out_of_range_single_amount(client):
+    response = post(client, '/api/currency/convert/batch', '{"from": "USD", "amount": %s}' % BIG)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid amount provided'
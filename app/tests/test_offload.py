@@ -0,0 +1,16 @@
+"""The offload pool survives jobs that cannot write their scratch files."""
+
+import pytest
+
+import offload
+
+
+def test_unwritable_directory_rejects_without_losing_the_helper(tmp_path):
+    pool = offload.Offloader(1, timeout=5, directory=str(tmp_path / 'missing'))
+    with pytest.raises(offload.Rejected) as error:
+        pool.run('codec', b'hello', 'base64', 'encode')
+    assert error.value.status == 503
+
+    pool.directory = str(tmp_path)
+    assert pool.run('codec', b'hello', 'base64', 'encode') == (None, [b'aGVsbG8='])
+    assert pool.stats()['started'] == 1
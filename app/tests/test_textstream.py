@@ -0,0 +1,34 @@
+"""Streamed text-utils output matches whole-text output, also across forced cuts."""
+
+import io
+import json
+
+import pytest
+
+import textstream
+
+FORWARD = ('uppercase', 'lowercase', 'title_case')
+
+
+def streamed(text, max_segment):
+    lines = textstream.stream_text_utils(io.BytesIO(text.encode('utf-8')), transformations=FORWARD,
+                                         max_segment=max_segment)
+    parts = {name: [] for name in FORWARD}
+    for line in lines:
+        for name, value in json.loads(line).get('transformations', {}).items():
+            parts[name].append(value)
+    return {name: ''.join(values) for name, values in parts.items()}
+
+
+@pytest.mark.parametrize('text', [
+    'hello' * 20000,                        # one long word, cut mid-word
+    'ab1cd' * 20000 + ' tail words',        # digits restart title case
+    'ΟΔΟΣ' * 20000 + 'Σ. next',             # capital sigmas everywhere
+    "don't" * 20000,                        # case-ignorable apostrophes
+], ids=['word', 'digits', 'sigma', 'apostrophe'])
+def test_forced_cuts_match_whole_text(text):
+    segments = list(textstream.iter_segments(io.BytesIO(text.encode('utf-8')), chunk_size=4096,
+                                             max_segment=8192))
+    assert len(segments) > 1 and ''.join(segments) == text
+    _, whole = textstream.text_utils(text, (), FORWARD)
+    assert streamed(text, max_segment=8192) == whole
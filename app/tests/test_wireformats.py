@@ -0,0 +1,27 @@
+"""Binary wire formats answer the same requests JSON does."""
+
+import pytest
+
+cbor2 = pytest.importorskip('cbor2')
+msgpack = pytest.importorskip('msgpack')
+
+
+def echo(client, accept):
+    return client.post('/api/echo', data='{"n": %d}' % 2**70,
+                       content_type='application/json', headers={'Accept': accept})
+
+
+def test_msgpack_falls_back_to_json_for_ints_past_64_bits(client):
+    response = echo(client, 'application/msgpack')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.get_json()['echo'] == {'n': 2**70}
+
+
+def test_msgpack_and_cbor_round_trip(client):
+    response = client.post('/api/echo', json={'n': 1}, headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == 'application/msgpack'
+    assert msgpack.unpackb(response.data)['echo'] == {'n': 1}
+    response = echo(client, 'application/cbor')
+    assert response.mimetype == 'application/cbor'
+    assert cbor2.loads(response.data)['echo'] == {'n': 2**70}
@@ -0,0 +1,254 @@
+"""
+Single-pass text statistics and transformations for ECS Playground.
+
+Large text bodies are decoded from the request stream into segments that
+end on whitespace. Case mappings (including title case and the Greek final
+sigma) never look across whitespace, so transforming each segment on its
+own gives exactly the same output as transforming the whole text, while
+memory stays bounded by the segment size.
+
+A run without whitespace longer than MAX_SEGMENT is cut mid-word. The cut
+avoids the context of a capital sigma, and title case carries "inside a
+word" across it, so the output is still the same.
+"""
+
+import codecs
+import json
+import tempfile
+import unicodedata
+
+STATS = ('characters', 'characters_no_spaces', 'words', 'lines', 'sentences')
+TRANSFORMATIONS = {
+    'uppercase': str.upper,
+    'lowercase': str.lower,
+    'title_case': str.title,
+    'reversed': lambda text: text[::-1],
+}
+
+CHUNK_SIZE = 64 * 1024
+# A run of text without whitespace is flushed once it reaches this size.
+MAX_SEGMENT = 1024 * 1024
+# Reversed output is spooled to disk past this many bytes (UTF-32).
+SPOOL_SIZE = 4 * 1024 * 1024
+
+# Characters str.splitlines() treats as line boundaries.
+LINE_BREAKS = '\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029'
+SENTENCE_ENDS = str.maketrans('!?', '..')
+
+# Unicode Case_Ignorable (closely enough): the final sigma rule looks past these.
+CASE_IGNORABLE_CATEGORIES = frozenset(('Mn', 'Me', 'Cf', 'Lm', 'Sk'))
+CASE_IGNORABLE = frozenset("'.:\u00b7\u2018\u2019\u2024\u2027\ufe13\ufe52\ufe55\uff07\uff0e\uff1a")
+# How far back from the end of a run a forced cut may move.
+MAX_CUT_BACKOFF = 256
+
+
+def text_stats(text, names=STATS):
+    """Selected statistics of a complete string."""
+    compute = {
+        'characters': lambda: len(text),
+        'characters_no_spaces': lambda: len(text) - text.count(' '),
+        'words': lambda: len(text.split()),
+        'lines': lambda: len(text.splitlines()),
+        'sentences': lambda: len([s for s in text.translate(SENTENCE_ENDS).split('.') if s.strip()]),
+    }
+    return {name: compute[name]() for name in names}
+
+
+def text_utils(text, stats=STATS, transformations=()):
+    """Selected statistics and transformations of a complete string."""
+    return text_stats(text, stats), {name: TRANSFORMATIONS[name](text) for name in transformations}
+
+
+class TextStatsCounter:
+    """Incremental version of text_stats() fed one segment at a time.
+
+    Segments may be split anywhere; the counter carries whatever state
+    crosses a boundary (a word, a CRLF pair, an unfinished sentence).
+    """
+
+    def __init__(self):
+        self.characters = 0
+        self.spaces = 0
+        self.words = 0
+        self.line_breaks = 0
+        self.sentences = 0
+        self._in_word = False
+        self._after_cr = False
+        self._ends_with_break = False
+        self._sentence_has_text = False
+
+    def update(self, segment):
+        if not segment:
+            return
+        self.characters += len(segment)
+        self.spaces += segment.count(' ')
+
+        words = len(segment.split())
+        if self._in_word and not segment[0].isspace():
+            words -= 1  # the first word continues the previous segment's last one
+        self.words += words
+        self._in_word = not segment[-1].isspace()
+
+        ends_with_break = segment[-1] in LINE_BREAKS
+        lines = len(segment.splitlines())
+        self.line_breaks += lines - (0 if ends_with_break else 1)
+        if self._after_cr and segment[0] == '\n':
+            self.line_breaks -= 1  # '\r' + '\n' split across segments is one break
+        self._after_cr = segment[-1] == '\r'
+        self._ends_with_break = ends_with_break
+
+        parts = segment.translate(SENTENCE_ENDS).split('.')
+        if len(parts) == 1:
+            self._sentence_has_text = self._sentence_has_text or bool(parts[0].strip())
+            return
+        first, *complete, last = parts
+        if self._sentence_has_text or first.strip():
+            self.sentences += 1
+        self.sentences += sum(1 for part in complete if part.strip())
+        self._sentence_has_text = bool(last.strip())
+
+    def result(self, names=STATS):
+        values = {
+            'characters': self.characters,
+            'characters_no_spaces': self.characters - self.spaces,
+            'words': self.words,
+            'lines': self.line_breaks + (1 if self.characters and not self._ends_with_break else 0),
+            'sentences': self.sentences + (1 if self._sentence_has_text else 0),
+        }
+        return {name: values[name] for name in names}
+
+
+def iter_segments(stream, chunk_size=CHUNK_SIZE, max_segment=MAX_SEGMENT):
+    """Decode a UTF-8 byte stream into segments that end on whitespace.
+
+    Raises UnicodeDecodeError on invalid input.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            # pending has no whitespace, so only the new text can hold a cut point
+            cut = _after_last_space(text)
+            if cut:
+                yield pending + text[:cut]
+                pending = text[cut:]
+            else:
+                pending += text
+                if len(pending) >= max_segment:
+                    cut = _forced_cut(pending)
+                    yield pending[:cut]
+                    pending = pending[cut:]
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+
+def _after_last_space(text):
+    """Index just past the last whitespace character in text, 0 if none."""
+    if text[-1].isspace():
+        return len(text)
+    return len(text) - len(text.rsplit(None, 1)[-1])
+
+
+def _case_ignorable(ch):
+    return ch in CASE_IGNORABLE or unicodedata.category(ch) in CASE_IGNORABLE_CATEGORIES
+
+
+def _sigma_context(text, cut):
+    """Whether a capital sigma's final-sigma context would span a cut at ``cut``."""
+    i = cut - 1
+    while i >= 0 and _case_ignorable(text[i]):
+        i -= 1
+    if i >= 0 and text[i] == '\u03a3':
+        return True
+    j = cut
+    while j < len(text) and _case_ignorable(text[j]):
+        j += 1
+    return j == len(text) or text[j] == '\u03a3'
+
+
+def _forced_cut(text):
+    """Where to cut a run without whitespace: near its end, outside any sigma context."""
+    for cut in range(len(text) - 1, max(len(text) - MAX_CUT_BACKOFF, 1), -1):
+        if not _sigma_context(text, cut):
+            return cut
+    return len(text)
+
+
+def _is_cased(ch):
+    return ch.isupper() or ch.islower() or ch.istitle()
+
+
+def _title(segment, after_cased):
+    """str.title() of a segment continuing a word when ``after_cased``."""
+    # A cased prefix turns the segment's first letter lowercase, as inside a word;
+    # 'a' maps to exactly one character either way.
+    return ('a' + segment).title()[1:] if after_cased else segment.title()
+
+
+class ReversedText:
+    """Collects segments and replays the whole text reversed, in blocks.
+
+    Text is buffered as UTF-32 (4 bytes per code point) in a spooled file so
+    it can be read back to front without holding it all in memory.
+    """
+
+    def __init__(self, spool_size=SPOOL_SIZE):
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_size)
+
+    def write(self, segment):
+        self._file.write(segment.encode('utf-32-le'))
+
+    def __iter__(self, block_chars=CHUNK_SIZE):
+        try:
+            position = self._file.seek(0, 2)
+            block = block_chars * 4
+            while position > 0:
+                size = min(block, position)
+                position -= size
+                self._file.seek(position)
+                yield self._file.read(size).decode('utf-32-le')[::-1]
+        finally:
+            self._file.close()
+
+
+def stream_text_utils(stream, stats=STATS, transformations=(), timestamp=None,
+                      max_segment=MAX_SEGMENT):
+    """Process a text stream in one pass, yielding NDJSON lines.
+
+    Each input segment yields one ``{"transformations": {...}}`` line with
+    the selected streamable transformations; reversed output follows once
+    the input is exhausted; the last line carries ``{"stats": {...}}``.
+    """
+    counter = TextStatsCounter()
+    forward = [(name, TRANSFORMATIONS[name]) for name in transformations if name != 'reversed']
+    reversed_text = ReversedText() if 'reversed' in transformations else None
+    after_cased = False  # the previous segment was cut inside a word
+
+    try:
+        for segment in iter_segments(stream, max_segment=max_segment):
+            counter.update(segment)
+            if reversed_text is not None:
+                reversed_text.write(segment)
+            if forward:
+                line = {'transformations': {
+                    name: _title(segment, after_cased) if name == 'title_case' else fn(segment)
+                    for name, fn in forward
+                }}
+                yield json.dumps(line, ensure_ascii=False) + '\n'
+            after_cased = _is_cased(segment[-1])
+    except UnicodeDecodeError:
+        yield json.dumps({'error': 'Text must be valid UTF-8'}) + '\n'
+        return
+
+    if reversed_text is not None:
+        for block in reversed_text:
+            yield json.dumps({'transformations': {'reversed': block}}, ensure_ascii=False) + '\n'
+
+    final = {'stats': counter.result(stats)}
+    if timestamp is not None:
+        final['timestamp'] = timestamp
+    yield json.dumps(final) + '\n'
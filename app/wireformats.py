@@ -0,0 +1,133 @@
+"""
+Binary wire formats for ECS Playground: MessagePack and CBOR next to JSON.
+
+Views keep using ``request.get_json()`` and ``jsonify``; the schemas are the
+same in every format:
+
+- WireRequest.get_json() also decodes ``application/msgpack`` and
+  ``application/cbor`` request bodies.
+- WireFormatProvider (the app's ``app.json``) picks the response format
+  from ``Accept``: JSON unless the client prefers one of the binary
+  formats. Every response it builds carries ``Vary: Accept``. MessagePack
+  has no integers past 64 bits; a response holding one is sent as JSON.
+
+Each format needs its optional package (``msgpack``, ``cbor2``) and is
+simply not offered without it. Streamed responses (NDJSON, octet streams)
+are not affected.
+"""
+
+from flask import Request, current_app, has_request_context, request
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+
+from jsonprovider import FastJSONProvider
+
+try:
+    import msgpack
+except ImportError:  # optional; MessagePack is not offered without it
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # optional; CBOR is not offered without it
+    cbor2 = None
+
+JSON = 'application/json'
+
+# Format name -> media type, in server preference order after JSON.
+MEDIA_TYPES = {'msgpack': 'application/msgpack', 'cbor': 'application/cbor'}
+
+# Request Content-Types decoded as each format.
+REQUEST_TYPES = {
+    'application/msgpack': 'msgpack',
+    'application/x-msgpack': 'msgpack',
+    'application/vnd.msgpack': 'msgpack',
+    'application/cbor': 'cbor',
+}
+
+
+def available_formats():
+    """Binary formats this process can speak."""
+    installed = {'msgpack': msgpack is not None, 'cbor': cbor2 is not None}
+    return tuple(name for name in MEDIA_TYPES if installed[name])
+
+
+def _loads(name, data):
+    if name == 'msgpack':
+        return msgpack.unpackb(data, raw=False)
+    return cbor2.loads(data)
+
+
+class WireRequest(Request):
+    """Request whose get_json() also reads MessagePack and CBOR bodies."""
+
+    def get_json(self, force=False, silent=False, cache=True):
+        name = REQUEST_TYPES.get(self.mimetype)
+        if name is None or name not in getattr(current_app.json, 'formats', ()):
+            return super().get_json(force=force, silent=silent, cache=cache)
+
+        cached = self._cached_json[silent]
+        if cache and cached is not Ellipsis:
+            return cached
+        try:
+            data = _loads(name, self.get_data(cache=cache))
+        except Exception as e:  # each library raises its own decode errors
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
+        if cache:
+            self._cached_json = (data, data)
+        return data
+
+
+class WireFormatProvider(FastJSONProvider):
+    """FastJSONProvider that answers in MessagePack or CBOR when asked to."""
+
+    def __init__(self, app, formats=None, **kwargs):
+        super().__init__(app, **kwargs)
+        available = available_formats()
+        self.formats = tuple(f for f in (formats if formats is not None else available)
+                             if f in available)
+        self._offered = [JSON] + [MEDIA_TYPES[f] for f in self.formats]
+        self._negotiated = {}  # Accept header -> media type
+
+    def negotiate(self, accept):
+        """Response media type for an ``Accept`` header; JSON unless a binary one is preferred."""
+        if not accept or not self.formats:
+            return JSON
+        media_type = self._negotiated.get(accept)
+        if media_type is None:
+            media_type = parse_accept_header(accept, MIMEAccept).best_match(self._offered, JSON)
+            if len(self._negotiated) < 256:  # clients send a handful of variants
+                self._negotiated[accept] = media_type
+        return media_type
+
+    def dumps_format(self, obj, media_type):
+        """Serialize to ``media_type``; unknown types go through Flask's default() as for JSON."""
+        if media_type == MEDIA_TYPES['msgpack']:
+            return msgpack.packb(obj, default=self._msgpack_default)
+        return cbor2.dumps(obj, default=lambda encoder, value: encoder.encode(self.default(value)))
+
+    def _msgpack_default(self, value):
+        if isinstance(value, int):
+            raise OverflowError('MessagePack integers are limited to 64 bits')
+        return self.default(value)
+
+    def response(self, *args, **kwargs):
+        if not self.formats:
+            return super().response(*args, **kwargs)
+        media_type = JSON
+        if has_request_context():
+            media_type = self.negotiate(request.headers.get('Accept'))
+        body = None
+        if media_type != JSON:
+            try:
+                body = self.dumps_format(self._prepare_response_obj(args, kwargs), media_type)
+            except OverflowError:
+                pass  # an int past 64 bits: JSON can carry it, MessagePack cannot
+        if body is None:
+            response = super().response(*args, **kwargs)
+        else:
+            response = self._app.response_class(body, mimetype=media_type)
+        response.vary.add('Accept')
+        return response
@@ -0,0 +1,11 @@
+"""
+WSGI entry point for ECS Playground.
+
+Run with gunicorn in production (gunicorn.conf.py loads wsgi:app for every
+profile except asgi, which loads asgi:app):
+    gunicorn -c gunicorn.conf.py
+"""
+
+from app import app
+
+application = app
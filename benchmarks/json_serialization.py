@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark JSON serialization of the app's response shapes.
+
+Compares Flask's default provider (stdlib json, sorted keys) with the
+app's FastJSONProvider in stdlib-compact and orjson modes, timing only
+the serialization of each response body.
+
+    python benchmarks/json_serialization.py --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+import rates  # noqa: E402
+import textstream  # noqa: E402
+from jsonprovider import FastJSONProvider  # noqa: E402
+
+SAMPLE = 'The quick brown fox jumps over the lazy dog. Hello from AWS Fargate in Tokyo! '
+
+
+def timestamp():
+    return datetime.utcnow().isoformat() + 'Z'
+
+
+def text_utils_body(size):
+    text = (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+    return {
+        'original_text': text,
+        'stats': textstream.text_stats(text),
+        'transformations': {name: fn(text) for name, fn in textstream.TRANSFORMATIONS.items()},
+        'timestamp': timestamp(),
+    }
+
+
+def shapes():
+    table = rates.current_table()
+    return {
+        'health': {
+            'status': 'healthy', 'service': 'ecs-playground', 'timestamp': timestamp(),
+            'version': '2.0.0', 'environment': 'production', 'region': 'ap-northeast-1',
+        },
+        'currency': {
+            'base_currency': 'USD', 'rates': table.rates, 'last_updated': timestamp(),
+            'note': table.note, 'region': 'ap-northeast-1',
+        },
+        'calculator': {
+            'operation': 'power', 'inputs': {'a': 2.0, 'b': 10.0}, 'result': 1024.0,
+            'timestamp': timestamp(),
+        },
+        'echo-10KB': {
+            'echo': {'items': [{'id': i, 'name': f'item-{i}', 'price': i * 1.25, 'tags': ['a', 'b']}
+                               for i in range(160)]},
+            'method': 'POST', 'timestamp': timestamp(), 'region': 'ap-northeast-1',
+        },
+        'calculator-batch-10k': {
+            'count': 10000, 'errors': 0, 'results': [i * 0.5 for i in range(10000)],
+            'error_mask': [False] * 10000, 'timestamp': timestamp(),
+        },
+        'text-utils-1KB': text_utils_body(1024),
+        'text-utils-100KB': text_utils_body(100 * 1024),
+        'text-utils-1MB': text_utils_body(1024 * 1024),
+    }
+
+
+def providers():
+    app = Flask(__name__)
+    return {
+        'flask-default': DefaultJSONProvider(app),
+        'stdlib-compact': FastJSONProvider(app, use_orjson=False),
+        'orjson': FastJSONProvider(app),
+    }
+
+
+def serialize(provider):
+    if isinstance(provider, FastJSONProvider):
+        return provider.dumps_bytes
+    return lambda obj: provider.dumps(obj).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='timing repeats (best is kept)')
+    args = parser.parse_args()
+
+    provs = providers()
+    if provs['orjson'].backend != 'orjson':
+        print('⚠️  orjson is not installed; the orjson column uses stdlib json')
+
+    header = f"{'shape':<22}{'bytes':>10}" + ''.join(f'{name:>17}' for name in provs) + f"{'speedup':>10}"
+    print(header)
+    for name, body in shapes().items():
+        timings = {}
+        for prov_name, prov in provs.items():
+            dump = serialize(prov)
+            size = len(dump(body))
+            number = max(1, int(200_000 / max(size, 1000)))
+            best = min(timeit.repeat(lambda: dump(body), number=number, repeat=args.repeat))
+            timings[prov_name] = best / number * 1e6
+        speedup = timings['flask-default'] / timings['orjson']
+        print(f'{name:<22}{size:>10}' + ''.join(f'{t:>14.1f} us' for t in timings.values())
+              + f'{speedup:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
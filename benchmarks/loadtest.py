@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Reproducible load test of every ECS Playground endpoint.
+
+Drives each serving mode (see serving_modes.py) or an already running
+server with a weighted mix of requests whose payload sizes follow fixed,
+seeded distributions, and reports requests/second and latency percentiles
+per mode and per endpoint. Results can be written as JSON and compared
+against an earlier run to catch regressions between commits.
+
+    python benchmarks/loadtest.py --duration 20 --output results.json
+    python benchmarks/loadtest.py --url http://localhost:5000 --compare results.json
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from serving_modes import APP_DIR, MODES, free_port, percentile, wait_for
+
+CURRENCIES = ('USD', 'EUR', 'GBP', 'JPY', 'CNY', 'KRW', 'AUD', 'CAD', 'CHF', 'SGD')
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide', 'power', 'sqrt')
+WORDS = ('aws', 'fargate', 'tokyo', 'container', 'task', 'service', 'cluster', 'the',
+         'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'hello', 'world')
+
+# Body sizes in bytes and their weights: mostly small requests with a long
+# tail, roughly what the playground UI and API clients send.
+SMALL_BODIES = ((64, 40), (512, 35), (4 * 1024, 20), (32 * 1024, 5))
+LARGE_BODIES = ((1024, 50), (16 * 1024, 30), (128 * 1024, 15), (1024 * 1024, 5))
+
+
+def _pick(rng, weighted):
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _text(rng, size):
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word + ('. ' if rng.random() < 0.1 else ' '))
+        length += len(words[-1])
+    return ''.join(words)[:size]
+
+
+def _json(path, body):
+    return 'POST', path, json.dumps(body).encode('utf-8'), {'Content-Type': 'application/json'}
+
+
+# Scenarios: name -> (weight, builder). A builder returns one request as
+# (method, path, body bytes or None, headers).
+def home(rng):
+    encoding = _pick(rng, (('br', 60), ('gzip', 30), ('identity', 10)))
+    return 'GET', '/', None, {'Accept-Encoding': encoding}
+
+
+def health(rng):
+    return 'GET', '/health', None, {}
+
+
+def info(rng):
+    return 'GET', '/api/info', None, {}
+
+
+def echo(rng):
+    size = _pick(rng, SMALL_BODIES)
+    items = [{'id': i, 'name': f'item-{i}', 'tags': ['a', 'b']} for i in range(max(1, size // 48))]
+    return _json('/api/echo', {'items': items})
+
+
+def currency(rng):
+    return 'GET', '/api/currency', None, {}
+
+
+def currency_convert(rng):
+    source, target = rng.sample(CURRENCIES, 2)
+    amount = round(rng.uniform(1, 10000), 2)
+    return 'GET', f'/api/currency/convert?from={source}&to={target}&amount={amount}', None, {}
+
+
+def currency_batch(rng):
+    rows = _pick(rng, ((10, 60), (100, 30), (1000, 10)))
+    conversions = [{'from': rng.choice(CURRENCIES), 'to': rng.choice(CURRENCIES),
+                    'amount': round(rng.uniform(1, 10000), 2)} for _ in range(rows)]
+    return _json('/api/currency/convert/batch', {'conversions': conversions})
+
+
+def calculator(rng):
+    operation = rng.choice(OPERATIONS)
+    low = 0 if operation in ('sqrt', 'power') else -1000
+    return _json('/api/calculator', {'operation': operation,
+                                     'a': round(rng.uniform(low, 1000), 3),
+                                     'b': round(rng.uniform(1, 4), 3)})
+
+
+def calculator_batch(rng):
+    rows = _pick(rng, ((10, 60), (100, 30), (1000, 10)))
+    return _json('/api/calculator/batch', {
+        'operation': rng.choice(OPERATIONS[:5]),
+        'a': [round(rng.uniform(-1000, 1000), 3) for _ in range(rows)],
+        'b': [round(rng.uniform(1, 10), 3) for _ in range(rows)],
+    })
+
+
+def text_utils(rng):
+    return _json('/api/text-utils', {'text': _text(rng, _pick(rng, LARGE_BODIES))})
+
+
+def text_utils_stream(rng):
+    body = _text(rng, _pick(rng, LARGE_BODIES)).encode('utf-8')
+    return 'POST', '/api/text-utils', body, {'Content-Type': 'text/plain'}
+
+
+def quote(rng):
+    return 'GET', '/api/quote', None, {}
+
+
+def encoder(rng):
+    text = _text(rng, _pick(rng, SMALL_BODIES))
+    if rng.random() < 0.5:
+        return _json('/api/encoder', {'operation': 'encode', 'text': text})
+    encoded = base64.b64encode(text.encode('utf-8')).decode('ascii')
+    return _json('/api/encoder', {'operation': 'decode', 'text': encoded})
+
+
+def encoder_stream(rng):
+    body = rng.randbytes(_pick(rng, LARGE_BODIES))
+    return ('POST', '/api/encoder?operation=encode', body,
+            {'Content-Type': 'application/octet-stream'})
+
+
+SCENARIOS = {
+    'home': (5, home),
+    'health': (5, health),
+    'info': (10, info),
+    'echo': (10, echo),
+    'currency': (8, currency),
+    'currency-convert': (12, currency_convert),
+    'currency-batch': (3, currency_batch),
+    'calculator': (12, calculator),
+    'calculator-batch': (3, calculator_batch),
+    'text-utils': (8, text_utils),
+    'text-utils-stream': (2, text_utils_stream),
+    'quote': (12, quote),
+    'encoder': (8, encoder),
+    'encoder-stream': (2, encoder_stream),
+}
+
+
+def build_plan(seed, size, scenarios):
+    """A deterministic sequence of (scenario, request) pairs."""
+    rng = random.Random(seed)
+    names = list(scenarios)
+    weights = [SCENARIOS[name][0] for name in names]
+    return [(name, SCENARIOS[name][1](rng)) for name in rng.choices(names, weights, k=size)]
+
+
+def client(host, port, plan, offset, stop, samples, errors, resets):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    i = offset
+    while not stop.is_set():
+        name, (method, path, body, headers) = plan[i % len(plan)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Keep-alive connection closed under us, e.g. by a recycled worker.
+            resets.append(name)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        samples.append((name, time.perf_counter() - start))
+        if response.status >= 400:
+            errors.append(name)
+    conn.close()
+
+
+def run_load(host, port, plan, duration, concurrency):
+    stop = threading.Event()
+    samples, errors, resets = [], [], []
+    # Clients start at evenly spaced points of the plan so they do not send
+    # the same request at the same time.
+    threads = [
+        threading.Thread(target=client, args=(host, port, plan, i * len(plan) // concurrency,
+                                              stop, samples, errors, resets))
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return samples, errors, resets, time.perf_counter() - started
+
+
+def summarize(latencies, errors, resets, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'resets': resets,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def bench(host, port, plan, args):
+    run_load(host, port, plan, args.warmup, args.concurrency)
+    samples, errors, resets, elapsed = run_load(host, port, plan, args.duration, args.concurrency)
+
+    result = summarize([s for _, s in samples], len(errors), len(resets), elapsed)
+    by_name = {}
+    for name, seconds in samples:
+        by_name.setdefault(name, []).append(seconds)
+    result['endpoints'] = {
+        name: summarize(by_name.get(name, []), errors.count(name), resets.count(name), elapsed)
+        for name in sorted(set(by_name) | set(errors) | set(resets))
+    }
+    return result
+
+
+def bench_mode(name, plan, args):
+    mode = MODES[name]
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), APP_ENV='benchmark', **mode['env'])
+    proc = subprocess.Popen(
+        mode['cmd'], cwd=APP_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port)
+        return bench('127.0.0.1', port, plan, args)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print rps/p99 changes against a baseline run; return the regressions."""
+    previous = {r['mode']: r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'mode / endpoint':<36}{'rps':>9}{'Δ rps':>9}{'p99 ms':>9}{'Δ p99':>9}")
+    for result in results:
+        before = previous.get(result['mode'])
+        if before is None:
+            continue
+        rows = [(result['mode'], result, before)] + [
+            (f"  {name}", stats, before['endpoints'][name])
+            for name, stats in result['endpoints'].items() if name in before['endpoints']
+        ]
+        for label, now, then in rows:
+            rps_change = (now['rps'] / then['rps'] - 1) * 100 if then['rps'] else 0.0
+            p99_change = (now['p99_ms'] / then['p99_ms'] - 1) * 100 if then['p99_ms'] else 0.0
+            flag = ''
+            if rps_change < -threshold or p99_change > threshold:
+                flag = '  ⚠️'
+                regressions.append(label.strip())
+            print(f"{label:<36}{now['rps']:>9}{rps_change:>+8.1f}%{now['p99_ms']:>9}"
+                  f"{p99_change:>+8.1f}%{flag}")
+    return regressions
+
+
+def print_table(results):
+    print(f"{'mode / endpoint':<36}{'requests':>9}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'errors':>8}{'resets':>8}")
+    for result in results:
+        rows = [(result['mode'], result)] + [(f'  {n}', s) for n, s in result['endpoints'].items()]
+        for label, r in rows:
+            print(f"{label:<36}{r['requests']:>9}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+                  f"{r['p99_ms']:>9}{r['errors']:>8}{r['resets']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--url', help='benchmark a running server instead of starting modes')
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds per mode')
+    parser.add_argument('--warmup', type=float, default=3.0, help='warm-up seconds per mode')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--seed', type=int, default=1234, help='seed for the request plan')
+    parser.add_argument('--plan-size', type=int, default=2000, help='distinct requests in the plan')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent drop in rps or rise in p99 reported as a regression')
+    args = parser.parse_args()
+
+    plan = build_plan(args.seed, args.plan_size, args.scenarios)
+    if args.url:
+        target = urlsplit(args.url)
+        result = bench(target.hostname, target.port or 80, plan, args)
+        results = [dict(mode=args.url, **result)]
+    else:
+        results = [dict(mode=m, **bench_mode(m, plan, args)) for m in args.modes]
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'plan_size': args.plan_size,
+            'scenarios': args.scenarios,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(results)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} regression(s) over {args.threshold}%")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
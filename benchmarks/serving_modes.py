@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compare serving modes of the ECS Playground app on the /api/* routes.
+
+Starts the app once per mode (Werkzeug dev server, then each gunicorn
+profile including the ASGI one), drives it with a closed-loop keep-alive
+client and prints requests/second and latency percentiles per mode.
+
+    python benchmarks/serving_modes.py --duration 10 --concurrency 16
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
+
+MODES = {
+    'dev-server': {'cmd': [sys.executable, 'app.py'], 'env': {}},
+    'gunicorn-sync': {
+        'cmd': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        'env': {'GUNICORN_PROFILE': 'sync'},
+    },
+    'gunicorn-gthread': {
+        'cmd': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        'env': {'GUNICORN_PROFILE': 'gthread'},
+    },
+    'gunicorn-gevent': {
+        'cmd': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        'env': {'GUNICORN_PROFILE': 'gevent'},
+    },
+    'gunicorn-asgi': {
+        'cmd': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+        'env': {'GUNICORN_PROFILE': 'asgi'},
+    },
+}
+
+# (method, path, body) mix exercised against every mode.
+REQUESTS = [
+    ('GET', '/api/info', None),
+    ('GET', '/api/currency', None),
+    ('GET', '/api/currency/convert?from=USD&to=JPY&amount=250', None),
+    ('GET', '/api/quote', None),
+    ('POST', '/api/echo', {'message': 'ping', 'values': list(range(20))}),
+    ('POST', '/api/calculator', {'operation': 'power', 'a': 2, 'b': 10}),
+    ('POST', '/api/text-utils', {'text': 'Hello from AWS Fargate in Tokyo! ' * 30}),
+    ('POST', '/api/encoder', {'operation': 'encode', 'text': 'Hello AWS Fargate! ' * 10}),
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'server on port {port} did not become healthy')
+
+
+def client(port, stop, latencies, errors, resets):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    i = 0
+    while not stop.is_set():
+        method, path, body = REQUESTS[i % len(REQUESTS)]
+        i += 1
+        payload = json.dumps(body) if body is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException):
+            # Keep-alive connection closed under us, e.g. by a recycled worker.
+            resets.append(1)
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def run_load(port, duration, concurrency):
+    stop = threading.Event()
+    latencies, errors, resets = [], [], []
+    threads = [
+        threading.Thread(target=client, args=(port, stop, latencies, errors, resets))
+        for _ in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies, errors, resets
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def bench_mode(name, duration, concurrency, warmup):
+    mode = MODES[name]
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), APP_ENV='benchmark', **mode['env'])
+    proc = subprocess.Popen(
+        mode['cmd'], cwd=APP_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for(port)
+        run_load(port, warmup, concurrency)
+        latencies, errors, resets = run_load(port, duration, concurrency)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        'mode': name,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'resets': len(resets),
+        'rps': round(len(latencies) / duration, 1),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per mode')
+    parser.add_argument('--warmup', type=float, default=2.0, help='warm-up seconds per mode')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = [bench_mode(m, args.duration, args.concurrency, args.warmup) for m in args.modes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<18}{'rps':>9}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'resets':>8}")
+    for r in results:
+        print(f"{r['mode']:<18}{r['rps']:>9}{r['mean_ms']:>10}{r['p50_ms']:>9}"
+              f"{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}{r['resets']:>8}")
+
+
+if __name__ == '__main__':
+    main()
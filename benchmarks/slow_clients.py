@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure how serving modes cope with many slow keep-alive clients.
+
+While ``--slow`` connections trickle request bodies in a few bytes at a
+time (as mobile clients behind the ALB do), a small closed-loop client
+drives the normal /api/* mix from serving_modes.py. Workers that tie up a
+thread or process per connection stall the fast clients; an event loop
+that owns the connections does not.
+
+    python benchmarks/slow_clients.py --slow 200 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import threading
+import time
+
+from serving_modes import APP_DIR, MODES, free_port, percentile, run_load, wait_for
+
+SLOW_BODY = json.dumps({'operation': 'add', 'a': 1, 'b': 2}).encode('utf-8')
+
+
+async def slow_client(port, stop, done, interval):
+    """Send one request at a time, its body a few bytes per ``interval``."""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError:
+        return
+    try:
+        while not stop.is_set():
+            writer.write(b'POST /api/calculator HTTP/1.1\r\nHost: bench\r\n'
+                         b'Content-Type: application/json\r\n'
+                         b'Content-Length: %d\r\n\r\n' % len(SLOW_BODY))
+            for i in range(0, len(SLOW_BODY), 4):
+                writer.write(SLOW_BODY[i:i + 4])
+                await writer.drain()
+                await asyncio.sleep(interval)
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = next(int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                          if line.lower().startswith(b'content-length'))
+            await reader.readexactly(length)
+            done.append(1)
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, StopIteration):
+        pass
+    finally:
+        writer.close()
+
+
+def run_slow(port, count, interval, stop, done):
+    async def main():
+        flag = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=lambda: (stop.wait(), loop.call_soon_threadsafe(flag.set)),
+                         daemon=True).start()
+        tasks = [asyncio.create_task(slow_client(port, flag, done, interval)) for _ in range(count)]
+        await flag.wait()
+        await asyncio.wait(tasks, timeout=5)
+        for task in tasks:
+            task.cancel()
+
+    asyncio.run(main())
+
+
+def bench_mode(name, args):
+    mode = MODES[name]
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), APP_ENV='benchmark', **mode['env'])
+    proc = subprocess.Popen(
+        mode['cmd'], cwd=APP_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    stop, slow_done = threading.Event(), []
+    try:
+        wait_for(port)
+        slow = threading.Thread(target=run_slow,
+                                args=(port, args.slow, args.interval, stop, slow_done))
+        slow.start()
+        time.sleep(args.warmup)
+        latencies, errors, resets = run_load(port, args.duration, args.concurrency)
+        stop.set()
+        slow.join()
+    finally:
+        stop.set()
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        'mode': name,
+        'slow_clients': args.slow,
+        'slow_requests': len(slow_done),
+        'requests': len(latencies),
+        'errors': len(errors),
+        'resets': len(resets),
+        'rps': round(len(latencies) / args.duration, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=list(MODES),
+                        default=['gunicorn-sync', 'gunicorn-gthread', 'gunicorn-asgi'])
+    parser.add_argument('--slow', type=int, default=200, help='slow keep-alive connections')
+    parser.add_argument('--interval', type=float, default=0.05,
+                        help='seconds between 4-byte writes of a slow body')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per mode')
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds before measuring')
+    parser.add_argument('--concurrency', type=int, default=4, help='fast clients')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = [bench_mode(m, args) for m in args.modes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<18}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'resets':>8}{'slow done':>11}")
+    for r in results:
+        print(f"{r['mode']:<18}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+              f"{r['errors']:>8}{r['resets']:>8}{r['slow_requests']:>11}")
+
+
+if __name__ == '__main__':
+    main()
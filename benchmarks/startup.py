@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Measure how long the ECS Playground app takes to become healthy after start.
+
+Starts each serving mode from serving_modes.py ``--runs`` times and records
+the time from launching the process to the first 200 from /health, polling
+every few milliseconds. Two bytecode settings per mode:
+
+- precompiled: modules load from .pyc files, as in the multi-stage image
+  where everything is compiled at build time;
+- source: every module, standard library included, is compiled at start
+  (an empty PYTHONPYCACHEPREFIX and PYTHONDONTWRITEBYTECODE), as in the old
+  image whose base ships no .pyc and whose app user cannot write them.
+
+With ``--image`` it instead runs ``docker run`` on a built image and
+measures container start to the first healthy response.
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --modes gunicorn-gthread --bytecode source
+    python benchmarks/startup.py --image ecs-playground:latest --runs 5
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from serving_modes import APP_DIR, MODES, free_port
+
+BYTECODE = ('precompiled', 'source')
+
+
+def time_to_healthy(port, started, timeout=60):
+    """Seconds from ``started`` (perf_counter) to the first 200 from /health."""
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return time.perf_counter() - started
+        except (OSError, http.client.HTTPException):
+            pass
+        finally:
+            conn.close()
+        time.sleep(0.005)
+    raise RuntimeError(f'server on port {port} did not become healthy within {timeout}s')
+
+
+def start_process(name, bytecode):
+    """One cold start of a serving mode; returns seconds to healthy."""
+    mode = MODES[name]
+    port = free_port()
+    # DRAIN_DELAY=0: no point keeping a benchmark server around after SIGTERM.
+    env = dict(os.environ, PORT=str(port), APP_ENV='benchmark', DRAIN_DELAY='0', **mode['env'])
+    with tempfile.TemporaryDirectory() as empty_cache:
+        if bytecode == 'source':
+            env.update(PYTHONPYCACHEPREFIX=empty_cache, PYTHONDONTWRITEBYTECODE='1')
+        started = time.perf_counter()
+        proc = subprocess.Popen(mode['cmd'], cwd=APP_DIR, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            return time_to_healthy(port, started)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=60)
+
+
+def start_container(image):
+    """One ``docker run`` of ``image``; returns seconds to healthy."""
+    port = free_port()
+    started = time.perf_counter()
+    container = subprocess.run(
+        ['docker', 'run', '-d', '--rm', '-p', f'127.0.0.1:{port}:5000', '-e', 'DRAIN_DELAY=0', image],
+        check=True, capture_output=True, text=True,
+    ).stdout.strip()
+    try:
+        return time_to_healthy(port, started)
+    finally:
+        subprocess.run(['docker', 'stop', container], capture_output=True)
+
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    return {
+        'target': label,
+        'runs': len(samples),
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(samples[0] * 1000, 1),
+        'max_ms': round(samples[-1] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['dev-server', 'gunicorn-gthread', 'gunicorn-asgi'],
+                        choices=list(MODES))
+    parser.add_argument('--bytecode', nargs='+', default=list(BYTECODE), choices=BYTECODE)
+    parser.add_argument('--image', help='measure `docker run` of this image instead')
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per target')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    if args.image:
+        results.append(summarize(args.image, [start_container(args.image) for _ in range(args.runs)]))
+    else:
+        for name in args.modes:
+            # One unmeasured start leaves .pyc files for the precompiled runs.
+            start_process(name, 'precompiled')
+            for bytecode in args.bytecode:
+                samples = [start_process(name, bytecode) for _ in range(args.runs)]
+                results.append(summarize(f'{name} ({bytecode})', samples))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'target':<34}{'runs':>6}{'median ms':>11}{'min ms':>9}{'max ms':>9}")
+    for r in results:
+        print(f"{r['target']:<34}{r['runs']:>6}{r['median_ms']:>11}{r['min_ms']:>9}{r['max_ms']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Compare JSON with MessagePack and CBOR on the app's payload shapes.
+
+For the response shapes of json_serialization.py, plus the request body
+of a 10k-operation calculator batch, prints the encoded size and the time
+to encode and to decode with each format as the app runs it: JSON through
+the app's provider (orjson, or stdlib json without it), MessagePack
+through ``msgpack`` and CBOR through ``cbor2``.
+
+    python benchmarks/wire_formats.py --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from flask import Flask  # noqa: E402
+
+import wireformats  # noqa: E402
+from json_serialization import shapes  # noqa: E402
+
+
+def formats():
+    """Format name -> (encode, decode) as the app uses them."""
+    provider = wireformats.WireFormatProvider(Flask(__name__))
+    result = {provider.backend: (provider.dumps_bytes, provider.loads)}
+    for name in provider.formats:
+        media_type = wireformats.MEDIA_TYPES[name]
+        result[name] = (lambda obj, t=media_type: provider.dumps_format(obj, t),
+                        lambda data, n=name: wireformats._loads(n, data))
+    return result
+
+
+def payloads():
+    result = shapes()
+    result['calculator-batch-req-10k'] = {
+        'operations': [{'operation': 'add', 'a': i, 'b': i * 0.5} for i in range(10000)],
+    }
+    return result
+
+
+def best_us(fn, arg, size, repeat):
+    number = max(1, int(200_000 / max(size, 1000)))
+    return min(timeit.repeat(lambda: fn(arg), number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='timing repeats (best is kept)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    fmts = formats()
+    if len(fmts) == 1:
+        print('⚠️  neither msgpack nor cbor2 is installed; only JSON is measured')
+
+    results = []
+    for name, body in payloads().items():
+        for fmt, (encode, decode) in fmts.items():
+            data = encode(body)
+            results.append({
+                'shape': name,
+                'format': fmt,
+                'bytes': len(data),
+                'encode_us': round(best_us(encode, body, len(data), args.repeat), 1),
+                'decode_us': round(best_us(decode, data, len(data), args.repeat), 1),
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'shape':<26}{'format':<10}{'bytes':>10}{'vs json':>9}{'encode us':>12}{'decode us':>12}")
+    baseline = {}
+    for r in results:
+        baseline.setdefault(r['shape'], r['bytes'])
+        ratio = r['bytes'] / baseline[r['shape']]
+        print(f"{r['shape']:<26}{r['format']:<10}{r['bytes']:>10}{ratio:>8.0%} "
+              f"{r['encode_us']:>11.1f} {r['decode_us']:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -66,6 +66,7 @@ module "alb" {
   alb_security_group_id  = module.security.alb_security_group_id
   app_port               = var.app_port
   health_check_path      = var.health_check_path
+  deregistration_delay   = var.alb_deregistration_delay
 }
 
 # ECS Module
@@ -83,6 +84,9 @@ module "ecs" {
   target_group_arn                = module.alb.target_group_arn
   task_cpu                        = var.ecs_task_cpu
   task_memory                     = var.ecs_task_memory
+  gunicorn_profile                = var.ecs_gunicorn_profile
+  drain_delay                     = var.ecs_drain_delay
+  drain_timeout                   = var.ecs_drain_timeout
   service_desired_count           = var.ecs_service_desired_count
   app_port                        = var.app_port
   health_check_path               = var.health_check_path
@@ -18,6 +18,10 @@ resource "aws_lb_target_group" "main" {
   vpc_id      = var.vpc_id
   target_type = "ip"  # Required for Fargate with awsvpc network mode
 
+  # ECS waits this long after deregistering a task before sending SIGTERM;
+  # covers the longest request (gunicorn timeout 30s) instead of the 300s default.
+  deregistration_delay = var.deregistration_delay
+
   health_check {
     enabled             = true
     healthy_threshold   = 2
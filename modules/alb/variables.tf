@@ -35,4 +35,10 @@ variable "health_check_path" {
   default     = "/health"
 }
 
+variable "deregistration_delay" {
+  description = "Seconds to let in-flight requests finish on a deregistering target"
+  type        = number
+  default     = 30
+}
+
 # No additional variables needed for simplified setup 
\ No newline at end of file
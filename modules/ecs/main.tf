@@ -62,14 +62,35 @@ resource "aws_ecs_task_definition" "app" {
         {
           name  = "PORT"
           value = tostring(var.app_port)
+        },
+        {
+          name  = "TASK_CPU"
+          value = tostring(var.task_cpu)
+        },
+        {
+          name  = "TASK_MEMORY"
+          value = tostring(var.task_memory)
+        },
+        {
+          name  = "GUNICORN_PROFILE"
+          value = var.gunicorn_profile
+        },
+        {
+          name  = "DRAIN_DELAY"
+          value = tostring(var.drain_delay)
+        },
+        {
+          name  = "DRAIN_TIMEOUT"
+          value = tostring(var.drain_timeout)
         }
       ]
 
+      # SIGKILL only after the app has had its drain delay and timeout (Fargate max 120s).
+      stopTimeout = min(var.drain_delay + var.drain_timeout + 10, 120)
+
       healthCheck = {
-        command = [
-          "CMD-SHELL",
-          "curl -f http://localhost:${var.app_port}${var.health_check_path} || exit 1"
-        ]
+        # Socket-only Python probe (app/healthcheck.py); the image has no curl
+        command = ["CMD", "python", "-I", "-S", "/app/healthcheck.py", var.health_check_path]
         interval    = 30
         timeout     = 5
         retries     = 3
@@ -57,6 +57,24 @@ variable "task_memory" {
   default     = 512
 }
 
+variable "gunicorn_profile" {
+  description = "Gunicorn worker profile for the app (sync, gthread, gevent, asgi)"
+  type        = string
+  default     = "gthread"
+}
+
+variable "drain_delay" {
+  description = "Seconds a task keeps serving after SIGTERM before it stops accepting"
+  type        = number
+  default     = 5
+}
+
+variable "drain_timeout" {
+  description = "Seconds a stopping task gives in-flight requests to finish"
+  type        = number
+  default     = 25
+}
+
 variable "service_desired_count" {
   description = "Desired number of ECS service tasks"
   type        = number
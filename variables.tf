@@ -55,12 +55,35 @@ variable "ecs_task_memory" {
   default     = 512
 }
 
+variable "ecs_gunicorn_profile" {
+  description = "Gunicorn worker profile for the app (sync, gthread, gevent, asgi)"
+  type        = string
+  default     = "gthread"
+
+  validation {
+    condition     = contains(["sync", "gthread", "gevent", "asgi"], var.ecs_gunicorn_profile)
+    error_message = "ecs_gunicorn_profile must be one of: sync, gthread, gevent, asgi."
+  }
+}
+
 variable "ecs_service_desired_count" {
   description = "Desired number of ECS service tasks"
   type        = number
   default     = 1
 }
 
+variable "ecs_drain_delay" {
+  description = "Seconds a task keeps serving after SIGTERM, with readiness failing, before it stops accepting"
+  type        = number
+  default     = 5
+}
+
+variable "ecs_drain_timeout" {
+  description = "Seconds a stopping task gives in-flight requests to finish"
+  type        = number
+  default     = 25
+}
+
 # Application Configuration
 variable "app_port" {
   description = "Port the application runs on"
@@ -69,11 +92,17 @@ variable "app_port" {
 }
 
 variable "health_check_path" {
-  description = "Health check path for ALB"
+  description = "Liveness check path for the ECS container and ALB target group health checks"
   type        = string
   default     = "/health"
 }
 
+variable "alb_deregistration_delay" {
+  description = "Seconds the ALB lets in-flight requests finish on a deregistering task before ECS sends SIGTERM"
+  type        = number
+  default     = 30
+}
+
 # Operational Configuration
 variable "log_retention_days" {
   description = "CloudWatch log retention period in days"